@@ -4,22 +4,26 @@ Week 7-10 Integration: Authentication, Database, and ChatGPT
 """
 import streamlit as st
 import sys
+import uuid
 from pathlib import Path
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parent))
 
-from app.data.db import create_tables
-from app.services.db_auth import login_user_db, register_user_db, migrate_users_from_file
+# Auth (bcrypt) and the page modules (pandas, openai) are imported lazily,
+# only when they are first needed.
+from app.bootstrap import bootstrap, startup_report, timed_import, PROFILE_STARTUP
 
 st.set_page_config(page_title="Intelligence Platform", page_icon="🔐", layout="wide")
 
-# Initialize database and migrate users
-try:
-    create_tables()
-    migrate_users_from_file()
-except:
-    pass
+# Initialize database and migrate users (once per server process)
+bootstrap()
+router = timed_import("app.router")
+
+if PROFILE_STARTUP:
+    with st.sidebar.expander("Startup profile"):
+        st.table([{"step": kind, "module": name, "ms": round(ms, 1)} for kind, name, ms in startup_report()])
+        st.table([{"page": name, **timing} for name, timing in router.page_timings().items()])
 
 # Session state initialization
 if "logged_in" not in st.session_state:
@@ -28,15 +32,13 @@ if "username" not in st.session_state:
     st.session_state.username = ""
 if "page" not in st.session_state:
     st.session_state.page = "home"
+if "client_id" not in st.session_state:
+    # Per-browser-session key for login rate limiting
+    st.session_state.client_id = uuid.uuid4().hex
 
 # Check which page to show
-if st.session_state.logged_in and st.session_state.page == "dashboard":
-    # Import and run Dashboard
-    exec(open("pages/1_Dashboard.py").read())
-    st.stop()
-elif st.session_state.logged_in and st.session_state.page == "chatgpt":
-    # Import and run ChatGPT
-    exec(open("pages/2_ChatGPT.py").read())
+if st.session_state.logged_in and st.session_state.page in router.PAGES:
+    router.render_page(st.session_state.page)
     st.stop()
 
 # If logged in, show dashboard option
@@ -52,6 +54,11 @@ if st.session_state.logged_in:
         if st.button("AI Assistant", use_container_width=True):
             st.session_state.page = "chatgpt"
             st.rerun()
+
+    if timed_import("app.views.performance").is_admin(st.session_state.username):
+        if st.button("⏱️ Performance"):
+            st.session_state.page = "performance"
+            st.rerun()
     
     if st.button("Logout", type="secondary"):
         st.session_state.logged_in = False
@@ -75,11 +82,26 @@ with tab_login:
     login_password = st.text_input("Password", type="password", key="login_password")
     
     if st.button("Log in", type="primary"):
-        if login_user_db(login_username, login_password):
+        from app.services.db_auth import login_user_db
+        from app.services.auth_executor import AuthBusyError
+        from app.services.rate_limit import RateLimitedError
+        try:
+            authenticated = login_user_db(login_username, login_password, st.session_state.client_id)
+        except RateLimitedError as e:
+            authenticated = None
+            refusal = f"Too many login attempts. Try again in {int(e.retry_after) + 1} seconds."
+        except AuthBusyError:
+            authenticated = None
+            refusal = None
+            st.error("The server is busy. Please try again in a moment.")
+        if authenticated:
             st.session_state.logged_in = True
             st.session_state.username = login_username
             st.success(f"Welcome back, {login_username}!")
             st.rerun()
+        elif authenticated is None:
+            if refusal:
+                st.warning(refusal)
         else:
             st.error("Invalid username or password.")
 
@@ -98,7 +120,13 @@ with tab_register:
             st.error("Passwords do not match.")
         elif len(new_password) < 6:
             st.error("Password must be at least 6 characters.")
-        elif register_user_db(new_username, new_password):
-            st.success("✓ Account created! You can now log in.")
         else:
-            st.error("Username already exists.")
+            from app.services.db_auth import register_user_db
+            from app.services.auth_executor import AuthBusyError
+            try:
+                if register_user_db(new_username, new_password):
+                    st.success("✓ Account created! You can now log in.")
+                else:
+                    st.error("Username already exists.")
+            except AuthBusyError:
+                st.error("The server is busy. Please try again in a moment.")
@@ -0,0 +1,102 @@
+"""
+Startup Bootstrap
+One-time, idempotent initialization for the Streamlit app, plus an optional
+startup profiler.
+
+bootstrap() runs once per server process instead of on every rerun:
+- applies pending schema migrations (a no-op when up to date), and
+- imports DATA/users.txt only when the file differs from the last import,
+  using a marker stored in the bootstrap_state table.
+
+Set INTEL_PROFILE_STARTUP=1 to record how long each module import and init
+step takes; startup_report() returns the samples, they are printed to stderr
+once bootstrap has finished, and Home.py shows them in the sidebar together
+with the router's per-page import and render timings.
+"""
+import importlib
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+USERS_FILE = "DATA/users.txt"
+PROFILE_STARTUP = os.environ.get("INTEL_PROFILE_STARTUP", "") not in ("", "0")
+
+_lock = threading.Lock()
+_state = {"done": False}
+_profile = []  # (kind, name, milliseconds)
+
+
+@contextmanager
+def timed(kind, name):
+    """Time a startup step when profiling is on (no-op otherwise)."""
+    if not PROFILE_STARTUP:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _profile.append((kind, name, (time.perf_counter() - started) * 1000))
+
+
+def timed_import(module_name):
+    """Import a module, recording its import time the first time when profiling."""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    with timed("import", module_name):
+        return importlib.import_module(module_name)
+
+
+def startup_report():
+    """Recorded (kind, name, milliseconds) samples, in the order they happened."""
+    return list(_profile)
+
+
+def _users_file_marker():
+    """Size and mtime of users.txt, or None if it does not exist."""
+    try:
+        stat = os.stat(USERS_FILE)
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+
+def _sync_users_file(conn):
+    """Import users.txt if it changed since the last recorded import."""
+    marker = _users_file_marker()
+    if marker is None:
+        return False
+    row = conn.execute("SELECT value FROM bootstrap_state WHERE key = 'users_file'").fetchone()
+    if row and row["value"] == marker:
+        return False
+
+    # Only now pay for the auth imports (bcrypt)
+    db_auth = timed_import("app.services.db_auth")
+    db_auth.migrate_users_from_file()
+    conn.execute(
+        "INSERT OR REPLACE INTO bootstrap_state (key, value) VALUES ('users_file', ?)", (marker,)
+    )
+    return True
+
+
+def bootstrap():
+    """Initialize the database once per process; returns True if work was done."""
+    with _lock:
+        if _state["done"]:
+            return False
+        db = timed_import("app.data.db")
+        with timed("init", "create_tables"):
+            db.create_tables()
+        with timed("init", "sync_users_file"):
+            with db.get_connection() as conn:
+                _sync_users_file(conn)
+        _state["done"] = True
+
+    if PROFILE_STARTUP:
+        total = sum(ms for _, _, ms in _profile)
+        print(f"Startup profile ({total:.1f} ms recorded):", file=sys.stderr)
+        for kind, name, ms in _profile:
+            print(f"  {kind:<6} {name:<32} {ms:8.1f} ms", file=sys.stderr)
+    return True
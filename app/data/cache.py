@@ -0,0 +1,223 @@
+"""
+Query Cache
+Process-wide, size-bounded LRU cache for the read functions in db.py.
+
+Streamlit reruns the whole script on every click, for every session, so the
+same Dashboard queries are issued over and over. Results are cached per
+(function, arguments) and shared by all sessions in the server process.
+
+An entry is dropped when:
+- its TTL expires,
+- it is evicted as least recently used (entry count or byte budget), or
+- one of the tables it read from changes. Every write transaction bumps a
+  counter in the table_versions table (via triggers, see migrations.py), which
+  also catches writes from other processes such as setup.py. In-process
+  writers can call invalidate() to drop entries immediately.
+
+Lists of sqlite3.Row are stored column-wise (one tuple per column) instead
+of one Row object per row, and handed back as a list of dicts.
+"""
+import copy
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from app import instrumentation
+from app.data.pool import get_connection
+
+DEFAULT_TTL_SECONDS = 60
+MAX_ENTRIES = 256
+MAX_BYTES = 64 * 1024 * 1024
+VERSION_CHECK_INTERVAL = 0.5  # seconds between table_versions lookups
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # key -> entry dict, oldest first
+_versions = {"checked_at": 0.0, "values": {}}
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "evictions": 0,
+    "expirations": 0,
+    "invalidations": 0,
+    "bytes": 0,
+}
+
+
+class _Columns:
+    """Column-wise copy of a list of sqlite3.Row results."""
+
+    __slots__ = ("names", "columns", "length")
+
+    def __init__(self, rows):
+        self.names = tuple(rows[0].keys())
+        self.columns = tuple(zip(*rows))
+        self.length = len(rows)
+
+    def to_rows(self):
+        """Rebuild the rows as dicts (they support row["column"] and dict(row))."""
+        return [dict(zip(self.names, values)) for values in zip(*self.columns)]
+
+    def size(self):
+        """Approximate memory held by the cached values, in bytes."""
+        total = sys.getsizeof(self.columns)
+        for column in self.columns:
+            total += sys.getsizeof(column) + sum(sys.getsizeof(value) for value in column)
+        return total
+
+
+def _encode(value):
+    """Convert a result into its cached form."""
+    if isinstance(value, list) and value and isinstance(value[0], sqlite3.Row):
+        return _Columns(value)
+    if isinstance(value, tuple):
+        return tuple(_encode(item) for item in value)
+    return value
+
+
+def _decode(value):
+    """Turn a cached value back into a fresh result for the caller."""
+    if isinstance(value, _Columns):
+        return value.to_rows()
+    if isinstance(value, tuple):
+        return tuple(_decode(item) for item in value)
+    return copy.deepcopy(value)
+
+
+def _size(value):
+    """Approximate memory footprint of a cached value."""
+    if isinstance(value, _Columns):
+        return value.size()
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_size(k) + _size(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+def _table_versions():
+    """Current write counters per table, re-read at most every VERSION_CHECK_INTERVAL."""
+    now = time.monotonic()
+    with _lock:
+        if now - _versions["checked_at"] < VERSION_CHECK_INTERVAL:
+            return _versions["values"]
+    try:
+        with get_connection() as conn:
+            values = dict(conn.execute("SELECT table_name, version FROM table_versions").fetchall())
+    except sqlite3.OperationalError:
+        values = {}  # table_versions not created yet
+    with _lock:
+        _versions["values"] = values
+        _versions["checked_at"] = now
+    return values
+
+
+def _evict(key, reason):
+    """Remove one entry (caller holds the lock)."""
+    entry = _entries.pop(key)
+    _stats["bytes"] -= entry["size"]
+    _stats[reason] += 1
+
+
+def _lookup(key):
+    """Return the cached entry for key if it is still valid, else None."""
+    versions = _table_versions()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry["expires_at"]:
+            _evict(key, "expirations")
+            return None
+        if any(versions.get(table) != version for table, version in entry["versions"].items()):
+            _evict(key, "invalidations")
+            return None
+        _entries.move_to_end(key)
+        return entry
+
+
+def _store(key, value, tables, ttl, versions):
+    """Insert an entry and evict least recently used ones over budget."""
+    encoded = _encode(value)
+    size = _size(encoded)
+    if size > MAX_BYTES:
+        return encoded
+    with _lock:
+        if key in _entries:
+            _evict(key, "evictions")
+        _entries[key] = {
+            "value": encoded,
+            "versions": {table: versions.get(table) for table in tables},
+            "tables": tables,
+            "expires_at": time.monotonic() + ttl,
+            "size": size,
+        }
+        _stats["bytes"] += size
+        while len(_entries) > MAX_ENTRIES or _stats["bytes"] > MAX_BYTES:
+            _evict(next(iter(_entries)), "evictions")
+    return encoded
+
+
+def _row_count(value):
+    """Rows in a read function's result: a list of rows, or (rows, cursor)."""
+    if isinstance(value, tuple) and value and isinstance(value[0], list):
+        value = value[0]
+    return len(value) if isinstance(value, list) else 1
+
+
+def cached(*tables, ttl=DEFAULT_TTL_SECONDS):
+    """Cache a read function's results, invalidated by writes to ``tables``.
+
+    Misses are timed as ``db.<function>`` and counted with the rows and
+    bytes they returned (see instrumentation.py).
+    """
+    def decorator(func):
+        operation = f"db.{func.__name__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__module__, func.__qualname__, repr(args), repr(sorted(kwargs.items())))
+            entry = _lookup(key)
+            if entry is not None:
+                with _lock:
+                    _stats["hits"] += 1
+                return _decode(entry["value"])
+
+            with _lock:
+                _stats["misses"] += 1
+            # Snapshot versions before reading so a concurrent write is not missed
+            versions = _table_versions()
+            with instrumentation.timer(operation):
+                value = func(*args, **kwargs)
+            encoded = _store(key, value, tables, ttl, versions)
+            if instrumentation.ENABLED:
+                instrumentation.count(f"{operation}.queries")
+                instrumentation.count(f"{operation}.rows", _row_count(value))
+                instrumentation.count(f"{operation}.bytes", _size(encoded))
+            # Hits and misses hand back the same shape of result
+            return _decode(encoded)
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+def invalidate(*tables):
+    """Drop cached results that read any of the given tables (all if none given)."""
+    with _lock:
+        for key, entry in list(_entries.items()):
+            if not tables or set(entry["tables"]) & set(tables):
+                _evict(key, "invalidations")
+        _versions["checked_at"] = 0.0
+
+
+def cache_stats():
+    """Hit ratio, entry count and approximate memory footprint of the cache."""
+    with _lock:
+        stats = dict(_stats)
+        stats["entries"] = len(_entries)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
@@ -1,106 +1,646 @@
 """
 Week 8: Database Functions
 """
-import sqlite3
-from pathlib import Path
+import re
+import time
 
-DB_PATH = Path("DATA") / "intelligence_platform.db"
+from app import instrumentation
+from app.data.cache import cached
+from app.data.labels import LABEL_COLUMNS
+from app.data.migrations import migrate
+from app.data.pool import DB_PATH, get_connection, open_connection
+from app.data.search_index import fts_query, index_for
 
 def connect_database():
-    """Create a connection to the SQLite database."""
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.execute("PRAGMA foreign_keys = ON")
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Create a standalone connection to the SQLite database.
+
+    App code should prefer ``get_connection()``, which reuses a pooled
+    per-thread connection; this is kept for one-off scripts such as setup.py.
+    """
+    return open_connection()
 
 def create_tables():
-    """Create all required tables if they don't exist."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    
-    # Users table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            role TEXT DEFAULT 'user',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Cyber incidents table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS cyber_incidents (
-            incident_id INTEGER PRIMARY KEY,
-            timestamp TEXT,
-            severity TEXT,
-            category TEXT,
-            status TEXT,
-            description TEXT
-        )
-    """)
-    
-    # Datasets metadata table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS datasets_metadata (
-            dataset_id INTEGER PRIMARY KEY,
-            name TEXT,
-            rows INTEGER,
-            columns INTEGER,
-            uploaded_by TEXT,
-            upload_date TEXT
-        )
-    """)
-    
-    # IT tickets table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS it_tickets (
-            ticket_id INTEGER PRIMARY KEY,
-            priority TEXT,
-            description TEXT,
-            status TEXT,
-            assigned_to TEXT,
-            created_at TEXT,
-            resolution_time_hours INTEGER
-        )
-    """)
-    
-    conn.commit()
-    conn.close()
+    """Create all required tables if they don't exist.
+
+    Tables, typed columns and indexes are defined as versioned steps in
+    app/data/migrations.py; this applies whichever ones are pending.
+    """
+    return migrate()
 
+@cached("users")
 def get_all_users():
     """Get all users from database."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users")
-    users = cursor.fetchall()
-    conn.close()
+    with get_connection() as conn:
+        users = conn.execute("SELECT * FROM users").fetchall()
     return users
 
+@cached("users")
+def get_user_role(username):
+    """A user's role ('user', 'admin', ...), or None if there is no such user."""
+    with get_connection() as conn:
+        row = conn.execute("SELECT role FROM users WHERE username = ?", (username,)).fetchone()
+    return row["role"] if row else None
+
+@cached("cyber_incidents")
 def get_all_incidents():
     """Get all cyber incidents."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM cyber_incidents ORDER BY timestamp DESC")
-    incidents = cursor.fetchall()
-    conn.close()
+    with get_connection() as conn:
+        incidents = conn.execute("SELECT * FROM cyber_incidents ORDER BY timestamp DESC").fetchall()
     return incidents
 
+@cached("datasets_metadata")
 def get_all_datasets():
     """Get all datasets metadata."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM datasets_metadata ORDER BY dataset_id DESC")
-    datasets = cursor.fetchall()
-    conn.close()
+    with get_connection() as conn:
+        datasets = conn.execute("SELECT * FROM datasets_metadata ORDER BY dataset_id DESC").fetchall()
     return datasets
 
+@cached("it_tickets")
 def get_all_tickets():
     """Get all IT tickets."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM it_tickets ORDER BY ticket_id DESC")
-    tickets = cursor.fetchall()
-    conn.close()
+    with get_connection() as conn:
+        tickets = conn.execute("SELECT * FROM it_tickets ORDER BY ticket_id DESC").fetchall()
     return tickets
+
+# Query layer
+# Filtering, sorting and keyset pagination pushed into SQL so the Dashboard
+# only fetches the rows it is about to display.
+
+TABLES = {
+    "cyber_incidents": {
+        "key": "incident_id",
+        "columns": ("incident_id", "timestamp", "severity", "category", "status", "description"),
+        "date_column": "timestamp",
+        "typed": {"timestamp": "timestamp_epoch"},
+        "filters": ("severity", "status", "category"),
+        "sortable": ("incident_id", "timestamp", "severity", "category", "status"),
+    },
+    "it_tickets": {
+        "key": "ticket_id",
+        "columns": ("ticket_id", "priority", "description", "status", "assigned_to",
+                    "created_at", "resolution_time_hours"),
+        "date_column": "created_at",
+        "typed": {"created_at": "created_at_epoch"},
+        "filters": ("priority", "status", "assigned_to"),
+        "sortable": ("ticket_id", "created_at", "priority", "status",
+                     "assigned_to", "resolution_time_hours"),
+    },
+}
+
+# Text timestamps are compared through their integer epoch column so the
+# timestamp indexes can be used; the parameter is converted the same way as
+# the generated column (see migrations._add_typed_timestamps).
+EPOCH_PARAM = "COALESCE(CAST(strftime('%s', ?) AS INTEGER), 0)"
+
+def _table_spec(table):
+    """Look up a queryable table, rejecting anything not whitelisted."""
+    if table not in TABLES:
+        raise ValueError(f"Unknown table: {table}")
+    return TABLES[table]
+
+def _where_clause(table, filters=None, date_from=None, date_to=None):
+    """Build a WHERE clause and parameters from Dashboard filters.
+
+    Each filter value may be a single value or a list of accepted values;
+    empty values are ignored. Dates are inclusive 'YYYY-MM-DD' strings or
+    date objects.
+    """
+    spec = _table_spec(table)
+    clauses, params = [], []
+
+    for column, value in (filters or {}).items():
+        if column not in spec["filters"]:
+            raise ValueError(f"Cannot filter {table} by {column}")
+        if value is None or value == "" or value == [] or value == ():
+            continue
+        if isinstance(value, (list, tuple, set)):
+            values = list(value)
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        else:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+
+    date_column = spec["typed"][spec["date_column"]]
+    if date_from:
+        clauses.append(f"{date_column} >= {EPOCH_PARAM}")
+        params.append(str(date_from))
+    if date_to:
+        # Inclusive end date: everything before the start of the next day
+        clauses.append(f"{date_column} < CAST(strftime('%s', ?, '+1 day') AS INTEGER)")
+        params.append(str(date_to))
+
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return where, params
+
+def _keyset_clause(sort_by, key, descending, after, placeholder="?", nullable=True):
+    """Build the condition selecting rows after the cursor (sort_value, key).
+
+    The row-value comparison lets SQLite seek straight to the cursor in the
+    sort column's index (the integer key is the index's implicit last column).
+    NULL sort values come last when descending and first when ascending,
+    matching SQLite's ORDER BY, so they are paged through as well.
+    """
+    sort_value, key_value = after
+    op = "<" if descending else ">"
+    if sort_by == key:
+        return f"{key} {op} ?", [key_value]
+    if sort_value is None and nullable:
+        clause = f"({sort_by} IS NULL AND {key} {op} ?)"
+        if not descending:
+            clause = f"({clause} OR {sort_by} IS NOT NULL)"
+        return clause, [key_value]
+    clause = f"({sort_by}, {key}) {op} ({placeholder}, ?)"
+    if descending and nullable:
+        clause = f"({clause} OR {sort_by} IS NULL)"
+    return clause, [sort_value, key_value]
+
+def _page_sql(table, filters=None, date_from=None, date_to=None,
+              sort_by=None, descending=True, page_size=50, after=None, select=None):
+    """Build the SELECT for one page of query_rows() (``select`` replaces the column list)."""
+    spec = _table_spec(table)
+    key = spec["key"]
+    sort_by = sort_by or spec["date_column"]
+    if sort_by not in spec["sortable"]:
+        raise ValueError(f"Cannot sort {table} by {sort_by}")
+    typed = sort_by in spec["typed"]
+    order_column = spec["typed"].get(sort_by, sort_by)
+    placeholder = EPOCH_PARAM if typed else "?"
+
+    where, params = _where_clause(table, filters, date_from, date_to)
+    if after is not None:
+        condition, extra = _keyset_clause(order_column, key, descending, after,
+                                         placeholder, nullable=not typed)
+        where = f"{where} AND {condition}" if where else f" WHERE {condition}"
+        params.extend(extra)
+
+    direction = "DESC" if descending else "ASC"
+    if order_column == key:
+        order = f"{key} {direction}"
+    else:
+        order = f"{order_column} {direction}, {key} {direction}"
+    columns = select or ", ".join(spec["columns"])
+    sql = f"SELECT {columns} FROM {table}{where} ORDER BY {order} LIMIT ?"
+    params.append(page_size + 1)
+    return sql, params
+
+@cached("cyber_incidents", "it_tickets")
+def query_rows(table, filters=None, date_from=None, date_to=None,
+               sort_by=None, descending=True, page_size=50, after=None):
+    """Fetch one page of a table with filters and sorting done in SQL.
+
+    Pagination is keyset-based: pass the ``next_cursor`` returned for the
+    previous page as ``after`` to get the following one. Returns
+    ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+    """
+    spec = _table_spec(table)
+    sort_by = sort_by or spec["date_column"]
+    sql, params = _page_sql(table, filters, date_from, date_to,
+                            sort_by, descending, page_size, after)
+    with get_connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = (last[sort_by], last[spec["key"]])
+    return rows, next_cursor
+
+@cached("cyber_incidents", "it_tickets")
+def count_rows(table, filters=None, date_from=None, date_to=None):
+    """Count the rows matching the given filters."""
+    where, params = _where_clause(table, filters, date_from, date_to)
+    with get_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+
+@cached("cyber_incidents", "it_tickets")
+def count_by(table, column, filters=None, date_from=None, date_to=None):
+    """Count matching rows grouped by one filterable column."""
+    if column not in _table_spec(table)["filters"]:
+        raise ValueError(f"Cannot group {table} by {column}")
+    where, params = _where_clause(table, filters, date_from, date_to)
+    sql = f"SELECT {column} AS value, COUNT(*) AS count FROM {table}{where} GROUP BY {column} ORDER BY count DESC"
+    with get_connection() as conn:
+        return conn.execute(sql, params).fetchall()
+
+@cached("cyber_incidents", "it_tickets")
+def distinct_values(table, column):
+    """List the distinct values of a filterable column (for filter widgets)."""
+    if column not in _table_spec(table)["filters"]:
+        raise ValueError(f"Cannot list values of {table}.{column}")
+    sql = f"SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL ORDER BY {column}"
+    with get_connection() as conn:
+        return [row[0] for row in conn.execute(sql).fetchall()]
+
+# Search
+# Ranked full-text search over descriptions and labels, answered by the FTS5
+# indexes in app/data/search_index.py rather than a LIKE '%...%' scan. Results
+# are ordered by bm25 relevance; snippets are only built for the page shown.
+
+SNIPPET_TOKENS = 16
+
+def _search_sql(table, text, filters=None, date_from=None, date_to=None, ranked=True):
+    """Build the id query behind search_rows() and count_matches().
+
+    Returns (None, []) if the text has no searchable terms. Ranked queries
+    also select the bm25 score and order by it.
+    """
+    query = fts_query(text, match_all=True)
+    if query is None:
+        return None, []
+    name, _ = index_for(table)
+    key = _table_spec(table)["key"]
+    where, params = _where_clause(table, filters, date_from, date_to)
+    score = f", bm25({name}) AS score" if ranked else ""
+    matches = f"SELECT rowid AS match_id{score} FROM {name} WHERE {name} MATCH ?"
+    order = " ORDER BY score, match_id" if ranked else ""
+    if not where:
+        return f"{matches}{order}", [query]
+    return (f"SELECT m.* FROM ({matches}) AS m "
+            f"JOIN {table} ON {table}.{key} = m.match_id{where}{order}"), [query] + params
+
+@cached("cyber_incidents", "it_tickets")
+def search_rows(table, text, filters=None, date_from=None, date_to=None,
+                page_size=50, after=None, highlight=("**", "**")):
+    """Full-text search a table, best matches first, one page at a time.
+
+    Every word in ``text`` must match; a word typed with a trailing * also
+    matches as a prefix ("phish*" finds "phishing"). Each row gets a
+    ``snippet`` of its description with the matches wrapped in ``highlight``
+    markers, and its bm25 ``score`` (lower is better).
+    Returns ``(rows, next_cursor)`` like query_rows(); pass ``next_cursor``
+    back as ``after`` for the next page.
+    """
+    spec = _table_spec(table)
+    sql, params = _search_sql(table, text, filters, date_from, date_to)
+    if sql is None:
+        return [], None
+    offset = after or 0
+    name, _ = index_for(table)
+    with get_connection() as conn:
+        page = conn.execute(f"{sql} LIMIT ? OFFSET ?", params + [page_size + 1, offset]).fetchall()
+        next_cursor = offset + page_size if len(page) > page_size else None
+        page = page[:page_size]
+        if not page:
+            return [], None
+        ids = [row[0] for row in page]
+        marks = ", ".join("?" * len(ids))
+        rows = {row[spec["key"]]: dict(row) for row in conn.execute(
+            f"SELECT {', '.join(spec['columns'])} FROM {table} WHERE {spec['key']} IN ({marks})", ids)}
+        snippets = dict(conn.execute(
+            f"SELECT rowid, snippet({name}, 0, ?, ?, '…', {SNIPPET_TOKENS}) FROM {name} "
+            f"WHERE {name} MATCH ? AND rowid IN ({marks})",
+            [highlight[0], highlight[1], params[0]] + ids).fetchall())
+    results = []
+    for match_id, score in page:
+        row = rows.get(match_id)
+        if row is not None:
+            row["snippet"] = snippets.get(match_id) or row["description"]
+            row["score"] = score
+            results.append(row)
+    return results, next_cursor
+
+@cached("cyber_incidents", "it_tickets")
+def count_matches(table, text, filters=None, date_from=None, date_to=None):
+    """Count the rows search_rows() would return over all pages."""
+    sql, params = _search_sql(table, text, filters, date_from, date_to, ranked=False)
+    if sql is None:
+        return 0
+    with get_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
+
+# Aggregates
+# Dashboard metric tiles and charts. The counts come from the trigger-maintained
+# rollup tables (app/data/rollups.py), so reading them costs one pass over the
+# group rows rather than the source table. Labels are normalized at ingest
+# (app/data/labels.py), so exact comparisons such as severity = 'High' are enough.
+
+SUMMARY_COLUMNS = {
+    "cyber_incidents": ("incident_rollup", ("severity", "status", "category")),
+    "it_tickets": ("ticket_rollup", ("priority", "status", "assigned_to")),
+}
+
+def _summary_sql(table):
+    """Build the query behind table_summary()."""
+    rollup, columns = SUMMARY_COLUMNS[table]
+    columns = ", ".join(columns)
+    return f"SELECT {columns}, SUM(count) AS count FROM {rollup} GROUP BY {columns}"
+
+@cached("cyber_incidents", "it_tickets")
+def table_summary(table):
+    """Counts for a table grouped by each of its summary columns.
+
+    Returns a dict with ``total`` and one ``by_<column>`` mapping of
+    value -> count per summary column, e.g. ``summary["by_severity"]["High"]``.
+    Missing values are reported under None.
+    """
+    if table not in SUMMARY_COLUMNS:
+        raise ValueError(f"No summary defined for {table}")
+    columns = SUMMARY_COLUMNS[table][1]
+    with get_connection() as conn:
+        groups = conn.execute(_summary_sql(table)).fetchall()
+
+    summary = {"total": 0}
+    for column in columns:
+        summary[f"by_{column}"] = {}
+    for group in groups:
+        summary["total"] += group["count"]
+        for column in columns:
+            counts = summary[f"by_{column}"]
+            value = group[column] or None  # rollups store NULL as ''
+            counts[value] = counts.get(value, 0) + group["count"]
+    return summary
+
+def incident_summary():
+    """Incident counts by severity, status and category."""
+    return table_summary("cyber_incidents")
+
+@cached("it_tickets")
+def ticket_summary():
+    """Ticket counts by priority, status and assignee, plus average resolution time.
+
+    ``avg_resolution_hours`` is the overall mean and
+    ``avg_resolution_by_assigned_to`` the mean per assignee (None when an
+    assignee has no resolved tickets); ``resolution_by_assigned_to`` holds
+    the (hours, resolved tickets) totals behind them.
+    """
+    summary = table_summary.uncached("it_tickets")   # cached as part of this result
+    with get_connection() as conn:
+        rows = conn.execute("""
+            SELECT assigned_to, SUM(resolution_hours_sum) AS hours, SUM(resolution_count) AS n
+            FROM ticket_rollup GROUP BY assigned_to
+        """).fetchall()
+    hours = sum(row["hours"] for row in rows)
+    resolved = sum(row["n"] for row in rows)
+    summary["avg_resolution_hours"] = hours / resolved if resolved else None
+    summary["avg_resolution_by_assigned_to"] = {
+        (row["assigned_to"] or None): (row["hours"] / row["n"] if row["n"] else None)
+        for row in rows
+    }
+    summary["resolution_by_assigned_to"] = {(row["assigned_to"] or None): (row["hours"], row["n"]) for row in rows}
+    return summary
+
+@cached("datasets_metadata")
+def dataset_totals():
+    """Number of datasets and the sum of their rows and columns."""
+    with get_connection() as conn:
+        row = conn.execute("""
+            SELECT COUNT(*) AS datasets,
+                   COALESCE(SUM(rows), 0) AS total_rows,
+                   COALESCE(SUM(columns), 0) AS total_columns
+            FROM datasets_metadata
+        """).fetchone()
+    return dict(row)
+
+# DataFrames
+# Whole-table and filtered reads straight into typed columns. Rows are pulled
+# with fetchmany into one preallocated array per column instead of a dict per
+# row, labels become categoricals over their known vocabulary (one small code
+# per row), and dates are built from the integer epoch columns as datetime64
+# without parsing any text. pandas and numpy are imported on first use.
+
+FRAME_BATCH_ROWS = 10000
+FRAME_KINDS = ("int", "float", "category", "datetime", "text")
+
+def fetch_frame(sql, params=(), kinds=None, categories=None, expected_rows=None,
+                batch_size=FRAME_BATCH_ROWS):
+    """Run a query and build a DataFrame column by column.
+
+    ``kinds`` maps column names to one of FRAME_KINDS (default "text"):
+    "int" and "float" become numeric arrays (nullable Int64 when an int
+    column has NULLs), "category" a pandas Categorical whose categories start
+    with ``categories[column]`` in that order, and "datetime" expects Unix
+    epoch seconds and becomes datetime64. ``expected_rows`` sizes the arrays
+    up front; they grow if more rows arrive.
+
+    The frame's ``attrs`` hold ``memory_bytes`` (see frame_memory()) and
+    ``build_ms``.
+    """
+    import numpy as np
+    import pandas as pd
+
+    kinds, categories = kinds or {}, categories or {}
+    with instrumentation.timer("db.fetch_frame"), get_connection() as conn:
+        started = time.perf_counter()
+        cursor = conn.cursor()
+        cursor.row_factory = None   # plain tuples; building sqlite3.Row objects costs more than the SQL
+        cursor.execute(sql, params)
+        names = [d[0] for d in cursor.description]
+        for name in names:
+            if kinds.get(name, "text") not in FRAME_KINDS:
+                raise ValueError(f"Unknown column kind for {name}: {kinds[name]}")
+        column_kinds = [kinds.get(name, "text") for name in names]
+        # Numbers and epochs are filled as float64 so NULLs can be held as NaN
+        storage = {"int": np.float64, "float": np.float64, "datetime": np.float64,
+                   "category": object, "text": object}
+        capacity = max(expected_rows or batch_size, 1)
+        arrays = [np.empty(capacity, dtype=storage[kind]) for kind in column_kinds]
+
+        filled = 0
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            end = filled + len(rows)
+            if end > capacity:
+                capacity = max(end, capacity * 2)
+                for i, array in enumerate(arrays):
+                    grown = np.empty(capacity, dtype=array.dtype)
+                    grown[:filled] = array[:filled]
+                    arrays[i] = grown
+            for array, values in zip(arrays, zip(*rows)):
+                array[filled:end] = values
+            filled = end
+
+    columns = {name: _typed_column(array[:filled], kind, categories.get(name, ()))
+               for name, array, kind in zip(names, arrays, column_kinds)}
+    frame = pd.DataFrame(columns, copy=False)
+    frame.attrs["build_ms"] = (time.perf_counter() - started) * 1000
+    frame.attrs["memory_bytes"] = frame_memory(frame)["total"]
+    instrumentation.count("db.fetch_frame.rows", filled)
+    instrumentation.count("db.fetch_frame.bytes", frame.attrs["memory_bytes"])
+    return frame
+
+def _typed_column(array, kind, known=()):
+    """A fetch_frame() column from its filled array (float64 for numbers and epochs, else object)."""
+    import numpy as np
+    import pandas as pd
+
+    if kind == "category":
+        # Known labels first, in their given order, then any others found
+        known = list(known)
+        values = pd.Categorical(array)
+        return values.set_categories(known + [value for value in values.categories if value not in known])
+    if kind == "datetime":
+        return pd.to_datetime(array, unit="s")
+    if kind == "int":
+        missing = np.isnan(array)
+        values = np.where(missing, 0, array).astype(np.int64)
+        return pd.arrays.IntegerArray(values, missing) if missing.any() else values
+    return array
+
+def frame_memory(frame):
+    """Bytes held by each column of a DataFrame (strings included) and in ``total``."""
+    usage = frame.memory_usage(deep=True, index=True)
+    memory = {str(name): int(size) for name, size in usage.items()}
+    memory["total"] = int(usage.sum())
+    return memory
+
+def _frame_spec(table):
+    """Column kinds and known categories of a Dashboard table."""
+    spec = _table_spec(table)
+    kinds = {spec["key"]: "int", spec["date_column"]: "datetime", "resolution_time_hours": "float",
+             "assigned_to": "category"}
+    labels = LABEL_COLUMNS.get(table, {})
+    kinds.update({column: "category" for column in labels})
+    return kinds, labels
+
+def _frame_select(spec, columns):
+    """SELECT list reading the date column from its epoch copy (missing dates as NULL, so NaT)."""
+    return ", ".join(f"NULLIF({spec['typed'][c]}, 0) AS {c}" if c in spec["typed"] else c for c in columns)
+
+def _cursor_value(value):
+    """A frame cell as a keyset cursor value (see _keyset_clause())."""
+    import pandas as pd
+
+    if pd.isna(value):
+        return None   # a missing date pages as epoch 0, like the column
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return value.item() if hasattr(value, "item") else value
+
+@cached("cyber_incidents", "it_tickets")
+def page_frame(table, filters=None, date_from=None, date_to=None,
+               sort_by=None, descending=True, page_size=50, after=None):
+    """One page as query_rows() returns it, but as a typed DataFrame.
+
+    Labels are categoricals and the date column is datetime64 (see
+    fetch_frame()). Returns ``(frame, next_cursor)``; the cursor works with
+    query_rows() too.
+    """
+    spec = _table_spec(table)
+    sort_by = sort_by or spec["date_column"]
+    sql, params = _page_sql(table, filters, date_from, date_to, sort_by, descending, page_size, after,
+                            select=_frame_select(spec, spec["columns"]))
+    kinds, labels = _frame_spec(table)
+    frame = fetch_frame(sql, params, kinds, labels, expected_rows=page_size + 1)
+    next_cursor = None
+    if len(frame) > page_size:
+        frame = frame.iloc[:page_size]
+        next_cursor = (_cursor_value(frame[sort_by].iloc[-1]), int(frame[spec["key"]].iloc[-1]))
+    return frame, next_cursor
+
+def rows_frame(table, rows):
+    """Rows already in memory (dicts with the table's columns) typed as page_frame() would."""
+    import numpy as np
+    import pandas as pd
+
+    spec = _table_spec(table)
+    kinds, labels = _frame_spec(table)
+    columns = {}
+    for name in spec["columns"]:
+        values = [row[name] for row in rows]
+        kind = kinds.get(name, "text")
+        if name in spec["typed"]:
+            parsed = pd.to_datetime(pd.Series(values, dtype=object), format="ISO8601", errors="coerce")
+            epochs = (parsed - pd.Timestamp(0)) / pd.Timedelta(seconds=1)
+            columns[name] = _typed_column(epochs.to_numpy(dtype=np.float64, na_value=np.nan), "datetime")
+        elif kind in ("int", "float"):
+            array = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+            columns[name] = _typed_column(array, kind)
+        else:
+            columns[name] = _typed_column(np.array(values, dtype=object), kind, labels.get(name, ()))
+    return pd.DataFrame(columns)
+
+def table_frame(table, columns=None, filters=None, date_from=None, date_to=None, limit=None):
+    """A Dashboard table (or the rows matching its filters) as a typed DataFrame.
+
+    ``columns`` picks a subset of the table's columns; the date column is
+    read from its integer epoch copy (missing dates become NaT). With a
+    ``limit`` the newest rows are returned, newest first (through the date
+    index); without one rows come in descending key order, which SQLite can
+    read without sorting.
+    """
+    spec = _table_spec(table)
+    columns = list(columns or spec["columns"])
+    for column in columns:
+        if column not in spec["columns"]:
+            raise ValueError(f"Unknown column {table}.{column}")
+    kinds, labels = _frame_spec(table)
+    select = _frame_select(spec, columns)
+    where, params = _where_clause(table, filters, date_from, date_to)
+    sql = f"SELECT {select} FROM {table}{where}"
+    expected = count_rows(table, filters, date_from, date_to)
+    if limit is None:
+        sql += f" ORDER BY {spec['key']} DESC"
+    else:
+        sql += f" ORDER BY {spec['typed'][spec['date_column']]} DESC, {spec['key']} DESC LIMIT ?"
+        params.append(limit)
+        expected = min(expected, limit)
+    return fetch_frame(sql, params, kinds, labels, expected_rows=expected)
+
+@cached("datasets_metadata")
+def datasets_frame():
+    """Every dataset's metadata as a typed DataFrame, newest first."""
+    return fetch_frame(
+        "SELECT * FROM datasets_metadata ORDER BY dataset_id DESC",
+        kinds={"dataset_id": "int", "rows": "int", "columns": "int", "uploaded_by": "category"},
+    )
+
+def dashboard_queries():
+    """The statements the Dashboard issues, as (name, sql, params, paged) tuples."""
+    queries = []
+    for table, spec in TABLES.items():
+        def page(name, **options):
+            sql, params = _page_sql(table, **options)
+            queries.append((f"{table}: {name}", sql, params, True))
+
+        page(f"first page by {spec['date_column']}")
+        page(f"next page by {spec['date_column']}", after=("2024-06-01 00:00:00", 0))
+        page("date range", date_from="2024-01-01", date_to="2024-03-31")
+        for column in spec["filters"]:
+            page(f"filter by {column}", filters={column: "x"})
+            page(f"filter by several {column} values", filters={column: ["x", "y"]},
+                 date_from="2024-01-01", date_to="2024-03-31")
+            queries.append((f"{table}: count by {column}",
+                            f"SELECT {column} AS value, COUNT(*) AS count FROM {table} GROUP BY {column}", [], False))
+        first, second = spec["filters"][:2]
+        page(f"filter by {first} and {second} values", filters={first: ["x", "y"], second: ["z", "w"]},
+             date_from="2024-01-01")
+        queries.append((f"{table}: summary", _summary_sql(table), [], False))
+    return queries
+
+# An IN list on the leading column of a (filter, date) index: each value's
+# rows come out in date order, and SQLite's top-N sorter stops reading a value
+# once it is past the page, so the sort handles a page per value, not every match.
+_BOUNDED_SORT = re.compile(r"^SEARCH \w+ USING (?:COVERING )?INDEX idx_\w+_date \(\w+=\?")
+
+def plan_problem(plan, paged):
+    """Why a query plan is too slow for the Dashboard, or None if it is fine.
+
+    Reading cyber_incidents or it_tickets without any index is a full scan.
+    A paged query must also not sort all of its matches in a temporary
+    B-tree. Scans of the small rollup tables are expected and not flagged.
+    """
+    for line in plan:
+        if line.startswith("SCAN ") and line.split()[1] in TABLES and " USING " not in line:
+            return "full scan"
+    if paged and any("USE TEMP B-TREE" in line for line in plan):
+        searches = [line for line in plan if line.startswith(("SEARCH ", "SCAN "))]
+        if not all(_BOUNDED_SORT.match(line) for line in searches):
+            return "sort"
+    return None
+
+def explain_dashboard_queries():
+    """Run EXPLAIN QUERY PLAN on every Dashboard query.
+
+    Returns (name, plan_lines, problem) tuples; problem is plan_problem()'s
+    verdict.
+    """
+    results = []
+    with get_connection() as conn:
+        for name, sql, params, paged in dashboard_queries():
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+            results.append((name, plan, plan_problem(plan, paged)))
+    return results
@@ -0,0 +1,272 @@
+"""
+CSV Ingest
+Streams CSV exports into the platform tables in bounded memory.
+
+Rows are read with the csv module a chunk at a time, coerced to the column
+types, and written with one executemany per chunk inside a single
+transaction. Existing rows are upserted on their primary key (incident_id,
+ticket_id, dataset_id), so re-running a load never duplicates data.
+
+Progress is checkpointed in the ingest_checkpoints table in the same
+transaction as each chunk; an interrupted load resumes after the last
+committed chunk as long as the file has not changed, and a file that was
+already loaded in full is not read again.
+
+Usage:
+    python -m app.data.ingest                       # load the three DATA/ files
+    python -m app.data.ingest FILE TABLE [--chunk-size N] [--restart]
+"""
+import argparse
+import csv
+import os
+import time
+from datetime import datetime
+from itertools import islice
+
+from app.data.cache import invalidate
+from app.data.labels import normalize_label
+from app.data.pool import get_connection
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def to_int(value):
+    """Parse an integer column; blanks and junk become None."""
+    if value is None or not str(value).strip():
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+def to_text(value):
+    """Strip a text column; blanks become None."""
+    if value is None:
+        return None
+    value = value.strip()
+    return value or None
+
+
+def to_timestamp(value):
+    """Normalize a timestamp to 'YYYY-MM-DD HH:MM:SS' so text order is time order.
+
+    Values that cannot be parsed are kept as given (stripped).
+    """
+    value = to_text(value)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value).isoformat(sep=" ")
+    except ValueError:
+        return value
+
+
+def to_date(value):
+    """Normalize a date column to 'YYYY-MM-DD'."""
+    value = to_text(value)
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value).date().isoformat()
+    except ValueError:
+        return value
+
+
+def to_label(value):
+    """Canonical label spelling (see labels.py)."""
+    return normalize_label(to_text(value))
+
+
+# Column converters per table, in table order; the first column is the key
+TABLE_COLUMNS = {
+    "cyber_incidents": {
+        "incident_id": to_int,
+        "timestamp": to_timestamp,
+        "severity": to_label,
+        "category": to_label,
+        "status": to_label,
+        "description": to_text,
+    },
+    "datasets_metadata": {
+        "dataset_id": to_int,
+        "name": to_text,
+        "rows": to_int,
+        "columns": to_int,
+        "uploaded_by": to_text,
+        "upload_date": to_date,
+    },
+    "it_tickets": {
+        "ticket_id": to_int,
+        "priority": to_label,
+        "description": to_text,
+        "status": to_label,
+        "assigned_to": to_text,
+        "created_at": to_timestamp,
+        "resolution_time_hours": to_int,
+    },
+}
+
+PLATFORM_FILES = [
+    ("DATA/cyber_incidents.csv", "cyber_incidents"),
+    ("DATA/datasets_metadata.csv", "datasets_metadata"),
+    ("DATA/it_tickets.csv", "it_tickets"),
+]
+
+
+def _table_columns(table):
+    """Return the converter mapping for a table, rejecting unknown tables."""
+    if table not in TABLE_COLUMNS:
+        raise ValueError(f"Cannot ingest into unknown table: {table}")
+    return TABLE_COLUMNS[table]
+
+
+def upsert_sql(table):
+    """INSERT ... ON CONFLICT DO UPDATE for a table.
+
+    Rows whose values are unchanged are left alone, so re-loading the same
+    file does not fire the update triggers.
+    """
+    columns = list(_table_columns(table))
+    key, others = columns[0], columns[1:]
+    updates = ", ".join(f"{c} = excluded.{c}" for c in others)
+    changed = " OR ".join(f"{c} IS NOT excluded.{c}" for c in others)
+    return (f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT ({key}) DO UPDATE SET {updates} WHERE {changed}")
+
+
+def header_converters(table, header):
+    """Map CSV header positions onto the table's converters, in table order."""
+    columns = _table_columns(table)
+    positions = {name.strip(): i for i, name in enumerate(header)}
+    missing = [c for c in columns if c not in positions]
+    if missing:
+        raise ValueError(f"CSV is missing columns for {table}: {', '.join(missing)}")
+    return [(positions[c], convert) for c, convert in columns.items()]
+
+
+def coerce_records(converters, records):
+    """Convert raw CSV records into parameter tuples, dropping rows without a key."""
+    rows = []
+    for record in records:
+        row = tuple(convert(record[i]) if i < len(record) else None for i, convert in converters)
+        if row[0] is not None:
+            rows.append(row)
+    return rows
+
+
+def _file_signature(path):
+    """Size and mtime, used to tell whether a checkpoint still applies."""
+    stat = os.stat(path)
+    return stat.st_size, int(stat.st_mtime)
+
+
+def _load_checkpoint(conn, source, signature):
+    """(rows already committed, whether the load finished) for this file; (0, False) if it changed or is new."""
+    row = conn.execute(
+        "SELECT file_size, file_mtime, rows_done, completed FROM ingest_checkpoints WHERE source = ?",
+        (source,),
+    ).fetchone()
+    if row and (row["file_size"], row["file_mtime"]) == signature:
+        return row["rows_done"], bool(row["completed"])
+    return 0, False
+
+
+def _save_checkpoint(conn, source, table, signature, rows_done, completed):
+    """Record progress for a file (call inside the chunk's transaction)."""
+    conn.execute("""
+        INSERT INTO ingest_checkpoints
+            (source, table_name, file_size, file_mtime, rows_done, completed, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (source) DO UPDATE SET
+            table_name = excluded.table_name, file_size = excluded.file_size,
+            file_mtime = excluded.file_mtime, rows_done = excluded.rows_done,
+            completed = excluded.completed, updated_at = excluded.updated_at
+    """, (source, table, signature[0], signature[1], rows_done, int(completed),
+          datetime.now().isoformat(timespec="seconds")))
+
+
+def load_csv(path, table, chunk_size=DEFAULT_CHUNK_SIZE, resume=True, progress=None):
+    """Stream one CSV file into a table.
+
+    Returns a dict with rows written, rows skipped by the checkpoint, elapsed
+    seconds and rows per second. ``progress`` is called as
+    progress(rows_done) after each committed chunk. If the checkpoint shows
+    the unchanged file was already loaded in full, nothing is read and every
+    row counts as skipped.
+    """
+    source = os.path.abspath(path)
+    signature = _file_signature(path)
+    sql = upsert_sql(table)
+    started = time.perf_counter()
+    written = 0
+
+    with get_connection() as conn:
+        skip, completed = _load_checkpoint(conn, source, signature) if resume else (0, False)
+    if completed:
+        return {"table": table, "rows": 0, "skipped": skip,
+                "seconds": time.perf_counter() - started, "rows_per_second": 0.0}
+
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        converters = header_converters(table, next(reader))
+        records_done = skip
+        if skip:
+            for _ in islice(reader, skip):
+                pass
+
+        while True:
+            records = list(islice(reader, chunk_size))
+            if not records:
+                break
+            rows = coerce_records(converters, records)
+            records_done += len(records)
+            with get_connection() as conn:
+                conn.executemany(sql, rows)
+                _save_checkpoint(conn, source, table, signature, records_done, completed=False)
+            written += len(rows)
+            if progress:
+                progress(records_done)
+
+    with get_connection() as conn:
+        _save_checkpoint(conn, source, table, signature, records_done, completed=True)
+    invalidate(table)
+
+    seconds = time.perf_counter() - started
+    return {
+        "table": table,
+        "rows": written,
+        "skipped": skip,
+        "seconds": seconds,
+        "rows_per_second": written / seconds if seconds else 0.0,
+    }
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Stream CSV files into intelligence_platform.db")
+    parser.add_argument("file", nargs="?", help="CSV file to load (default: the three DATA/ files)")
+    parser.add_argument("table", nargs="?", choices=sorted(TABLE_COLUMNS), help="target table")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per transaction")
+    parser.add_argument("--restart", action="store_true", help="ignore checkpoints and load from the start")
+    args = parser.parse_args(argv)
+
+    if args.file and not args.table:
+        parser.error("a table is required when a file is given")
+    jobs = [(args.file, args.table)] if args.file else PLATFORM_FILES
+
+    from app.data.db import create_tables
+    create_tables()
+    for path, table in jobs:
+        result = load_csv(path, table, chunk_size=args.chunk_size, resume=not args.restart)
+        if result["skipped"] and not result["rows"]:
+            print(f"✓ {table} already loaded ({result['skipped']:,} rows)")
+            continue
+        note = f" (resumed after {result['skipped']:,})" if result["skipped"] else ""
+        print(f"✓ {result['rows']:,} rows into {table} in {result['seconds']:.2f}s "
+              f"({result['rows_per_second']:,.0f} rows/s){note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Label Normalization
+Canonical spellings for the low-cardinality text columns (severity, status,
+priority, category) so they can be compared with plain equality in SQL.
+"""
+
+SEVERITIES = ("Critical", "High", "Medium", "Low")
+PRIORITIES = ("Critical", "High", "Medium", "Low")
+STATUSES = ("Open", "In Progress", "Waiting for User", "Resolved", "Closed")
+CATEGORIES = ("Phishing", "Malware", "DDoS", "Unauthorized Access", "Misconfiguration")
+
+# Which vocabulary applies to each normalized column
+LABEL_COLUMNS = {
+    "cyber_incidents": {"severity": SEVERITIES, "status": STATUSES, "category": CATEGORIES},
+    "it_tickets": {"priority": PRIORITIES, "status": STATUSES},
+}
+
+_CANONICAL = {
+    label.lower(): label
+    for labels in (SEVERITIES, PRIORITIES, STATUSES, CATEGORIES)
+    for label in labels
+}
+
+def normalize_label(value):
+    """Return the canonical spelling of a label.
+
+    Known labels are matched case-insensitively ("HIGH", " high " -> "High");
+    unknown ones are only trimmed and have their inner whitespace collapsed.
+    Missing values stay None.
+    """
+    if value is None:
+        return None
+    text = " ".join(str(value).split())
+    if not text:
+        return None
+    return _CANONICAL.get(text.lower(), text)
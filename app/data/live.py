@@ -0,0 +1,207 @@
+"""
+Live Feeds
+The Dashboard's incident and ticket metrics and newest page of rows, kept
+current from the change log instead of being re-read on every refresh.
+
+Each process keeps one feed per table: the summary counts (db.table_summary
+and, for tickets, resolution totals) and the first page in the default
+order (newest first), plus the search_changes position it reflects (see
+search_index.py). poll() reads only the log entries after that cursor and
+the rows they name, then:
+
+- adds rows that were inserted since the cursor to the counts, and
+- merges every changed row into the page, dropping deleted ones.
+
+Only when a row that existed before the cursor was updated or deleted are
+the counts re-read, from the rollup tables (a pass over the group rows, not
+the table). The page is re-queried if a change leaves a gap in it. If the
+log was pruned past the cursor, or a bulk load changed more than
+MAX_MERGED_CHANGES rows, the feed is reloaded.
+
+Feeds are shared and replaced, never modified in place, so callers may hand
+them to other threads.
+"""
+import threading
+import time
+from functools import partial
+
+from app import instrumentation
+from app.data.db import SUMMARY_COLUMNS, TABLES, table_summary, ticket_summary
+from app.data.pool import get_connection
+from app.data.search_index import CHANGE_LOG_BOUNDS, MAX_LOGGED_CHANGES, prune_changes
+
+MAX_MERGED_CHANGES = 5000   # rows changed in one poll above which the feed is reloaded
+# Read past the query cache, whose version check may lag the change log
+SUMMARIES = {"cyber_incidents": partial(table_summary.uncached, "cyber_incidents"),
+             "it_tickets": ticket_summary.uncached}
+
+_lock = threading.Lock()
+_feeds = {}   # table -> {"seq", "page_size", "summary", "rows", "order", "has_more", "first_page", ...}
+
+
+def _spec(table):
+    """Query spec of a table with a live feed."""
+    if table not in SUMMARIES:
+        raise ValueError(f"No live feed for table: {table}")
+    return TABLES[table]
+
+
+def _select(spec):
+    """SELECT list: the Dashboard's columns, then the sort value."""
+    return ", ".join(spec["columns"]) + f", {spec['typed'][spec['date_column']]}"
+
+
+def _split(spec, rows):
+    """Rows as dicts of the Dashboard's columns, and their (epoch, key) sort keys."""
+    columns = spec["columns"]
+    items = [dict(zip(columns, row)) for row in rows]
+    return items, [(row[-1], item[spec["key"]]) for row, item in zip(rows, items)]
+
+
+def _fetch(conn, sql, params=()):
+    """Run a query returning plain tuples."""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return cursor.execute(sql, params).fetchall()
+
+
+def _page(conn, table, spec, page_size):
+    """The newest page_size rows, as query_rows() orders them by default."""
+    epoch = spec["typed"][spec["date_column"]]
+    rows = _fetch(conn, f"SELECT {_select(spec)} FROM {table} "
+                        f"ORDER BY {epoch} DESC, {spec['key']} DESC LIMIT ?", (page_size + 1,))
+    items, order = _split(spec, rows[:page_size])
+    return {"rows": items, "order": order, "has_more": len(rows) > page_size}
+
+
+def _publish(table, spec, feed):
+    """Fill in the fields read by the Dashboard and store the feed."""
+    rows = feed["rows"]
+    next_cursor = None
+    if feed["has_more"] and rows:
+        next_cursor = (rows[-1][spec["date_column"]], rows[-1][spec["key"]])
+    feed["first_page"] = (rows, next_cursor)
+    feed["polled_at"] = time.time()
+    _feeds[table] = feed
+    return feed
+
+
+def _load(conn, table, spec, page_size):
+    """Read a feed's counts and page in full."""
+    seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM search_changes").fetchone()[0]
+    feed = {"seq": seq, "page_size": page_size, "summary": SUMMARIES[table](),
+            "added": 0, "changed": 0}
+    feed.update(_page(conn, table, spec, page_size))
+    instrumentation.count("live.reloads")
+    return feed
+
+
+def _count(summary, table, items):
+    """A copy of a summary with newly inserted rows added to its counts."""
+    columns = SUMMARY_COLUMNS[table][1]
+    summary = dict(summary, **{f"by_{c}": dict(summary[f"by_{c}"]) for c in columns})
+    summary["total"] += len(items)
+    for item in items:
+        for column in columns:
+            counts, value = summary[f"by_{column}"], item[column] or None
+            counts[value] = counts.get(value, 0) + 1
+    if "resolution_by_assigned_to" in summary:
+        totals = dict(summary["resolution_by_assigned_to"])
+        for item in items:
+            hours, resolved = totals.get(item["assigned_to"] or None, (0, 0))
+            if item["resolution_time_hours"] is not None:
+                hours, resolved = hours + item["resolution_time_hours"], resolved + 1
+            totals[item["assigned_to"] or None] = (hours, resolved)
+        hours = sum(h for h, _ in totals.values())
+        resolved = sum(n for _, n in totals.values())
+        summary["resolution_by_assigned_to"] = totals
+        summary["avg_resolution_hours"] = hours / resolved if resolved else None
+        summary["avg_resolution_by_assigned_to"] = {a: (h / n if n else None) for a, (h, n) in totals.items()}
+    return summary
+
+
+def _merge_page(feed, spec, changed, items, order):
+    """Merge changed rows into the page; returns None if it must be re-queried.
+
+    Every row outside a full page sorts below its last row (the cutoff), so
+    the unchanged page rows plus the changed rows at or above the cutoff
+    are exactly the top of the table, as long as there are enough of them.
+    """
+    page_size, cutoff = feed["page_size"], feed["order"][-1] if feed["has_more"] else None
+    rows = [(key, item) for key, item in zip(feed["order"], feed["rows"]) if item[spec["key"]] not in changed]
+    rows += [(key, item) for key, item in zip(order, items) if cutoff is None or key >= cutoff]
+    if feed["has_more"] and len(rows) < page_size:
+        return None
+    rows.sort(key=lambda pair: pair[0], reverse=True)
+    has_more = feed["has_more"] or len(rows) > page_size
+    rows = rows[:page_size]
+    return {"rows": [item for _, item in rows], "order": [key for key, _ in rows], "has_more": has_more}
+
+
+def _catch_up(conn, table, spec, feed):
+    """Apply logged changes since feed["seq"]; returns the new feed, or None to reload."""
+    # Separate MIN and MAX queries, so each is a single index lookup
+    first = conn.execute("SELECT MIN(seq) FROM search_changes").fetchone()[0]
+    if first is not None and first > feed["seq"] + 1:
+        return None
+    latest = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM search_changes").fetchone()[0]
+    if latest == feed["seq"]:
+        return feed
+    kinds = {}   # row id -> its first logged op since the cursor
+    for row_id, op in _fetch(conn, "SELECT row_id, op FROM search_changes "
+                                   "WHERE seq > ? AND seq <= ? AND table_name = ? ORDER BY seq",
+                             (feed["seq"], latest, table)):
+        kinds.setdefault(row_id, op)
+    if len(kinds) > MAX_MERGED_CHANGES:
+        return None
+    if not kinds:
+        return dict(feed, seq=latest)
+
+    rows = []
+    changed = list(kinds)
+    for start in range(0, len(changed), 500):
+        batch = changed[start:start + 500]
+        rows += _fetch(conn, f"SELECT {_select(spec)} FROM {table} "
+                             f"WHERE {spec['key']} IN ({', '.join('?' * len(batch))})", batch)
+    items, order = _split(spec, rows)
+
+    if all(op == "insert" for op in kinds.values()):
+        summary = _count(feed["summary"], table, items)
+    else:
+        summary = SUMMARIES[table]()   # an existing row changed; its old labels are not logged
+    page = _merge_page(feed, spec, set(kinds), items, order)
+    if page is None:
+        page = _page(conn, table, spec, feed["page_size"])
+    inserted = sum(kinds[item[spec["key"]]] == "insert" for item in items)
+    instrumentation.count("live.rows", len(rows))
+    return dict(feed, seq=latest, summary=summary, added=feed["added"] + inserted,
+                changed=feed["changed"] + len(kinds), **page)
+
+
+def poll(table, page_size=50):
+    """Bring a table's feed up to date and return it.
+
+    The feed is a dict with ``summary`` (as db.incident_summary() or
+    db.ticket_summary()), ``first_page`` (``(rows, next_cursor)`` as
+    db.query_rows() returns for the default view), ``seq`` (the change-log
+    cursor), ``polled_at`` and running ``added`` / ``changed`` row counts.
+    """
+    spec = _spec(table)
+    with _lock, instrumentation.timer("live.poll"), get_connection() as conn:
+        began = not conn.in_transaction
+        if began:
+            conn.execute("BEGIN")   # the cursor, counts and rows all from one snapshot
+        feed = _feeds.get(table)
+        updated = None
+        if feed is not None and feed["page_size"] == page_size:
+            updated = _catch_up(conn, table, spec, feed)
+        if updated is None:
+            updated = _load(conn, table, spec, page_size)
+        if began:
+            conn.commit()
+        if updated is feed:
+            return feed
+        first, latest = conn.execute(CHANGE_LOG_BOUNDS).fetchone()
+        if first is not None and latest - first > 2 * MAX_LOGGED_CHANGES:
+            prune_changes(conn)
+        return _publish(table, spec, updated)
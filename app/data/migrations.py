@@ -0,0 +1,403 @@
+"""
+Schema Migrations
+Versioned, ordered upgrades for intelligence_platform.db.
+
+Each migration is a (version, description, function) entry in MIGRATIONS.
+Applied versions are recorded in the schema_version table, so running the
+migrations again only applies the steps a database has not seen yet.
+
+Run directly to upgrade the database and check the Dashboard query plans:
+    python -m app.data.migrations
+"""
+import sqlite3
+from datetime import datetime
+
+from app.data.labels import LABEL_COLUMNS
+from app.data.pool import get_connection
+from app.data.rollups import create_rollups, rebuild_rollups
+from app.data.search_index import create_search_indexes, drop_search_triggers, rebuild_search_indexes
+
+
+def _column_names(conn, table):
+    """Return the column names of a table, including generated columns."""
+    return {row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")}
+
+
+def _add_column(conn, table, column, definition):
+    """Add a column unless it already exists (keeps steps re-runnable)."""
+    if column not in _column_names(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _create_base_tables(conn):
+    """Version 1: the original Week 8 tables."""
+    # Users table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            role TEXT DEFAULT 'user',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # Cyber incidents table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cyber_incidents (
+            incident_id INTEGER PRIMARY KEY,
+            timestamp TEXT,
+            severity TEXT,
+            category TEXT,
+            status TEXT,
+            description TEXT
+        )
+    """)
+
+    # Datasets metadata table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS datasets_metadata (
+            dataset_id INTEGER PRIMARY KEY,
+            name TEXT,
+            rows INTEGER,
+            columns INTEGER,
+            uploaded_by TEXT,
+            upload_date TEXT
+        )
+    """)
+
+    # IT tickets table
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS it_tickets (
+            ticket_id INTEGER PRIMARY KEY,
+            priority TEXT,
+            description TEXT,
+            status TEXT,
+            assigned_to TEXT,
+            created_at TEXT,
+            resolution_time_hours INTEGER
+        )
+    """)
+
+
+def _add_typed_timestamps(conn):
+    """Version 2: integer (Unix epoch) copies of the TEXT timestamps.
+
+    These are virtual generated columns, so they always match the text value
+    without any backfill, and they sort and range-compare numerically.
+    Missing or unparseable timestamps become 0 so the columns are never NULL.
+    """
+    _add_column(conn, "cyber_incidents", "timestamp_epoch",
+                "INTEGER GENERATED ALWAYS AS (COALESCE(CAST(strftime('%s', timestamp) AS INTEGER), 0)) VIRTUAL")
+    _add_column(conn, "it_tickets", "created_at_epoch",
+                "INTEGER GENERATED ALWAYS AS (COALESCE(CAST(strftime('%s', created_at) AS INTEGER), 0)) VIRTUAL")
+
+
+def _add_dashboard_indexes(conn):
+    """Version 3: indexes backing the Dashboard's filters, sorts and groupings."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_incidents_severity_status ON cyber_incidents (severity, status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_incidents_status ON cyber_incidents (status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_incidents_category ON cyber_incidents (category)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_incidents_timestamp ON cyber_incidents (timestamp_epoch)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_priority_status ON it_tickets (priority, status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_status ON it_tickets (status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_assigned_to ON it_tickets (assigned_to)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tickets_created ON it_tickets (created_at_epoch)")
+    conn.execute("ANALYZE")
+
+
+def _normalize_labels(conn):
+    """Version 4: canonical label case, plus a covering index for the incident summary.
+
+    New rows are normalized at ingest (see labels.normalize_label); this brings
+    rows loaded before that into line so the Dashboard can compare with '='.
+    """
+    for table, columns in LABEL_COLUMNS.items():
+        for column, labels in columns.items():
+            conn.execute(f"UPDATE {table} SET {column} = NULL WHERE trim({column}) = ''")
+            for label in labels:
+                conn.execute(
+                    f"UPDATE {table} SET {column} = ? WHERE lower(trim({column})) = ? AND {column} <> ?",
+                    (label, label.lower(), label),
+                )
+
+    # (severity, status, category) serves everything (severity, status) did
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_incidents_severity_status_category "
+                 "ON cyber_incidents (severity, status, category)")
+    conn.execute("DROP INDEX IF EXISTS idx_incidents_severity_status")
+    conn.execute("ANALYZE")
+
+
+def _add_rollups(conn):
+    """Version 5: trigger-maintained summary tables (see rollups.py)."""
+    create_rollups(conn)
+    rebuild_rollups(conn)
+
+
+VERSIONED_TABLES = ("users", "cyber_incidents", "datasets_metadata", "it_tickets")
+
+
+def _add_table_versions(conn):
+    """Version 6: per-table write counters used to invalidate the query cache."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    for table in VERSIONED_TABLES:
+        conn.execute("INSERT OR IGNORE INTO table_versions (table_name) VALUES (?)", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';
+                END
+            """)
+
+
+def _add_ingest_checkpoints(conn):
+    """Version 7: resumable-load progress for the CSV ingest (see ingest.py)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+            source TEXT PRIMARY KEY,
+            table_name TEXT NOT NULL,
+            file_size INTEGER NOT NULL,
+            file_mtime INTEGER NOT NULL,
+            rows_done INTEGER NOT NULL DEFAULT 0,
+            completed INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT NOT NULL
+        )
+    """)
+
+
+def _add_login_lockouts(conn):
+    """Version 8: persistent failed-login counters (see services/rate_limit.py)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS login_lockouts (
+            username TEXT PRIMARY KEY,
+            failed_count INTEGER NOT NULL DEFAULT 0,
+            window_start REAL NOT NULL,
+            locked_until REAL,
+            updated_at TEXT NOT NULL
+        )
+    """)
+
+
+def _add_bootstrap_state(conn):
+    """Version 9: markers for one-time start-up work (see app/bootstrap.py)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS bootstrap_state (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    """)
+
+
+def _add_completion_cache(conn):
+    """Version 10: cached AI Assistant replies (see services/completion_cache.py)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS completion_cache (
+            cache_key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_completion_cache_last_used ON completion_cache(last_used)")
+
+
+def _add_search_indexes(conn):
+    """Version 11: full-text indexes over incidents and tickets (see search_index.py)."""
+    create_search_indexes(conn)
+    rebuild_search_indexes(conn)
+
+
+def _add_chat_history(conn):
+    """Version 12: persistent AI Assistant conversations (see services/chat_history.py)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS conversations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL REFERENCES users(id),
+            title TEXT NOT NULL,
+            message_count INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS messages (
+            conversation_id INTEGER NOT NULL REFERENCES conversations(id),
+            seq INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (conversation_id, seq)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_conversations_user_updated "
+                 "ON conversations(user_id, updated_at)")
+
+
+def _log_trend_columns(conn):
+    """Version 13: log updates to the date and resolution columns in search_changes too.
+
+    The triggers already exist by now, and create_search_indexes() only adds
+    missing ones, so they are dropped first to pick up the new definitions.
+    """
+    _add_column(conn, "search_changes", "op", "TEXT")
+    drop_search_triggers(conn)
+    create_search_indexes(conn)
+
+
+def _log_change_kinds(conn):
+    """Version 14: record insert / update / delete in search_changes (see live.py)."""
+    _add_column(conn, "search_changes", "op", "TEXT")
+    drop_search_triggers(conn)
+    create_search_indexes(conn)
+
+
+def _add_username_nocase_index(conn):
+    """Version 15: case-insensitive username lookups for login (see services/rate_limit.py)."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_username_nocase ON users(username COLLATE NOCASE)")
+
+
+def _add_filter_date_indexes(conn):
+    """Version 16: (filter column, date) indexes, so a filtered page is read in date order.
+
+    With only the single-column indexes, a filtered page either walked the
+    date index and skipped non-matching rows (slow when few rows match) or
+    sorted every match in a temporary B-tree. Each new index also serves
+    everything the single-column index it replaces did.
+    """
+    for column in ("severity", "status", "category"):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_incidents_{column}_date "
+                     f"ON cyber_incidents ({column}, timestamp_epoch)")
+    for column in ("priority", "status", "assigned_to"):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_tickets_{column}_date "
+                     f"ON it_tickets ({column}, created_at_epoch)")
+    for index in ("idx_incidents_status", "idx_incidents_category",
+                  "idx_tickets_status", "idx_tickets_assigned_to"):
+        conn.execute(f"DROP INDEX IF EXISTS {index}")
+    conn.execute("ANALYZE")
+
+
+def _bump_versions_per_transaction(conn):
+    """Version 17: bump table_versions once per write transaction, not once per row.
+
+    A trigger now bumps a table's counter only while its ``dirty`` flag is
+    clear, and sets the flag; connections from pool.open_connection() clear
+    the flags as they commit (pool.Connection). A writer that does not clear
+    them, such as the sqlite3 shell, still bumps on its first transaction, but
+    its later ones are only noticed after the app next writes or when cache
+    entries expire.
+    """
+    _add_column(conn, "table_versions", "dirty", "INTEGER NOT NULL DEFAULT 0")
+    for table in VERSIONED_TABLES:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {table}_version_{event.lower()}")
+            conn.execute(f"""
+                CREATE TRIGGER {table}_version_{event.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE table_versions SET version = version + 1, dirty = 1
+                    WHERE table_name = '{table}' AND dirty = 0;
+                END
+            """)
+
+
+MIGRATIONS = [
+    (1, "Base tables", _create_base_tables),
+    (2, "Typed timestamp columns", _add_typed_timestamps),
+    (3, "Dashboard indexes", _add_dashboard_indexes),
+    (4, "Normalized labels", _normalize_labels),
+    (5, "Summary rollups", _add_rollups),
+    (6, "Table write counters", _add_table_versions),
+    (7, "Ingest checkpoints", _add_ingest_checkpoints),
+    (8, "Login lockouts", _add_login_lockouts),
+    (9, "Bootstrap state", _add_bootstrap_state),
+    (10, "Completion cache", _add_completion_cache),
+    (11, "Search indexes", _add_search_indexes),
+    (12, "Chat history", _add_chat_history),
+    (13, "Change log for trend columns", _log_trend_columns),
+    (14, "Change kinds in the change log", _log_change_kinds),
+    (15, "Case-insensitive username index", _add_username_nocase_index),
+    (16, "Filter and date indexes", _add_filter_date_indexes),
+    (17, "Table write counters per transaction", _bump_versions_per_transaction),
+]
+
+
+def _ensure_version_table(conn):
+    """Create the schema_version table if needed."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+    """)
+
+
+def current_version(conn):
+    """Return the highest migration version applied to the database."""
+    _ensure_version_table(conn)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrate(target=None):
+    """Apply every pending migration in order, each in its own transaction.
+
+    Safe to call on every start-up: already-applied versions are skipped, and
+    concurrent callers are serialised by BEGIN IMMEDIATE. Returns the list of
+    versions applied by this call.
+    """
+    applied = []
+    with get_connection() as conn:
+        conn.commit()
+        latest = target if target is not None else MIGRATIONS[-1][0]
+        if current_version(conn) >= latest:
+            return applied
+        for version, description, step in MIGRATIONS:
+            if target is not None and version > target:
+                break
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Re-check inside the lock in case another session got here first
+                if current_version(conn) >= version:
+                    conn.rollback()
+                    continue
+                step(conn)
+                conn.execute(
+                    "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                    (version, description, datetime.now().isoformat(timespec="seconds")),
+                )
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+            applied.append(version)
+    return applied
+
+
+if __name__ == "__main__":
+    from app.data.db import explain_dashboard_queries
+
+    applied = migrate()
+    print(f"Applied migrations: {applied or 'none (up to date)'}")
+    with get_connection() as conn:
+        print(f"Schema version: {current_version(conn)}")
+    print()
+
+    failures = 0
+    for name, plan, problem in explain_dashboard_queries():
+        status = problem.upper() if problem else "ok"
+        failures += problem is not None
+        print(f"[{status}] {name}")
+        for detail in plan:
+            print(f"    {detail}")
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,207 @@
+"""
+Parallel Ingest Pipeline
+Reloads several CSV files at once, using every core for parsing.
+
+    reader thread  --(chunks of raw CSV text)-->  process pool (parse + coerce)
+         |                                               |
+         +------ bounded queue of pending chunks --------+
+                                |
+                         writer thread (single SQLite connection,
+                                        batched commits)
+
+The reader splits each file into chunks of whole records and submits them to
+the process pool. The futures go into a bounded queue in file order; when
+the queue is full the reader blocks, which caps how much parsed data can be
+in memory. One writer thread takes futures off the queue, waits for each
+result and upserts it, committing every ``commit_rows`` rows. SQLite only
+allows one writer at a time, so there is no point in more.
+
+Parsing and coercion reuse ingest.py, so the rows are identical to a
+sequential load_csv(). Unlike load_csv() there are no checkpoints: this is
+meant for full reloads, and the upserts make re-running it safe.
+
+Usage:
+    python -m app.data.pipeline [FILE:TABLE ...] [--workers N] [--chunk-size N]
+"""
+import argparse
+import csv
+import io
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app.data.cache import invalidate
+from app.data.ingest import PLATFORM_FILES, coerce_records, header_converters, upsert_sql
+from app.data.pool import get_connection
+
+DEFAULT_CHUNK_SIZE = 20000
+DEFAULT_COMMIT_ROWS = 100000
+
+_DONE = object()
+
+
+def parse_chunk(table, header, text):
+    """Parse and coerce one chunk of CSV records (runs in a worker process)."""
+    started = time.perf_counter()
+    records = list(csv.reader(io.StringIO(text, newline="")))
+    rows = coerce_records(header_converters(table, header), records)
+    return rows, len(records), time.perf_counter() - started
+
+
+def iter_record_chunks(path, chunk_size):
+    """Yield (header, text) where text holds up to chunk_size whole CSV records.
+
+    A record only ends at a newline outside quotes; an odd number of quote
+    characters on a line means a quoted field continues on the next one.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader([f.readline()]))
+        lines, records, in_quotes = [], 0, False
+        for line in f:
+            lines.append(line)
+            if line.count('"') % 2:
+                in_quotes = not in_quotes
+            if not in_quotes:
+                records += 1
+                if records >= chunk_size:
+                    yield header, "".join(lines)
+                    lines, records = [], 0
+        if lines:
+            yield header, "".join(lines)
+
+
+def _new_stats(jobs):
+    """Per-stage timing and row counters."""
+    return {
+        "files": {table: {"rows": 0, "records": 0} for _, table in jobs},
+        "read_seconds": 0.0,          # reader: reading and splitting files
+        "reader_blocked_seconds": 0.0,  # reader: waiting on a full queue
+        "parse_seconds": 0.0,         # workers: CPU time parsing (summed)
+        "writer_wait_seconds": 0.0,   # writer: waiting for parsed chunks
+        "write_seconds": 0.0,         # writer: executemany + commits
+        "commits": 0,
+        "chunks": 0,
+    }
+
+
+def _reader(jobs, pool, pending, stats, chunk_size):
+    """Split files into chunks and queue their parse futures."""
+    try:
+        for path, table in jobs:
+            chunks = iter_record_chunks(path, chunk_size)
+            while True:
+                started = time.perf_counter()
+                chunk = next(chunks, None)
+                stats["read_seconds"] += time.perf_counter() - started
+                if chunk is None:
+                    break
+                header, text = chunk
+                future = pool.submit(parse_chunk, table, header, text)
+                started = time.perf_counter()
+                pending.put((table, future))  # blocks while the queue is full
+                stats["reader_blocked_seconds"] += time.perf_counter() - started
+    finally:
+        pending.put(_DONE)
+
+
+def _writer(pending, stats, commit_rows, errors):
+    """Drain parsed chunks into SQLite, committing in batches."""
+    try:
+        with get_connection() as conn:
+            uncommitted = 0
+            while True:
+                started = time.perf_counter()
+                item = pending.get()
+                if item is _DONE:
+                    break
+                table, future = item
+                rows, records, parse_seconds = future.result()
+                stats["writer_wait_seconds"] += time.perf_counter() - started
+                stats["parse_seconds"] += parse_seconds
+
+                started = time.perf_counter()
+                conn.executemany(upsert_sql(table), rows)
+                uncommitted += len(rows)
+                if uncommitted >= commit_rows:
+                    conn.commit()
+                    stats["commits"] += 1
+                    uncommitted = 0
+                stats["write_seconds"] += time.perf_counter() - started
+
+                stats["chunks"] += 1
+                stats["files"][table]["rows"] += len(rows)
+                stats["files"][table]["records"] += records
+            started = time.perf_counter()
+            conn.commit()
+            stats["commits"] += 1
+            stats["write_seconds"] += time.perf_counter() - started
+    except BaseException as e:
+        errors.append(e)
+        # Keep draining so the reader is never left blocked on a full queue
+        while pending.get() is not _DONE:
+            pass
+
+
+def run_pipeline(jobs=None, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                 queue_size=None, commit_rows=DEFAULT_COMMIT_ROWS):
+    """Load (path, table) jobs in parallel; returns the per-stage stats dict.
+
+    ``queue_size`` bounds how many chunks may be queued or parsing at once
+    (default: twice the number of workers).
+    """
+    jobs = list(jobs or PLATFORM_FILES)
+    workers = workers or os.cpu_count() or 1
+    pending = queue.Queue(maxsize=queue_size or workers * 2)
+    stats = _new_stats(jobs)
+    errors = []
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = threading.Thread(target=_writer, args=(pending, stats, commit_rows, errors),
+                                  name="ingest-writer", daemon=True)
+        writer.start()
+        try:
+            _reader(jobs, pool, pending, stats, chunk_size)
+        finally:
+            writer.join()
+
+    for _, table in jobs:
+        invalidate(table)
+    if errors:
+        raise errors[0]
+
+    stats["workers"] = workers
+    stats["seconds"] = time.perf_counter() - started
+    stats["rows"] = sum(f["rows"] for f in stats["files"].values())
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Parallel CSV reload into intelligence_platform.db")
+    parser.add_argument("jobs", nargs="*", metavar="FILE:TABLE", help="files to load (default: the DATA/ files)")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="records per parse task")
+    parser.add_argument("--queue-size", type=int, default=None, help="max chunks in flight")
+    parser.add_argument("--commit-rows", type=int, default=DEFAULT_COMMIT_ROWS, help="rows per commit")
+    args = parser.parse_args(argv)
+
+    jobs = [tuple(job.rsplit(":", 1)) for job in args.jobs] or None
+    from app.data.db import create_tables
+    create_tables()
+    stats = run_pipeline(jobs, args.workers, args.chunk_size, args.queue_size, args.commit_rows)
+
+    for table, counts in stats["files"].items():
+        print(f"✓ {counts['rows']:,} rows into {table}")
+    print(f"{stats['rows']:,} rows in {stats['seconds']:.2f}s ({stats['rows_per_second']:,.0f} rows/s) "
+          f"using {stats['workers']} workers, {stats['chunks']} chunks, {stats['commits']} commits")
+    print(f"  read {stats['read_seconds']:.2f}s | reader blocked {stats['reader_blocked_seconds']:.2f}s | "
+          f"parse (cpu) {stats['parse_seconds']:.2f}s | writer waiting {stats['writer_wait_seconds']:.2f}s | "
+          f"write {stats['write_seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
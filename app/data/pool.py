@@ -0,0 +1,174 @@
+"""
+Connection Pool
+Per-thread reusable SQLite connections for the intelligence platform database.
+
+Streamlit runs every session's script in its own thread, so each thread keeps
+one long-lived connection instead of reconnecting for every query. A semaphore
+caps how many threads can use the database at once; the time spent waiting on
+it is recorded so contention between concurrent sessions is visible.
+"""
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+DB_PATH = Path("DATA") / "intelligence_platform.db"
+
+MAX_CONNECTIONS = 8
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KB = 20000
+MMAP_SIZE_BYTES = 256 * 1024 * 1024
+
+# Run before committing a transaction that wrote: the next write to each
+# table bumps its table_versions counter again (see migrations.py, version 17)
+CLEAR_WRITE_MARKERS = "UPDATE table_versions SET dirty = 0 WHERE dirty = 1"
+
+_local = threading.local()
+_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(MAX_CONNECTIONS)
+_connections = {}  # thread ident -> connection
+_stats = {
+    "hits": 0,
+    "misses": 0,
+    "checkouts": 0,
+    "wait_seconds": 0.0,
+    "max_wait_seconds": 0.0,
+    "discarded": 0,
+}
+
+
+class Connection(sqlite3.Connection):
+    """sqlite3 connection that clears the table_versions write markers as it commits."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._committed_changes = 0
+
+    def commit(self):
+        if self.total_changes != self._committed_changes:   # this transaction wrote
+            try:
+                self.execute(CLEAR_WRITE_MARKERS)
+            except sqlite3.OperationalError:
+                pass  # table_versions not migrated to version 17 yet
+        super().commit()
+        self._committed_changes = self.total_changes
+
+    def rollback(self):
+        super().rollback()
+        self._committed_changes = self.total_changes
+
+    def __exit__(self, exc_type, exc, tb):
+        # The built-in __exit__ commits without going through commit()
+        if exc_type is None:
+            self.commit()
+        return super().__exit__(exc_type, exc, tb)
+
+
+def configure_connection(conn):
+    """Apply the platform's standard pragmas to a new connection."""
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size = -{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE_BYTES}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
+def open_connection(db_path=None):
+    """Open a new, fully configured connection (not managed by the pool)."""
+    conn = sqlite3.connect(str(db_path or DB_PATH), check_same_thread=False, factory=Connection)
+    return configure_connection(conn)
+
+
+def _prune_dead_threads():
+    """Close connections owned by threads that have finished."""
+    alive = {t.ident for t in threading.enumerate()}
+    for ident in list(_connections):
+        if ident not in alive:
+            try:
+                _connections.pop(ident).close()
+            except sqlite3.Error:
+                pass
+            _stats["discarded"] += 1
+
+
+def _thread_connection():
+    """Return this thread's connection, creating it on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _connections.get(threading.get_ident()) is conn:
+        with _lock:
+            _stats["hits"] += 1
+        return conn
+
+    conn = open_connection()
+    _local.conn = conn
+    with _lock:
+        _stats["misses"] += 1
+        _prune_dead_threads()
+        _connections[threading.get_ident()] = conn
+    return conn
+
+
+@contextmanager
+def get_connection():
+    """
+    Check out this thread's pooled connection.
+
+    Commits when the block finishes and rolls back if it raises. Nested
+    blocks in the same thread share the connection and only the outermost
+    one commits.
+    """
+    depth = getattr(_local, "depth", 0)
+    if depth == 0:
+        started = time.perf_counter()
+        _slots.acquire()
+        waited = time.perf_counter() - started
+        with _lock:
+            _stats["checkouts"] += 1
+            _stats["wait_seconds"] += waited
+            _stats["max_wait_seconds"] = max(_stats["max_wait_seconds"], waited)
+
+    _local.depth = depth + 1
+    try:
+        conn = _thread_connection()
+        try:
+            yield conn
+        except BaseException:
+            if depth == 0:
+                conn.rollback()
+            raise
+        if depth == 0:
+            conn.commit()
+    finally:
+        _local.depth = depth
+        if depth == 0:
+            _slots.release()
+
+
+def pool_stats():
+    """Return a snapshot of pool hit/miss and wait-time counters."""
+    with _lock:
+        stats = dict(_stats)
+        stats["open_connections"] = len(_connections)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+    stats["avg_wait_seconds"] = (
+        stats["wait_seconds"] / stats["checkouts"] if stats["checkouts"] else 0.0
+    )
+    return stats
+
+
+def close_all():
+    """Close every pooled connection (used by scripts and on shutdown)."""
+    with _lock:
+        for conn in _connections.values():
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        _connections.clear()
+    _local.__dict__.pop("conn", None)
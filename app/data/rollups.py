@@ -0,0 +1,160 @@
+"""
+Summary Rollups
+Materialized count tables behind the Dashboard metrics, kept current by
+SQLite triggers on every insert, update and delete.
+
+incident_rollup holds one row per (severity, status, category, day) and
+ticket_rollup one row per (priority, status, assigned_to) with the running
+sum and count of resolution_time_hours, so Dashboard numbers are read from
+a handful of group rows instead of scanning the source tables.
+
+NULL keys are stored as '' because NULLs never match in a primary key.
+
+Run directly to rebuild the rollups or check them against the base tables:
+    python -m app.data.rollups check
+    python -m app.data.rollups rebuild
+"""
+import sys
+
+from app.data.pool import get_connection
+
+# Expressions use {row} so the same definition serves the triggers (NEW./OLD.)
+# and the full rebuild (plain column names).
+ROLLUPS = {
+    "incident_rollup": {
+        "source": "cyber_incidents",
+        "columns": ("timestamp", "severity", "status", "category"),
+        "keys": {
+            "severity": "{row}severity",
+            "status": "{row}status",
+            "category": "{row}category",
+            "day": "date({row}timestamp)",
+        },
+        "measures": {"count": "1"},
+    },
+    "ticket_rollup": {
+        "source": "it_tickets",
+        "columns": ("priority", "status", "assigned_to", "resolution_time_hours"),
+        "keys": {
+            "priority": "{row}priority",
+            "status": "{row}status",
+            "assigned_to": "{row}assigned_to",
+        },
+        "measures": {
+            "count": "1",
+            "resolution_hours_sum": "COALESCE({row}resolution_time_hours, 0)",
+            "resolution_count": "({row}resolution_time_hours IS NOT NULL)",
+        },
+    },
+}
+
+
+def _keys(spec, row=""):
+    """Key expressions for a row, with NULL mapped to ''."""
+    return [f"IFNULL({expr.format(row=row)}, '')" for expr in spec["keys"].values()]
+
+
+def _measures(spec, row=""):
+    """Measure expressions for a row."""
+    return [expr.format(row=row) for expr in spec["measures"].values()]
+
+
+def _add_sql(name, spec, row):
+    """INSERT ... ON CONFLICT that adds one source row to the rollup."""
+    keys = list(spec["keys"])
+    measures = list(spec["measures"])
+    values = _keys(spec, row) + _measures(spec, row)
+    updates = ", ".join(f"{m} = {m} + excluded.{m}" for m in measures)
+    return (f"INSERT INTO {name} ({', '.join(keys + measures)}) VALUES ({', '.join(values)}) "
+            f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates};")
+
+
+def _remove_sql(name, spec, row):
+    """UPDATE/DELETE pair that takes one source row out of the rollup."""
+    match = " AND ".join(f"{key} = {expr}" for key, expr in zip(spec["keys"], _keys(spec, row)))
+    updates = ", ".join(f"{m} = {m} - {expr}" for m, expr in zip(spec["measures"], _measures(spec, row)))
+    return (f"UPDATE {name} SET {updates} WHERE {match}; "
+            f"DELETE FROM {name} WHERE {match} AND count <= 0;")
+
+
+def create_rollups(conn):
+    """Create the rollup tables and their maintenance triggers."""
+    for name, spec in ROLLUPS.items():
+        source = spec["source"]
+        key_columns = ", ".join(f"{key} TEXT NOT NULL" for key in spec["keys"])
+        measure_columns = ", ".join(f"{m} INTEGER NOT NULL DEFAULT 0" for m in spec["measures"])
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {name} (
+                {key_columns}, {measure_columns},
+                PRIMARY KEY ({', '.join(spec['keys'])})
+            ) WITHOUT ROWID
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}_insert AFTER INSERT ON {source}
+            BEGIN {_add_sql(name, spec, "NEW.")} END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}_delete AFTER DELETE ON {source}
+            BEGIN {_remove_sql(name, spec, "OLD.")} END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}_update
+            AFTER UPDATE OF {', '.join(spec['columns'])} ON {source}
+            BEGIN {_remove_sql(name, spec, "OLD.")} {_add_sql(name, spec, "NEW.")} END
+        """)
+
+
+def _group_sql(spec):
+    """SELECT computing a rollup's rows from its source table."""
+    keys = _keys(spec)
+    measures = [f"SUM({expr})" for expr in _measures(spec)]
+    return (f"SELECT {', '.join(keys + measures)} FROM {spec['source']} "
+            f"GROUP BY {', '.join(keys)}")
+
+
+def rebuild_rollups(conn=None):
+    """Recompute every rollup from its source table (e.g. after check_rollups() finds drift)."""
+    if conn is None:
+        with get_connection() as conn:
+            return rebuild_rollups(conn)
+    for name, spec in ROLLUPS.items():
+        columns = list(spec["keys"]) + list(spec["measures"])
+        conn.execute(f"DELETE FROM {name}")
+        conn.execute(f"INSERT INTO {name} ({', '.join(columns)}) {_group_sql(spec)}")
+
+
+def check_rollups():
+    """Compare each rollup with a fresh GROUP BY over its source table.
+
+    Returns a list of (rollup, key, stored, expected) mismatches; empty means
+    the rollups are consistent.
+    """
+    mismatches = []
+    with get_connection() as conn:
+        for name, spec in ROLLUPS.items():
+            columns = list(spec["keys"]) + list(spec["measures"])
+            width = len(spec["keys"])
+            stored = {tuple(row[:width]): tuple(row[width:])
+                      for row in conn.execute(f"SELECT {', '.join(columns)} FROM {name}")}
+            expected = {tuple(row[:width]): tuple(row[width:])
+                        for row in conn.execute(_group_sql(spec))}
+            for key in sorted(set(stored) | set(expected)):
+                if stored.get(key) != expected.get(key):
+                    mismatches.append((name, key, stored.get(key), expected.get(key)))
+    return mismatches
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    if command == "rebuild":
+        rebuild_rollups()
+        print("Rollups rebuilt")
+    elif command == "check":
+        problems = check_rollups()
+        for name, key, stored, expected in problems:
+            print(f"{name} {key}: stored={stored} expected={expected}")
+        print("Rollups consistent" if not problems else f"{len(problems)} mismatched groups")
+        raise SystemExit(1 if problems else 0)
+    else:
+        print("Usage: python -m app.data.rollups [check|rebuild]")
+        raise SystemExit(2)
@@ -0,0 +1,291 @@
+"""
+Search Indexes
+Full-text indexes over incident and ticket text, kept current by SQLite
+triggers on every insert, update and delete.
+
+incidents_fts and tickets_fts are FTS5 tables with external content: they
+store only the index, and read the text back from cyber_incidents and
+it_tickets. Each trigger also appends the changed row to search_changes, a
+sequence-numbered log that lets in-memory indexes (vector_index.py,
+trends.py) and the Dashboard's live feeds (live.py) catch up on just the
+rows that changed. Each entry records whether the row was inserted, updated
+or deleted (``op``), and updates to the non-indexed columns those readers
+use (``logged``) are logged as well.
+
+Run directly to rebuild the indexes, check them against the base tables, or
+time ranked search against a LIKE scan on a generated database:
+    python -m app.data.search_index check
+    python -m app.data.search_index rebuild
+    python -m app.data.search_index bench [ROWS]
+"""
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+
+from app.data.pool import get_connection
+
+SEARCH_INDEXES = {
+    "incidents_fts": {
+        "source": "cyber_incidents",
+        "key": "incident_id",
+        "columns": ("description", "category", "status", "severity"),
+        "logged": ("timestamp",),
+    },
+    "tickets_fts": {
+        "source": "it_tickets",
+        "key": "ticket_id",
+        "columns": ("description", "status", "priority", "assigned_to"),
+        "logged": ("created_at", "resolution_time_hours"),
+    },
+}
+
+MAX_QUERY_TERMS = 12
+MAX_LOGGED_CHANGES = 50000   # search_changes rows kept after pruning
+# First and last seq in one statement; as subqueries each is a single index lookup
+CHANGE_LOG_BOUNDS = "SELECT (SELECT MIN(seq) FROM search_changes), (SELECT MAX(seq) FROM search_changes)"
+STOPWORDS = frozenset("""
+    a an and are as at be by can do does for from has have how i in is it me my of on or
+    our show that the their there these this to was we were what when where which who why
+    will with you your about any all tell give list find
+""".split())
+
+
+def index_for(source):
+    """Name and spec of the index over a source table."""
+    for name, spec in SEARCH_INDEXES.items():
+        if spec["source"] == source:
+            return name, spec
+    raise ValueError(f"No search index for table: {source}")
+
+
+def _values(spec, row):
+    """Key and column expressions for NEW. or OLD."""
+    return ", ".join([f"{row}{spec['key']}"] + [f"{row}{c}" for c in spec["columns"]])
+
+
+def _log(source, row_id, op):
+    """Trigger statement appending a change to search_changes."""
+    return f"INSERT INTO search_changes (table_name, row_id, op) VALUES ('{source}', {row_id}, '{op}');"
+
+
+def create_search_indexes(conn):
+    """Create the FTS tables, the change log and their maintenance triggers."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS search_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            op TEXT
+        )
+    """)
+    for name, spec in SEARCH_INDEXES.items():
+        source, key, columns = spec["source"], spec["key"], ", ".join(spec["columns"])
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {name} USING fts5(
+                {columns}, content='{source}', content_rowid='{key}',
+                tokenize='porter unicode61'
+            )
+        """)
+        insert = f"INSERT INTO {name} (rowid, {columns}) VALUES ({_values(spec, 'NEW.')});"
+        delete = (f"INSERT INTO {name} ({name}, rowid, {columns}) "
+                  f"VALUES ('delete', {_values(spec, 'OLD.')});")
+        log_insert, log_delete = _log(source, f"NEW.{key}", "insert"), _log(source, f"OLD.{key}", "delete")
+        log_old, log_new = _log(source, f"OLD.{key}", "update"), _log(source, f"NEW.{key}", "update")
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}_insert AFTER INSERT ON {source}
+            BEGIN {insert} {log_insert} END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}_delete AFTER DELETE ON {source}
+            BEGIN {delete} {log_delete} END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}_update
+            AFTER UPDATE OF {key}, {columns} ON {source}
+            BEGIN {delete} {insert} {log_old} {log_new} END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {name}_log_update
+            AFTER UPDATE OF {', '.join(spec['logged'])} ON {source}
+            BEGIN {log_new} END
+        """)
+
+
+def drop_search_triggers(conn):
+    """Drop the maintenance triggers, so create_search_indexes() can redefine them."""
+    for name in SEARCH_INDEXES:
+        for event in ("insert", "delete", "update", "log_update"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}_{event}")
+
+
+def rebuild_search_indexes(conn=None):
+    """Re-index every source table from scratch and reset the change log."""
+    if conn is None:
+        with get_connection() as conn:
+            return rebuild_search_indexes(conn)
+    for name in SEARCH_INDEXES:
+        conn.execute(f"INSERT INTO {name} ({name}) VALUES ('rebuild')")
+    # Readers that were behind notice the gap in seq and reload in full
+    conn.execute("INSERT INTO search_changes (table_name, row_id) VALUES ('', 0)")
+    conn.execute("DELETE FROM search_changes WHERE seq < (SELECT MAX(seq) FROM search_changes)")
+
+
+def prune_changes(conn):
+    """Trim the change log to the newest MAX_LOGGED_CHANGES entries."""
+    conn.execute("DELETE FROM search_changes WHERE seq <= (SELECT MAX(seq) FROM search_changes) - ?",
+                 (MAX_LOGGED_CHANGES,))
+
+
+def check_search_indexes():
+    """Run FTS5's integrity check against the source tables.
+
+    Returns a list of (index, error) problems; empty means the indexes match.
+    """
+    problems = []
+    with get_connection() as conn:
+        for name in SEARCH_INDEXES:
+            try:
+                conn.execute(f"INSERT INTO {name} ({name}, rank) VALUES ('integrity-check', 1)")
+            except sqlite3.DatabaseError as e:
+                problems.append((name, str(e)))
+    return problems
+
+
+def fts_query(text, match_all=False):
+    """Turn free text into a safe FTS5 query.
+
+    By default any word may match (best for ranking chat questions). With
+    ``match_all`` every word must match, as a search box expects, and a
+    word typed with a trailing * matches as a prefix. Quoting every term
+    keeps user input from being read as FTS syntax. Returns None if nothing
+    searchable is left.
+    """
+    terms = []
+    for word in re.findall(r"\w+\*?", text.lower()):
+        prefix = match_all and word.endswith("*")
+        word = word.rstrip("*")
+        if match_all or (len(word) > 1 and word not in STOPWORDS):
+            term = f'"{word}"*' if prefix else f'"{word}"'
+            if term not in terms:
+                terms.append(term)
+    if not terms:
+        return None
+    return (" AND " if match_all else " OR ").join(terms[:MAX_QUERY_TERMS])
+
+
+def keyword_search(source, text, limit=10):
+    """Best-matching row ids in a source table as (id, bm25 score), best first."""
+    query = fts_query(text)
+    if query is None:
+        return []
+    name, _ = index_for(source)
+    with get_connection() as conn:
+        rows = conn.execute(
+            f"SELECT rowid, bm25({name}) AS score FROM {name} WHERE {name} MATCH ? "
+            f"ORDER BY score LIMIT ?",
+            (query, limit),
+        ).fetchall()
+    return [(row["rowid"], row["score"]) for row in rows]
+
+
+BENCH_WORDS = ("phishing email credential malware ransomware endpoint firewall vpn login "
+               "suspicious outbound traffic server workstation laptop patch vulnerability "
+               "exfiltration dns brute force account lockout privilege escalation alert "
+               "quarantined blocked investigated user reported finance hr database backup").split()
+# From very common to a handful of rows, plus one word that never occurs
+BENCH_QUERIES = ("phishing", "privilege escalation", "srv-0042", "cve-2024-31337", "brute forc*", "zeroday")
+
+
+def _bench_description(rng):
+    """A generated incident description: common words, a host and sometimes a CVE."""
+    words = rng.choices(BENCH_WORDS, weights=range(len(BENCH_WORDS), 0, -1), k=8)
+    words.insert(rng.randrange(9), f"{rng.choice(('ws', 'srv', 'lt'))}-{rng.randrange(10000):04d}")
+    if rng.random() < 0.1:
+        words.append(f"cve-{rng.randrange(2019, 2025)}-{rng.randrange(100000):05d}")
+    return " ".join(words)
+
+
+def _timed(func, repeat=5):
+    """Best wall time of func() over a few runs, in milliseconds, and its last result."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def benchmark(rows=1_000_000, page_size=50):
+    """Compare search_rows() with LIKE '%term%' on a fresh database of generated incidents.
+
+    Returns one dict per query with the match counts and first-page and
+    count timings of both approaches.
+    """
+    from app.data import pool
+    from app.data.cache import invalidate
+    from app.data.db import count_matches, search_rows
+    from app.data.labels import CATEGORIES, SEVERITIES, STATUSES
+    from app.data.migrations import migrate
+
+    rng = random.Random(42)
+    directory = tempfile.mkdtemp(prefix="search-bench-")
+    pool.DB_PATH = os.path.join(directory, "bench.db")
+    migrate()
+    with get_connection() as conn:
+        for start in range(1, rows + 1, 50000):
+            conn.executemany(
+                "INSERT INTO cyber_incidents (incident_id, timestamp, severity, category, status, description) "
+                "VALUES (?, datetime(1704067200 + ? * 60, 'unixepoch'), ?, ?, ?, ?)",
+                [(i, i, rng.choice(SEVERITIES), rng.choice(CATEGORIES), rng.choice(STATUSES),
+                  _bench_description(rng)) for i in range(start, min(start + 50000, rows + 1))],
+            )
+            conn.commit()
+    invalidate("cyber_incidents")
+
+    results = []
+    with get_connection() as conn:
+        for text in BENCH_QUERIES:
+            terms = text.replace("*", "").split()
+            like = " AND ".join("description LIKE ?" for _ in terms)
+            like_params = [f"%{term}%" for term in terms]
+            # Newest first, as the Dashboard lists incidents
+            like_page_ms, _ = _timed(lambda: conn.execute(
+                f"SELECT * FROM cyber_incidents WHERE {like} ORDER BY timestamp_epoch DESC, incident_id DESC "
+                f"LIMIT ?", like_params + [page_size]).fetchall())
+            like_count_ms, like_count = _timed(lambda: conn.execute(
+                f"SELECT COUNT(*) FROM cyber_incidents WHERE {like}", like_params).fetchone()[0], repeat=2)
+            # The query cache would answer repeats for free; time the SQL itself
+            fts_page_ms, _ = _timed(lambda: search_rows.__wrapped__("cyber_incidents", text, page_size=page_size))
+            fts_count_ms, fts_count = _timed(lambda: count_matches.__wrapped__("cyber_incidents", text), repeat=2)
+            results.append({"query": text, "like_matches": like_count, "fts_matches": fts_count,
+                            "like_page_ms": like_page_ms, "fts_page_ms": fts_page_ms,
+                            "like_count_ms": like_count_ms, "fts_count_ms": fts_count_ms})
+    return results
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+    if command == "rebuild":
+        rebuild_search_indexes()
+        print("Search indexes rebuilt")
+    elif command == "check":
+        problems = check_search_indexes()
+        for name, error in problems:
+            print(f"{name}: {error}")
+        print("Search indexes consistent" if not problems else f"{len(problems)} broken indexes")
+        raise SystemExit(1 if problems else 0)
+    elif command == "bench":
+        rows = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+        print(f"{'query':<30} {'LIKE n':>8} {'FTS n':>8} {'LIKE page':>10} {'FTS page':>10} "
+              f"{'LIKE count':>11} {'FTS count':>10}")
+        for r in benchmark(rows):
+            print(f"{r['query']:<30} {r['like_matches']:>8,} {r['fts_matches']:>8,} "
+                  f"{r['like_page_ms']:>8.1f}ms {r['fts_page_ms']:>8.1f}ms "
+                  f"{r['like_count_ms']:>9.1f}ms {r['fts_count_ms']:>8.1f}ms")
+    else:
+        print("Usage: python -m app.data.search_index [check|rebuild|bench [ROWS]]")
+        raise SystemExit(2)
@@ -0,0 +1,339 @@
+"""
+Columnar Snapshots
+Parquet snapshots of cyber_incidents and it_tickets for large historical
+analysis, read back through memory-mapped files into Arrow-backed DataFrames.
+
+The row path (sqlite3.Row -> dict -> DataFrame) copies every value several
+times and holds each label as its own Python string. A snapshot stores the
+columns once, with severity, status, priority and the other label columns
+dictionary-encoded, and partitioned on disk by month (and by category for
+incidents):
+
+    DATA/snapshots/cyber_incidents/<snapshot id>/month=2024-03/category=Malware/part-0.parquet
+
+read_snapshot() memory-maps the files of the latest snapshot. Only the
+requested columns are decoded, month and filter predicates skip whole
+partitions and row groups, and the result uses pandas' Arrow dtypes, so
+labels stay dictionary-encoded in memory too. analysis_frame(), behind the
+Dashboard's whole-table breakdowns, reads the snapshot while it is current
+and falls back to SQLite otherwise.
+
+Exports are written to a temporary directory and published by renaming it,
+then LATEST is pointed at the new id, so readers never see a half-written
+snapshot. The previous KEEP_SNAPSHOTS are kept for readers still using them.
+
+pyarrow is optional: without it available() is False, exports and reads
+raise RuntimeError, and analysis_frame() always reads SQLite.
+
+Run directly to export every table or show what is on disk:
+    python -m app.data.snapshots export [TABLE ...]
+    python -m app.data.snapshots info
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+from app.data.cache import cached
+from app.data.db import TABLES, table_frame
+from app.data.labels import LABEL_COLUMNS
+from app.data.pool import get_connection
+
+SNAPSHOT_DIR = os.environ.get("INTEL_SNAPSHOT_DIR", "DATA/snapshots")
+KEEP_SNAPSHOTS = 2
+EXPORT_BATCH_ROWS = 100_000
+ROW_GROUP_ROWS = 128 * 1024
+
+# Partition columns per table; "month" is derived from the table's date column
+PARTITIONS = {
+    "cyber_incidents": ("month", "category"),
+    "it_tickets": ("month",),
+}
+# Low-cardinality text columns stored dictionary-encoded, besides the labels
+EXTRA_DICTIONARY_COLUMNS = {"it_tickets": ("assigned_to",)}
+
+
+def available():
+    """True if pyarrow is installed."""
+    return pa is not None
+
+
+def _require_pyarrow():
+    """Fail clearly when pyarrow is missing."""
+    if pa is None:
+        raise RuntimeError("Snapshots need pyarrow: pip install pyarrow")
+
+
+def _spec(table):
+    """Table spec from db.TABLES, for the tables that have snapshots."""
+    if table not in PARTITIONS:
+        raise ValueError(f"No snapshots for table: {table}")
+    return TABLES[table]
+
+
+def _dictionary_columns(table):
+    """Columns stored as Arrow dictionaries."""
+    return tuple(LABEL_COLUMNS.get(table, {})) + EXTRA_DICTIONARY_COLUMNS.get(table, ())
+
+
+def snapshot_schema(table):
+    """Arrow schema of a table's snapshot, partition columns included."""
+    _require_pyarrow()
+    spec = _spec(table)
+    dictionary = _dictionary_columns(table)
+    fields = []
+    for column in spec["columns"]:
+        if column == spec["key"]:
+            kind = pa.int64()
+        elif column == spec["date_column"]:
+            kind = pa.timestamp("s")
+        elif column == "resolution_time_hours":
+            kind = pa.float64()
+        elif column in dictionary:
+            kind = pa.dictionary(pa.int32(), pa.string())
+        else:
+            kind = pa.string()
+        fields.append(pa.field(column, kind))
+    fields.append(pa.field("month", pa.string()))
+    return pa.schema(fields)
+
+
+def _batches(table, schema, batch_size):
+    """Read the table in fetchmany batches as Arrow record batches."""
+    spec = _spec(table)
+    date_column = spec["date_column"]
+    epoch = spec["typed"][date_column]
+    select = ", ".join(epoch if c == date_column else c for c in spec["columns"])
+    with get_connection() as conn:
+        cursor = conn.execute(
+            f"SELECT {select}, strftime('%Y-%m', {epoch}, 'unixepoch') AS month FROM {table} "
+            f"ORDER BY {epoch}, {spec['key']}"
+        )
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            columns = list(zip(*rows))
+            arrays = []
+            for field, values in zip(schema, columns):
+                if pa.types.is_dictionary(field.type):
+                    arrays.append(pa.array(values, pa.string()).dictionary_encode())
+                elif pa.types.is_timestamp(field.type):
+                    arrays.append(pa.array(values, pa.int64()).cast(field.type))
+                else:
+                    arrays.append(pa.array(values, field.type))
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _table_version(table):
+    """The table's write counter (see cache.py), to tell whether a snapshot is stale."""
+    with get_connection() as conn:
+        row = conn.execute("SELECT version FROM table_versions WHERE table_name = ?", (table,)).fetchone()
+    return row["version"] if row else 0
+
+
+def _table_dir(table, directory=None):
+    """Directory holding a table's snapshots."""
+    return os.path.join(directory or SNAPSHOT_DIR, table)
+
+
+def export_snapshot(table, directory=None, batch_size=EXPORT_BATCH_ROWS):
+    """Write a new snapshot of a table and make it the latest; returns its manifest."""
+    _require_pyarrow()
+    started = time.perf_counter()
+    version = _table_version(table)
+    schema = snapshot_schema(table)
+    partition_fields = [schema.field(name) for name in PARTITIONS[table]]
+    dictionary = [c for c in _dictionary_columns(table) if c not in PARTITIONS[table]]
+
+    table_dir = _table_dir(table, directory)
+    os.makedirs(table_dir, exist_ok=True)
+    snapshot_id = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    staging = tempfile.mkdtemp(prefix=".staging-", dir=table_dir)
+    try:
+        parquet = ds.ParquetFileFormat()
+        ds.write_dataset(
+            _batches(table, schema, batch_size), staging, schema=schema, format=parquet,
+            partitioning=ds.partitioning(pa.schema(partition_fields), flavor="hive"),
+            file_options=parquet.make_write_options(use_dictionary=dictionary, compression="zstd"),
+            max_rows_per_group=ROW_GROUP_ROWS, basename_template="part-{i}.parquet",
+        )
+        rows = ds.dataset(staging, format="parquet").count_rows()
+        manifest = {
+            "table": table,
+            "id": snapshot_id,
+            "rows": rows,
+            "version": version,
+            "created_at": time.time(),
+            "export_seconds": time.perf_counter() - started,
+            "bytes": sum(os.path.getsize(os.path.join(root, name))
+                         for root, _, names in os.walk(staging) for name in names),
+        }
+        with open(os.path.join(staging, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+        os.replace(staging, os.path.join(table_dir, snapshot_id))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    latest = os.path.join(table_dir, "LATEST")
+    with open(latest + ".tmp", "w") as f:
+        f.write(snapshot_id)
+    os.replace(latest + ".tmp", latest)
+    _prune(table_dir)
+    return manifest
+
+
+def _prune(table_dir):
+    """Delete all but the newest KEEP_SNAPSHOTS snapshots."""
+    ids = sorted(name for name in os.listdir(table_dir) if not name.startswith(".") and name != "LATEST"
+                 and os.path.isdir(os.path.join(table_dir, name)))
+    for snapshot_id in ids[:-KEEP_SNAPSHOTS]:
+        # Files a reader already has mapped stay readable after unlinking
+        shutil.rmtree(os.path.join(table_dir, snapshot_id), ignore_errors=True)
+
+
+def latest_snapshot(table, directory=None):
+    """Path and manifest of a table's latest snapshot, or (None, None)."""
+    _spec(table)
+    table_dir = _table_dir(table, directory)
+    try:
+        with open(os.path.join(table_dir, "LATEST")) as f:
+            path = os.path.join(table_dir, f.read().strip())
+        with open(os.path.join(path, "manifest.json")) as f:
+            return path, json.load(f)
+    except FileNotFoundError:
+        return None, None
+
+
+def snapshot_info(table, directory=None):
+    """Manifest of the latest snapshot plus whether the table changed since, or None."""
+    _, manifest = latest_snapshot(table, directory)
+    if manifest is None:
+        return None
+    return dict(manifest, stale=_table_version(table) != manifest["version"],
+                age_seconds=time.time() - manifest["created_at"])
+
+
+def _as_datetime(value, end=False):
+    """Inclusive date bound as a datetime ('YYYY-MM-DD' dates cover the whole day)."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value) if len(value) > 10 else date.fromisoformat(value)
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+        if end:
+            value += timedelta(days=1) - timedelta(seconds=1)
+    return value
+
+
+def _filter_expression(table, filters=None, date_from=None, date_to=None):
+    """Arrow predicate for Dashboard-style filters (see db._where_clause).
+
+    Date bounds also compare the month partition column, so whole months
+    outside the range are skipped without opening their files.
+    """
+    spec = _spec(table)
+    expression = None
+
+    def both(a, b):
+        return b if a is None else a & b
+
+    for column, value in (filters or {}).items():
+        if column not in spec["filters"]:
+            raise ValueError(f"Cannot filter {table} on: {column}")
+        values = [v for v in (value if isinstance(value, (list, tuple, set)) else [value]) if v not in (None, "")]
+        if values:
+            expression = both(expression, ds.field(column).isin(values))
+    column = spec["date_column"]
+    if date_from:
+        start = _as_datetime(date_from)
+        expression = both(expression, (ds.field("month") >= start.strftime("%Y-%m"))
+                          & (ds.field(column) >= pa.scalar(start, pa.timestamp("s"))))
+    if date_to:
+        end = _as_datetime(date_to, end=True)
+        expression = both(expression, (ds.field("month") <= end.strftime("%Y-%m"))
+                          & (ds.field(column) <= pa.scalar(end, pa.timestamp("s"))))
+    return expression
+
+
+def open_snapshot(table, directory=None):
+    """The latest snapshot as a pyarrow Dataset over memory-mapped files."""
+    _require_pyarrow()
+    path, _ = latest_snapshot(table, directory)
+    if path is None:
+        raise FileNotFoundError(f"No snapshot of {table}; run: python -m app.data.snapshots export")
+    # Partition values are read as strings: an inferred dictionary would hold the NULL
+    # partition as a null entry, which pyarrow cannot unify across chunks
+    return ds.dataset(path, format="parquet",
+                      partitioning=ds.HivePartitioning.discover(),
+                      filesystem=fs.LocalFileSystem(use_mmap=True),
+                      ignore_prefixes=[".", "_", "manifest"])
+
+
+def read_snapshot(table, columns=None, filters=None, date_from=None, date_to=None, directory=None):
+    """Read the latest snapshot into an Arrow-backed DataFrame.
+
+    ``columns`` limits which columns are decoded (all by default); filters
+    and dates work as in db.query_rows() and are pushed down to partitions
+    and row groups.
+    """
+    import pandas as pd
+
+    dataset = open_snapshot(table, directory)
+    result = dataset.to_table(columns=list(columns) if columns else None,
+                              filter=_filter_expression(table, filters, date_from, date_to))
+    for name in PARTITIONS[table]:   # dictionary-encoded like the other label columns
+        if name in result.column_names:
+            i = result.column_names.index(name)
+            result = result.set_column(i, name, result.column(i).dictionary_encode())
+    return result.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+@cached("cyber_incidents", "it_tickets")
+def analysis_frame(table, columns=None, filters=None, date_from=None, date_to=None, directory=None):
+    """Rows for whole-table analysis, and where they were read from.
+
+    Reads the latest snapshot (read_snapshot()) when pyarrow is installed
+    and the table has not changed since the export; otherwise the same rows
+    come from SQLite through db.table_frame(). Returns ``(frame, source)``,
+    source being "snapshot" or "database"; row order is unspecified.
+    """
+    info = snapshot_info(table, directory) if available() else None
+    if info is not None and not info["stale"]:
+        return read_snapshot(table, columns, filters, date_from, date_to, directory), "snapshot"
+    return table_frame(table, columns, filters, date_from, date_to), "database"
+
+
+def export_all(directory=None):
+    """Export every snapshot table; returns their manifests."""
+    return [export_snapshot(table, directory) for table in PARTITIONS]
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "info"
+    if command == "export":
+        for table in sys.argv[2:] or PARTITIONS:
+            manifest = export_snapshot(table)
+            print(f"✓ {table}: {manifest['rows']:,} rows, {manifest['bytes'] / 1e6:.1f} MB "
+                  f"in {manifest['export_seconds']:.1f}s -> {manifest['id']}")
+    elif command == "info":
+        for table in PARTITIONS:
+            info = snapshot_info(table)
+            if info is None:
+                print(f"{table}: no snapshot")
+            else:
+                print(f"{table}: {info['id']}, {info['rows']:,} rows, {info['bytes'] / 1e6:.1f} MB, "
+                      f"{info['age_seconds'] / 60:.0f} min old{' (stale)' if info['stale'] else ''}")
+    else:
+        print("Usage: python -m app.data.snapshots [export [TABLE ...]|info]")
+        raise SystemExit(2)
@@ -0,0 +1,311 @@
+"""
+Trend Analytics
+Hour, day and week time series over incidents and tickets: counts per
+label, rolling means, and mean / p95 resolution time per assignee.
+
+Each process keeps the columns a trend needs (epoch time, label codes,
+assignee codes, resolution hours) for each table as NumPy arrays, read once
+from the integer epoch columns without parsing any text. Before answering,
+a table's arrays catch up on the rows logged in search_changes since the
+last look (see search_index.py), so new and edited rows are applied without
+re-reading the table; if the log was pruned past that point the arrays are
+reloaded. Bucketing is then a vectorized pass (np.bincount) over the
+arrays, and results are kept until the next change.
+
+Weeks start on Monday. Rows without a valid timestamp (epoch 0) are left
+out. NumPy is optional: without it available() is False.
+"""
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from app.data.labels import LABEL_COLUMNS
+from app.data.pool import get_connection
+from app.data.search_index import CHANGE_LOG_BOUNDS, MAX_LOGGED_CHANGES, prune_changes
+
+GRANULARITIES = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+WEEK_START = -3 * 86400   # Monday 1969-12-29, so week buckets start on Mondays
+LOAD_BATCH_ROWS = 50000
+RELOAD_FRACTION = 0.2   # reload instead of catching up when this share of rows changed
+QUANTILE = 0.95
+
+SERIES = {
+    "cyber_incidents": {"key": "incident_id", "time": "timestamp_epoch", "label": "severity"},
+    "it_tickets": {"key": "ticket_id", "time": "created_at_epoch", "label": "priority",
+                   "group": "assigned_to", "value": "resolution_time_hours"},
+}
+
+_lock = threading.Lock()
+_stores = {}   # table -> {"seq", "ids", "time", "label", "group", "value", "vocab", "codes", "results"}
+
+
+def available():
+    """True if NumPy is installed."""
+    return np is not None
+
+
+def _spec(table):
+    """Series spec of a table."""
+    if table not in SERIES:
+        raise ValueError(f"No trends for table: {table}")
+    return SERIES[table]
+
+
+def _select(spec):
+    """SELECT list for a store's columns, in store order."""
+    columns = [spec["key"], spec["time"], spec["label"]]
+    if "group" in spec:
+        columns += [spec["group"], spec["value"]]
+    return ", ".join(columns)
+
+
+def _encode(store, column, values):
+    """Integer codes for text values, growing the column's vocabulary (NULL -> -1)."""
+    codes, vocab = store["codes"][column], store["vocab"][column]
+    result = np.empty(len(values), dtype=np.int32)
+    for i, value in enumerate(values):
+        code = codes.get(value)
+        if code is None:
+            if value is None:
+                code = -1
+            else:
+                code = codes[value] = len(vocab)
+                vocab.append(value)
+        result[i] = code
+    return result
+
+
+def _arrays(store, spec, rows):
+    """Store-ordered column arrays for fetched rows."""
+    columns = list(zip(*rows)) if rows else [()] * (5 if "group" in spec else 3)
+    arrays = {
+        "ids": np.array(columns[0], dtype=np.int64),
+        "time": np.array(columns[1], dtype=np.int64),
+        "label": _encode(store, spec["label"], columns[2]),
+    }
+    if "group" in spec:
+        arrays["group"] = _encode(store, spec["group"], columns[3])
+        arrays["value"] = np.array(columns[4], dtype=np.float64)   # NULL -> NaN
+    return arrays
+
+
+def _new_store(table, spec):
+    """An empty store with the known labels first in each vocabulary."""
+    columns = [spec["label"]] + ([spec["group"]] if "group" in spec else [])
+    vocab = {c: list(LABEL_COLUMNS.get(table, {}).get(c, ())) for c in columns}
+    return {
+        "seq": 0,
+        "vocab": vocab,
+        "codes": {c: {value: i for i, value in enumerate(vocab[c])} for c in columns},
+        "results": {},
+    }
+
+
+def _load(conn, table, spec):
+    """Read a whole table into a new store."""
+    store = _new_store(table, spec)
+    store["seq"] = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM search_changes").fetchone()[0]
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(f"SELECT {_select(spec)} FROM {table} ORDER BY {spec['key']}")
+    parts = []
+    while True:
+        rows = cursor.fetchmany(LOAD_BATCH_ROWS)
+        if not rows:
+            break
+        parts.append(_arrays(store, spec, rows))
+    parts = parts or [_arrays(store, spec, [])]
+    for name in parts[0]:
+        store[name] = np.concatenate([part[name] for part in parts])
+    return store
+
+
+def _find(ids, wanted):
+    """Positions of wanted ids in the sorted ids array, and which of them are there."""
+    positions = np.searchsorted(ids, wanted)
+    if not len(ids):
+        return positions, np.zeros(len(wanted), dtype=bool)
+    return positions, ids[np.minimum(positions, len(ids) - 1)] == wanted
+
+
+def _catch_up(conn, table, spec, store):
+    """Apply logged changes since store["seq"]; returns False if a reload is needed."""
+    first = conn.execute("SELECT MIN(seq) FROM search_changes").fetchone()[0]
+    if first is not None and first > store["seq"] + 1:
+        return False
+    latest = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM search_changes").fetchone()[0]
+    if latest == store["seq"]:
+        return True
+    changed = [row[0] for row in conn.execute(
+        "SELECT DISTINCT row_id FROM search_changes WHERE seq > ? AND seq <= ? AND table_name = ?",
+        (store["seq"], latest, table),
+    )]
+    if len(changed) > max(RELOAD_FRACTION * len(store["ids"]), 1000):
+        return False   # a bulk load: re-reading the table is quicker
+    for start in range(0, len(changed), 500):
+        batch = np.array(changed[start:start + 500], dtype=np.int64)
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(
+            f"SELECT {_select(spec)} FROM {table} WHERE {spec['key']} IN ({', '.join('?' * len(batch))})",
+            batch.tolist(),
+        ).fetchall()
+        fresh = _arrays(store, spec, rows)
+        ids = store["ids"]
+
+        # Deleted rows are dropped; rows still present are overwritten in place
+        positions, present = _find(ids, batch)
+        gone = positions[present & ~np.isin(batch, fresh["ids"])]
+        if len(gone):
+            keep = np.ones(len(ids), dtype=bool)
+            keep[gone] = False
+            for name in fresh:
+                store[name] = store[name][keep]
+            ids = store["ids"]
+
+        positions, known = _find(ids, fresh["ids"])
+        for name in fresh:
+            store[name][positions[known]] = fresh[name][known]
+        if not known.all():
+            # New rows: append, then restore key order if any arrived out of order
+            for name in fresh:
+                store[name] = np.concatenate([store[name], fresh[name][~known]])
+            if len(ids) and fresh["ids"][~known].min() < ids[-1]:
+                order = np.argsort(store["ids"], kind="stable")
+                for name in fresh:
+                    store[name] = store[name][order]
+    store["seq"] = latest
+    store["results"] = {}
+    return True
+
+
+def refresh(table):
+    """Bring a table's arrays up to date; returns its store."""
+    spec = _spec(table)
+    with _lock, get_connection() as conn:
+        store = _stores.get(table)
+        if store is None or not _catch_up(conn, table, spec, store):
+            store = _stores[table] = _load(conn, table, spec)
+        first, latest = conn.execute(CHANGE_LOG_BOUNDS).fetchone()
+        if first is not None and latest - first > 2 * MAX_LOGGED_CHANGES:
+            prune_changes(conn)
+        return store
+
+
+def _memoized(table, name, args, compute):
+    """Compute a result once per table state."""
+    store = refresh(table)
+    key = (name,) + args
+    with _lock:
+        if key not in store["results"]:
+            store["results"][key] = compute(store)
+        return store["results"][key]
+
+
+def _epoch(value, end=False):
+    """Epoch seconds for a 'YYYY-MM-DD' (inclusive, whole day) bound, a date or a number."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    day = np.datetime64(str(value)[:10], "D")
+    return int((day + (1 if end else 0)).astype("datetime64[s]").astype(np.int64)) - (1 if end else 0)
+
+
+def _buckets(store, granularity, start, end):
+    """Row mask and bucket index per row, plus the bucket start times (datetime64)."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    size = GRANULARITIES[granularity]
+    origin = WEEK_START if granularity == "week" else 0
+    times = store["time"]
+    mask = times != 0
+    if start is not None:
+        mask &= times >= start
+    if end is not None:
+        mask &= times <= end
+    bucket = (times - origin) // size
+    if mask.any():
+        first, last = bucket[mask].min(), bucket[mask].max()
+    else:
+        first, last = 0, -1
+    starts = (np.arange(first, last + 1) * size + origin).astype("datetime64[s]")
+    return mask, bucket - first, starts
+
+
+def bucket_counts(table, granularity="day", date_from=None, date_to=None):
+    """Rows per time bucket and label (severity for incidents, priority for tickets).
+
+    Returns a dict with ``buckets`` (bucket start times, every bucket from the
+    first to the last non-empty one), ``labels`` and ``counts``, an int array
+    of shape (buckets, labels).
+    """
+    start, end = _epoch(date_from), _epoch(date_to, end=True)
+
+    def compute(store):
+        mask, bucket, starts = _buckets(store, granularity, start, end)
+        labels = store["vocab"][_spec(table)["label"]]
+        mask &= store["label"] >= 0
+        flat = bucket[mask] * len(labels) + store["label"][mask]
+        counts = np.bincount(flat, minlength=len(starts) * len(labels)).reshape(len(starts), len(labels))
+        return {"buckets": starts, "labels": list(labels), "counts": counts}
+
+    return _memoized(table, "counts", (granularity, start, end), compute)
+
+
+def rolling_mean(values, window):
+    """Mean over each bucket and the window - 1 before it (fewer at the start), along axis 0."""
+    values = np.asarray(values, dtype=np.float64)
+    window = max(1, int(window))
+    totals = np.cumsum(values, axis=0)
+    totals[window:] = totals[window:] - totals[:-window]
+    sizes = np.minimum(np.arange(1, len(values) + 1), window)
+    return totals / sizes.reshape((-1,) + (1,) * (values.ndim - 1))
+
+
+def resolution_stats(granularity="week", date_from=None, date_to=None):
+    """Mean and p95 resolution_time_hours per time bucket (by created_at) and assignee.
+
+    Returns a dict with ``buckets``, ``assignees`` and three arrays of shape
+    (buckets, assignees): ``count`` of resolved tickets, ``mean`` and ``p95``
+    hours (NaN where an assignee resolved nothing in a bucket). p95 is the
+    nearest-rank percentile.
+    """
+    start, end = _epoch(date_from), _epoch(date_to, end=True)
+
+    def compute(store):
+        mask, bucket, starts = _buckets(store, granularity, start, end)
+        assignees = store["vocab"]["assigned_to"]
+        mask &= (store["group"] >= 0) & ~np.isnan(store["value"])
+        width = len(assignees)
+        key = bucket[mask] * width + store["group"][mask]
+        hours = store["value"][mask]
+        size = len(starts) * width
+
+        count = np.bincount(key, minlength=size)
+        total = np.bincount(key, weights=hours, minlength=size)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = total / count
+        p95 = np.full(size, np.nan)
+        if len(key):
+            order = np.lexsort((hours, key))
+            groups, first, sizes = np.unique(key[order], return_index=True, return_counts=True)
+            rank = np.maximum(np.ceil(sizes * QUANTILE).astype(np.int64) - 1, 0)   # nearest rank, 0-based
+            p95[groups] = hours[order][first + rank]
+        shape = (len(starts), width)
+        return {"buckets": starts, "assignees": list(assignees), "count": count.reshape(shape),
+                "mean": mean.reshape(shape), "p95": p95.reshape(shape)}
+
+    return _memoized("it_tickets", "resolution", (granularity, start, end), compute)
+
+
+def store_stats():
+    """Rows, memory and log position per loaded table."""
+    with _lock:
+        return {
+            table: {"rows": len(store["ids"]), "seq": store["seq"],
+                    "bytes": sum(store[name].nbytes for name in ("ids", "time", "label", "group", "value")
+                                 if name in store)}
+            for table, store in _stores.items()
+        }
@@ -0,0 +1,259 @@
+"""
+Vector Index
+In-memory embedding matrices over incident and ticket text, for top-k
+cosine search next to the FTS5 keyword search.
+
+Embeddings use the hashing trick: each word and word pair is hashed into
+one of EMBEDDING_DIM signed buckets and the vector is L2-normalized. That
+needs no model download, yet still matches rows that share vocabulary
+without sharing exact phrases the keyword index would rank highly.
+
+Each process keeps one matrix per table, holding at most MAX_INDEXED_ROWS
+rows (the newest by key; older rows are still found by keyword search).
+Matrices are built on a background thread: until a table's is ready,
+vector_search() returns None and callers use keyword search alone.
+
+Before a search the matrix reads the rows logged in search_changes since
+its last look (see search_index.py) and re-embeds only those. New rows go
+into spare capacity, which doubles when full, and deleted rows are zeroed
+and compacted away once they are a quarter of the matrix. A table is
+rebuilt in the background (and searched as it was meanwhile) when more
+than MAX_CATCH_UP_ROWS changed, the log was pruned past that point, or it
+outgrew MAX_INDEXED_ROWS by half.
+
+NumPy is optional: without it available() is False.
+"""
+import logging
+import os
+import re
+import threading
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from app import instrumentation
+from app.data.pool import get_connection
+from app.data.search_index import CHANGE_LOG_BOUNDS, MAX_LOGGED_CHANGES, SEARCH_INDEXES, index_for, prune_changes
+
+EMBEDDING_DIM = 512
+MAX_INDEXED_ROWS = int(os.environ.get("INTEL_VECTOR_ROWS", "100000"))   # 2 KB each
+MAX_CATCH_UP_ROWS = 2000   # changed rows embedded during a search; more means a rebuild
+BUILD_BATCH_ROWS = 10000
+
+_lock = threading.Lock()
+_indexes = {}   # source table -> {"ids", "matrix", "size", "dead", "positions", "seq"}
+_wanted = set()   # tables waiting for a background build
+_wake = threading.Event()
+_state = {"builder": None}
+logger = logging.getLogger(__name__)
+
+
+def available():
+    """True if NumPy is installed."""
+    return np is not None
+
+
+def _features(text):
+    """Words and adjacent word pairs of a text."""
+    words = re.findall(r"\w+", (text or "").lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def embed(texts):
+    """Unit-length hashing embeddings, one float32 row per text."""
+    matrix = np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for feature in _features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            matrix[i, h % EMBEDDING_DIM] += 1.0 if h & 0x80000000 else -1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _row_text(spec, row):
+    """The text embedded for one row: every indexed column."""
+    return " ".join(str(row[c]) for c in spec["columns"] if row[c])
+
+
+def _fetch(conn, spec, ids=None):
+    """(ids, texts) for the given ids, or the newest MAX_INDEXED_ROWS rows of a source table."""
+    sql = f"SELECT {spec['key']}, {', '.join(spec['columns'])} FROM {spec['source']}"
+    if ids is not None:
+        sql += f" WHERE {spec['key']} IN ({', '.join('?' * len(ids))})"
+        params = tuple(ids)
+    else:
+        sql += f" ORDER BY {spec['key']} DESC LIMIT ?"
+        params = (MAX_INDEXED_ROWS,)
+    rows = conn.execute(sql, params).fetchall()
+    return [row[0] for row in rows], [_row_text(spec, row) for row in rows]
+
+
+def _build(spec):
+    """Embed a table's newest rows into a new, compact index."""
+    with get_connection() as conn:
+        seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM search_changes").fetchone()[0]
+        ids, texts = _fetch(conn, spec)
+    matrix = np.empty((len(ids), EMBEDDING_DIM), dtype=np.float32)
+    for start in range(0, len(ids), BUILD_BATCH_ROWS):
+        matrix[start:start + BUILD_BATCH_ROWS] = embed(texts[start:start + BUILD_BATCH_ROWS])
+    instrumentation.count("vector_index.builds")
+    return {
+        "ids": np.array(ids, dtype=np.int64),
+        "matrix": matrix,
+        "size": len(ids),
+        "dead": 0,
+        "positions": {row_id: i for i, row_id in enumerate(ids)},
+        "seq": seq,
+    }
+
+
+def _append(index, ids, vectors):
+    """Add rows after the used part of the matrix, doubling its capacity when full."""
+    size, end = index["size"], index["size"] + len(ids)
+    if end > len(index["matrix"]):
+        capacity = max(end, 2 * len(index["matrix"]), 16)
+        matrix = np.zeros((capacity, EMBEDDING_DIM), dtype=np.float32)
+        matrix[:size] = index["matrix"][:size]
+        row_ids = np.zeros(capacity, dtype=np.int64)
+        row_ids[:size] = index["ids"][:size]
+        index["matrix"], index["ids"] = matrix, row_ids
+    index["matrix"][size:end] = vectors
+    index["ids"][size:end] = ids
+    index["positions"].update((row_id, size + i) for i, row_id in enumerate(ids))
+    index["size"] = end
+
+
+def _compact(index):
+    """Drop deleted rows from the matrix."""
+    live = np.sort(np.fromiter(index["positions"].values(), dtype=np.int64, count=len(index["positions"])))
+    index["matrix"], index["ids"] = index["matrix"][live], index["ids"][live]
+    index["positions"] = {int(row_id): i for i, row_id in enumerate(index["ids"])}
+    index["size"], index["dead"] = len(live), 0
+
+
+def _catch_up(conn, spec, index):
+    """Apply logged changes since index["seq"]; returns False if a rebuild is needed."""
+    # Read latest first and bound the read by it, so a change committed meanwhile is left for the next call
+    first, latest = conn.execute(CHANGE_LOG_BOUNDS).fetchone()
+    if first is not None and first > index["seq"] + 1:
+        return False
+    latest = latest or 0
+    changed = list(dict.fromkeys(row[0] for row in conn.execute(
+        "SELECT row_id FROM search_changes WHERE seq > ? AND seq <= ? AND table_name = ? ORDER BY seq",
+        (index["seq"], latest, spec["source"]),
+    )))
+    if len(changed) > MAX_CATCH_UP_ROWS:
+        return False
+    for start in range(0, len(changed), 500):
+        batch = changed[start:start + 500]
+        ids, texts = _fetch(conn, spec, batch)
+        vectors = embed(texts)
+        new = [i for i, row_id in enumerate(ids) if row_id not in index["positions"]]
+        for i, row_id in enumerate(ids):
+            if row_id in index["positions"]:
+                index["matrix"][index["positions"][row_id]] = vectors[i]
+        if new:
+            _append(index, [ids[i] for i in new], vectors[new])
+        for row_id in set(batch) - set(ids):   # deleted: zero the vector, never matches
+            position = index["positions"].pop(row_id, None)
+            if position is not None:
+                index["matrix"][position] = 0.0
+                index["dead"] += 1
+    if index["dead"] * 4 > index["size"]:
+        _compact(index)
+    index["seq"] = latest
+    return len(index["positions"]) <= MAX_INDEXED_ROWS * 1.5
+
+
+def refresh(source):
+    """Bring a table's matrix up to date; returns the index, or None until it is built.
+
+    A table without a matrix, or one that needs a rebuild, is handed to
+    the background builder; the latter is searched as it is meanwhile.
+    """
+    _, spec = index_for(source)
+    with _lock, get_connection() as conn:
+        index = _indexes.get(source)
+        if index is not None and source not in _wanted and not _catch_up(conn, spec, index):
+            _wanted.add(source)
+        if index is None:
+            _wanted.add(source)
+        if _wanted:
+            _start()
+            _wake.set()
+        first, latest = conn.execute(CHANGE_LOG_BOUNDS).fetchone()
+        if first is not None and latest - first > 2 * MAX_LOGGED_CHANGES:
+            prune_changes(conn)
+        return index
+
+
+def vector_search(source, text, limit=10):
+    """Most similar row ids in a source table as (id, cosine), best first.
+
+    Returns None while the table's matrix is still being built.
+    """
+    if not available():
+        return None
+    index = refresh(source)
+    if index is None:
+        return None
+    with _lock:   # catch-up may swap the arrays; rows it overwrites in place are harmless
+        matrix, ids = index["matrix"][:index["size"]], index["ids"][:index["size"]]
+    scores = matrix @ embed([text])[0]
+    limit = min(limit, len(scores))
+    if not limit:
+        return []
+    top = np.argpartition(-scores, limit - 1)[:limit]
+    top = top[np.argsort(-scores[top])]
+    return [(int(ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+
+def index_stats():
+    """Rows, memory and log position per loaded matrix."""
+    with _lock:
+        return {
+            source: {"rows": len(index["positions"]), "bytes": int(index["matrix"].nbytes),
+                     "seq": index["seq"], "building": source in _wanted}
+            for source, index in _indexes.items()
+        }
+
+
+def _start():
+    """Start the builder thread (once per process; caller holds the lock)."""
+    if _state["builder"] is None:
+        _state["builder"] = threading.Thread(target=_builder, name="vector-index-builder", daemon=True)
+        _state["builder"].start()
+
+
+def _builder():
+    """Build the matrices of tables in _wanted, off the request threads."""
+    while True:
+        _wake.wait()
+        _wake.clear()
+        with _lock:
+            sources = sorted(_wanted)
+        for source in sources:
+            try:
+                index = _build(index_for(source)[1])
+            except Exception:  # keep the builder alive; searches stay keyword-only
+                logger.exception("Building the %s vector index failed", source)
+                instrumentation.count("vector_index.errors")
+                with _lock:
+                    _wanted.discard(source)   # retried on the next search
+                continue
+            with _lock:
+                _indexes[source] = index
+                _wanted.discard(source)   # the next search catches up from index["seq"]
+
+
+def warm():
+    """Start building every matrix now rather than on the first search."""
+    if available():
+        with _lock:
+            _wanted.update(spec["source"] for spec in SEARCH_INDEXES.values() if spec["source"] not in _indexes)
+            _start()
+        _wake.set()
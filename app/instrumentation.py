@@ -0,0 +1,263 @@
+"""
+Hot-Path Instrumentation
+Timers, counters and per-rerun spans for the app's hot paths, with a
+Prometheus text and JSON export.
+
+- timer(name) times a block and keeps its latest samples, so p50/p95 can
+  be read per operation; the timed decorator does the same for a function
+  (login and registration, retrieval, chat context building).
+- count(name, value) adds to a counter (queries, rows fetched, bytes).
+- span(name) is a timer that also collects everything timed inside it on
+  the same thread into a trace; the router opens one per page rerun, and
+  the last few traces are kept for the performance panel.
+
+Set INTEL_METRICS=0 to turn recording off. timer() and span() then hand
+back one shared no-op context manager, count() returns at once, and the
+timed decorator returns the function unchanged, so call sites cost a
+function call and an attribute check. The setting is read at import time.
+"""
+import json
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+ENABLED = os.environ.get("INTEL_METRICS", "1") not in ("", "0")
+SAMPLE_SIZE = 1024   # latest samples kept per operation for percentiles
+MAX_TRACES = 50
+MAX_SPANS_PER_TRACE = 200
+QUANTILES = (0.5, 0.95, 0.99)
+
+_lock = threading.Lock()
+_local = threading.local()
+_operations = {}   # name -> {"count", "total", "max", "samples"}
+_counters = {}
+_traces = deque(maxlen=MAX_TRACES)
+_NOOP = nullcontext()
+
+
+def observe(name, seconds):
+    """Record one duration sample for an operation."""
+    if not ENABLED:
+        return
+    with _lock:
+        operation = _operations.get(name)
+        if operation is None:
+            operation = _operations[name] = {
+                "count": 0, "total": 0.0, "max": 0.0, "samples": deque(maxlen=SAMPLE_SIZE),
+            }
+        operation["count"] += 1
+        operation["total"] += seconds
+        operation["max"] = max(operation["max"], seconds)
+        operation["samples"].append(seconds)
+
+
+def count(name, value=1):
+    """Add value to a counter."""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+@contextmanager
+def _timer(name):
+    """Time a block; inside a span, also add it to the span's trace."""
+    trace = getattr(_local, "trace", None)
+    started = time.perf_counter()
+    if trace is not None:
+        _local.depth += 1
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        observe(name, seconds)
+        if trace is not None:
+            _local.depth -= 1
+            if len(trace["spans"]) < MAX_SPANS_PER_TRACE:
+                trace["spans"].append({
+                    "name": name,
+                    "depth": _local.depth,
+                    "start_ms": (started - trace["started"]) * 1000,
+                    "ms": seconds * 1000,
+                })
+
+
+def timer(name):
+    """Context manager timing a block as operation ``name``."""
+    if not ENABLED:
+        return _NOOP
+    return _timer(name)
+
+
+@contextmanager
+def _span(name):
+    """Open a trace on this thread unless one is already open."""
+    if getattr(_local, "trace", None) is not None:
+        with _timer(name):
+            yield
+        return
+    trace = _local.trace = {"name": name, "started": time.perf_counter(), "spans": []}
+    _local.depth = 0
+    try:
+        with _timer(name):
+            yield
+    finally:
+        _local.trace = None
+        # Spans were appended as they finished; list them in start order
+        trace["spans"].sort(key=lambda s: s["start_ms"])
+        trace["ms"] = (time.perf_counter() - trace.pop("started")) * 1000
+        trace["at"] = time.time()
+        with _lock:
+            _traces.append(trace)
+
+
+def span(name):
+    """Time a block as ``name`` and trace what is timed inside it on this thread.
+
+    Nested spans are ordinary timers within the outermost one.
+    """
+    if not ENABLED:
+        return _NOOP
+    return _span(name)
+
+
+def timed(name=None):
+    """Decorator timing every call of a function (as module.function by default)."""
+    def decorator(func):
+        if not ENABLED:
+            return func
+        label = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with _timer(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _quantile(ordered, q):
+    """Nearest-rank quantile of a sorted list."""
+    return ordered[max(0, math.ceil(len(ordered) * q) - 1)]
+
+
+def operation_stats():
+    """Per-operation count, mean, p50/p95/p99 and max, in milliseconds.
+
+    Percentiles are over the latest SAMPLE_SIZE samples; count, mean and
+    max cover every call since start (or reset()).
+    """
+    with _lock:
+        snapshot = {name: dict(op, samples=sorted(op["samples"])) for name, op in _operations.items()}
+    result = {}
+    for name, op in sorted(snapshot.items()):
+        stats = {
+            "count": op["count"],
+            "total_ms": op["total"] * 1000,
+            "mean_ms": op["total"] / op["count"] * 1000,
+            "max_ms": op["max"] * 1000,
+        }
+        for q in QUANTILES:
+            stats[f"p{int(q * 100)}_ms"] = _quantile(op["samples"], q) * 1000
+        result[name] = stats
+    return result
+
+
+def counters():
+    """Current counter values."""
+    with _lock:
+        return dict(sorted(_counters.items()))
+
+
+def recent_traces(limit=MAX_TRACES):
+    """The newest finished traces, newest first."""
+    with _lock:
+        return list(_traces)[::-1][:limit]
+
+
+def reset():
+    """Forget every sample, counter and trace."""
+    with _lock:
+        _operations.clear()
+        _counters.clear()
+        _traces.clear()
+
+
+def gauges():
+    """Point-in-time numbers from the connection pool and query cache."""
+    from app.data.cache import cache_stats
+    from app.data.pool import pool_stats
+
+    values = {f"pool_{key}": value for key, value in pool_stats().items()}
+    values.update({f"cache_{key}": value for key, value in cache_stats().items()})
+    return values
+
+
+def _auth_histograms():
+    """bcrypt pool latency histograms, if the auth pool has been loaded."""
+    auth_executor = sys.modules.get("app.services.auth_executor")
+    return auth_executor.latency_histograms() if auth_executor else {}
+
+
+def metrics_json():
+    """Everything recorded, as a JSON document."""
+    return json.dumps({
+        "enabled": ENABLED,
+        "operations": operation_stats(),
+        "counters": counters(),
+        "gauges": gauges(),
+        "auth_latency": _auth_histograms(),
+        "traces": recent_traces(),
+    }, indent=2, default=str)
+
+
+def _label(value):
+    """Escape a Prometheus label value."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    """Everything recorded, in the Prometheus text exposition format."""
+    lines = [
+        "# HELP intel_operation_seconds Time spent per operation (quantiles over recent samples).",
+        "# TYPE intel_operation_seconds summary",
+    ]
+    for name, stats in operation_stats().items():
+        label = f'operation="{_label(name)}"'
+        for q in QUANTILES:
+            lines.append(f'intel_operation_seconds{{{label},quantile="{q}"}} '
+                         f"{stats[f'p{int(q * 100)}_ms'] / 1000:.6f}")
+        lines.append(f"intel_operation_seconds_sum{{{label}}} {stats['total_ms'] / 1000:.6f}")
+        lines.append(f"intel_operation_seconds_count{{{label}}} {stats['count']}")
+
+    lines += ["# HELP intel_events_total Counted events (queries, rows, bytes).",
+              "# TYPE intel_events_total counter"]
+    for name, value in counters().items():
+        lines.append(f'intel_events_total{{name="{_label(name)}"}} {value}')
+
+    lines += ["# HELP intel_gauge Connection pool and query cache state.",
+              "# TYPE intel_gauge gauge"]
+    for name, value in gauges().items():
+        lines.append(f'intel_gauge{{name="{_label(name)}"}} {float(value)}')
+
+    histograms = _auth_histograms()
+    if histograms:
+        lines += ["# HELP intel_auth_seconds bcrypt pool latency per operation.",
+                  "# TYPE intel_auth_seconds histogram"]
+        for operation, histogram in histograms.items():
+            label = f'operation="{_label(operation)}"'
+            cumulative = 0
+            for bound_ms, bucket in histogram["buckets"].items():
+                cumulative += bucket
+                if bound_ms == float("inf"):
+                    continue
+                lines.append(f'intel_auth_seconds_bucket{{{label},le="{bound_ms / 1000}"}} {cumulative}')
+            lines.append(f'intel_auth_seconds_bucket{{{label},le="+Inf"}} {histogram["count"]}')
+            lines.append(f"intel_auth_seconds_sum{{{label}}} {histogram['sum_ms'] / 1000:.6f}")
+            lines.append(f"intel_auth_seconds_count{{{label}}} {histogram['count']}")
+    return "\n".join(lines) + "\n"
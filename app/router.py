@@ -0,0 +1,79 @@
+"""
+Page Router
+Maps page names to importable view modules with a render() entry point.
+
+Each view is imported the first time it is shown and then stays in
+sys.modules, so switching pages no longer re-reads, re-compiles and
+re-imports the page source on every rerun. Heavy libraries (pandas,
+openai) are only imported by the views that need them, when first used.
+
+Every render is also a root span (see instrumentation.py), so the
+performance panel can show what each rerun spent its time on.
+"""
+import importlib
+import threading
+import time
+
+from app import instrumentation
+
+# page name -> (module, label)
+PAGES = {
+    "dashboard": ("app.views.dashboard", "📊 Dashboard"),
+    "chatgpt": ("app.views.chatgpt", "🤖 AI Assistant"),
+    "performance": ("app.views.performance", "⏱️ Performance"),
+}
+
+_lock = threading.Lock()
+_timings = {}
+
+
+def _record(name, key, seconds):
+    """Accumulate a timing sample for a page."""
+    with _lock:
+        timing = _timings.setdefault(name, {
+            "import_ms": None,
+            "cold_render_ms": None,
+            "warm_renders": 0,
+            "warm_render_ms_total": 0.0,
+        })
+        if key == "warm":
+            timing["warm_renders"] += 1
+            timing["warm_render_ms_total"] += seconds * 1000
+        else:
+            timing[key] = seconds * 1000
+
+
+def load_page(name):
+    """Import (once) and return the view module for a page."""
+    if name not in PAGES:
+        raise KeyError(f"Unknown page: {name}")
+    module_name = PAGES[name][0]
+    started = time.perf_counter()
+    cold = name not in _timings
+    module = importlib.import_module(module_name)
+    if cold:
+        _record(name, "import_ms", time.perf_counter() - started)
+    return module
+
+
+def render_page(name):
+    """Render a registered page, timing cold (first) and warm renders."""
+    module = load_page(name)
+    cold = _timings[name]["cold_render_ms"] is None
+    started = time.perf_counter()
+    try:
+        with instrumentation.span(f"rerun.{name}"):
+            module.render()
+    finally:
+        _record(name, "cold_render_ms" if cold else "warm", time.perf_counter() - started)
+
+
+def page_timings():
+    """Import and render timings per page, in milliseconds."""
+    with _lock:
+        result = {}
+        for name, timing in _timings.items():
+            warm = timing["warm_renders"]
+            result[name] = dict(timing, avg_warm_render_ms=(
+                timing["warm_render_ms_total"] / warm if warm else None))
+    return result
@@ -0,0 +1,136 @@
+"""
+Auth Executor
+Runs bcrypt hashing and verification on a bounded worker pool.
+
+bcrypt releases the GIL while it works, so a small thread pool lets several
+logins hash in parallel instead of queuing up behind each other in the
+Streamlit script threads. The number of requests waiting for or holding a
+worker is capped; beyond that new requests are rejected with AuthBusyError
+rather than piling up.
+
+The work factor comes from the BCRYPT_ROUNDS environment variable. Stored
+hashes made with a different cost are reported by needs_rehash() so the
+login path can upgrade them transparently.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import bcrypt
+
+from app import instrumentation
+
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+AUTH_WORKERS = int(os.environ.get("AUTH_WORKERS", str(min(4, os.cpu_count() or 1))))
+AUTH_MAX_PENDING = int(os.environ.get("AUTH_MAX_PENDING", "32"))
+AUTH_TIMEOUT_SECONDS = 30
+
+# Upper bounds (milliseconds) of the latency histogram buckets
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+
+class AuthBusyError(Exception):
+    """Raised when too many hashing requests are already queued, or one waited too long."""
+
+
+_executor = ThreadPoolExecutor(max_workers=AUTH_WORKERS, thread_name_prefix="bcrypt")
+_pending = threading.BoundedSemaphore(AUTH_MAX_PENDING)
+_lock = threading.Lock()
+_histograms = {}
+
+
+def _record(operation, seconds):
+    """Add one latency sample to the operation's histogram."""
+    ms = seconds * 1000
+    instrumentation.observe(f"auth.{operation}", seconds)
+    with _lock:
+        histogram = _histograms.setdefault(operation, {
+            "count": 0,
+            "sum_ms": 0.0,
+            "max_ms": 0.0,
+            "buckets": [0] * len(LATENCY_BUCKETS_MS),
+        })
+        histogram["count"] += 1
+        histogram["sum_ms"] += ms
+        histogram["max_ms"] = max(histogram["max_ms"], ms)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if ms <= bound:
+                histogram["buckets"][i] += 1
+                break
+
+
+def run(operation, func, *args):
+    """Run func(*args) on the bcrypt pool and wait for the result.
+
+    The recorded latency includes time spent waiting for a free worker.
+    Raises AuthBusyError if AUTH_MAX_PENDING requests are already in flight,
+    or if the result is not ready within AUTH_TIMEOUT_SECONDS (the workers
+    are saturated). A request that timed out keeps its place in the limit
+    until its job finishes or is cancelled, and is recorded only as
+    ``<operation>_timed_out``.
+    """
+    if not _pending.acquire(blocking=False):
+        _record(f"{operation}_rejected", 0.0)
+        raise AuthBusyError("Authentication service is busy, please retry")
+    started = time.perf_counter()
+    try:
+        future = _executor.submit(func, *args)
+    except BaseException:
+        _pending.release()
+        raise
+    future.add_done_callback(lambda _: _pending.release())
+    timed_out = False
+    try:
+        return future.result(timeout=AUTH_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        timed_out = True
+        future.cancel()   # drop it if it has not started yet
+        raise AuthBusyError("Authentication service is busy, please retry") from None
+    finally:
+        _record(f"{operation}_timed_out" if timed_out else operation, time.perf_counter() - started)
+
+
+def _hash(password_bytes, rounds):
+    """Salt and hash (runs on a pool thread)."""
+    return bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds=rounds))
+
+
+def hash_password(plain_text_password, rounds=None):
+    """Hash a password on the pool with the configured work factor."""
+    hashed = run("hash", _hash, plain_text_password.encode('utf-8'), rounds or BCRYPT_ROUNDS)
+    return hashed.decode('utf-8')
+
+
+def verify_password(plain_text_password, hashed_password):
+    """Check a password against a stored bcrypt hash on the pool."""
+    return run("verify", bcrypt.checkpw,
+               plain_text_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+def hash_cost(hashed_password):
+    """Work factor encoded in a bcrypt hash ("$2b$12$..." -> 12), or None."""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed_password):
+    """True if a stored hash was made with a different work factor."""
+    return hash_cost(hashed_password) != BCRYPT_ROUNDS
+
+
+def latency_histograms():
+    """Per-operation latency histograms: count, sum/max/avg ms and bucket counts."""
+    with _lock:
+        result = {}
+        for operation, histogram in _histograms.items():
+            result[operation] = {
+                "count": histogram["count"],
+                "sum_ms": histogram["sum_ms"],
+                "max_ms": histogram["max_ms"],
+                "avg_ms": histogram["sum_ms"] / histogram["count"] if histogram["count"] else 0.0,
+                "buckets": dict(zip(LATENCY_BUCKETS_MS, histogram["buckets"])),
+            }
+    return result
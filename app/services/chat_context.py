@@ -0,0 +1,161 @@
+"""
+Chat Context
+Keeps what the AI Assistant sends per request within a fixed token budget.
+
+Sending the whole history every turn makes each request slower and more
+expensive than the last, until the model's context limit is hit. Instead
+each request carries:
+
+- the system prompt,
+- a rolling summary of the older turns (as a second system message),
+- the most recent messages that fit in CONTEXT_TOKEN_BUDGET.
+
+When the unsummarized messages outgrow the budget, the oldest of them are
+folded into the summary. Enough are folded to bring the window down to
+WINDOW_TARGET_RATIO of the budget, so the summarizer runs once every few
+turns rather than on every turn. The summary itself is capped at
+SUMMARY_TOKEN_BUDGET.
+
+Tokens are counted with tiktoken when it is installed, otherwise estimated
+at about four characters per token.
+"""
+import os
+
+from app.instrumentation import timed
+from app.services import chat_service
+
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CHAT_CONTEXT_TOKENS", "3000"))
+SUMMARY_TOKEN_BUDGET = int(os.environ.get("CHAT_SUMMARY_TOKENS", "400"))
+WINDOW_TARGET_RATIO = 0.6
+MESSAGE_OVERHEAD_TOKENS = 4   # role and separators per message
+REPLY_PRIMING_TOKENS = 3
+
+SUMMARY_PROMPT = f"""Summarize the conversation below between a user and an AI assistant for cybersecurity, data and IT operations teams. Keep incident IDs, ticket IDs, hostnames, decisions and open questions. Merge it with the previous summary if there is one. Reply with the summary only, in at most {SUMMARY_TOKEN_BUDGET * 3 // 4} words."""
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+_encoder = None
+
+
+def count_tokens(text):
+    """Tokens in a string (exact with tiktoken, estimated otherwise)."""
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.encoding_for_model(chat_service.MODEL)
+        except (ImportError, KeyError):
+            _encoder = False
+    if _encoder:
+        return len(_encoder.encode(text))
+    return (len(text) + 3) // 4
+
+
+def message_tokens(message):
+    """Tokens a chat message takes, including its per-message overhead."""
+    return count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _truncate(text, max_tokens):
+    """Cut text to roughly max_tokens, keeping the start."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    cut = max_tokens * 4
+    while cut > 0 and count_tokens(text[:cut]) > max_tokens:
+        cut = cut * 9 // 10
+    return text[:cut].rstrip() + " …"
+
+
+def _split_window(messages, budget):
+    """Index where the newest run of messages fitting in budget starts.
+
+    The latest message is always kept. The window starts on a user turn when
+    possible, so it never opens with an answer to a question it lacks.
+    """
+    start, used = len(messages), 0
+    while start > 0:
+        cost = message_tokens(messages[start - 1])
+        if used + cost > budget and start < len(messages):
+            break
+        used += cost
+        start -= 1
+    while start < len(messages) - 1 and messages[start]["role"] != "user":
+        start += 1
+    return start
+
+
+def extractive_summary(previous, messages):
+    """Model-free fallback: the previous summary plus the first line of each turn."""
+    lines = [previous] if previous else []
+    for message in messages:
+        first_line = message["content"].strip().split("\n", 1)[0]
+        lines.append(f"{message['role']}: {_truncate(first_line, 40)}")
+    return "\n".join(lines)
+
+
+def model_summary(previous, messages, api_key=None):
+    """Ask the model to fold messages into the previous summary."""
+    transcript = "\n\n".join(f"{m['role'].upper()}: {m['content']}" for m in messages)
+    if previous:
+        transcript = f"PREVIOUS SUMMARY:\n{previous}\n\nNEW MESSAGES:\n{transcript}"
+    return chat_service.complete([{"role": "user", "content": transcript}],
+                                 api_key, system_prompt=SUMMARY_PROMPT)
+
+
+def _summary_cost(state):
+    """Tokens the summary message takes (0 when there is none)."""
+    if not state["summary"]:
+        return 0
+    return count_tokens(SUMMARY_PREFIX + state["summary"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def new_state():
+    """Summary state for a fresh conversation (keep it in st.session_state)."""
+    return {"summary": "", "covered": 0}
+
+
+@timed()
+def build_context(messages, state, summarize=model_summary, api_key=None,
+                  system_prompt=chat_service.SYSTEM_PROMPT):
+    """Messages to send for this turn (without the system prompt) and a report.
+
+    ``state`` is updated in place when older messages are folded into the
+    summary. If ``summarize`` fails, the extractive summary is used so the
+    chat keeps working. The report holds tokens_sent, window_messages,
+    summarized_messages, summary_tokens and whether this turn compacted.
+    """
+    if state["covered"] > len(messages):   # history was cleared or replaced
+        state.update(new_state())
+    fixed = count_tokens(system_prompt) + MESSAGE_OVERHEAD_TOKENS + REPLY_PRIMING_TOKENS
+
+    pending = messages[state["covered"]:]
+    compacted = False
+    if sum(message_tokens(m) for m in pending) > CONTEXT_TOKEN_BUDGET - fixed - _summary_cost(state):
+        target = int(CONTEXT_TOKEN_BUDGET * WINDOW_TARGET_RATIO) - fixed - SUMMARY_TOKEN_BUDGET
+        start = _split_window(pending, max(target, 0))
+        if start:
+            try:
+                summary = summarize(state["summary"], pending[:start], api_key=api_key)
+            except Exception:
+                summary = extractive_summary(state["summary"], pending[:start])
+            state["summary"] = _truncate(summary, SUMMARY_TOKEN_BUDGET)
+            state["covered"] += start
+            compacted = True
+
+    # Hard limit: whatever happened above, never send more than the budget
+    window = messages[state["covered"]:]
+    window = window[_split_window(window, CONTEXT_TOKEN_BUDGET - fixed - _summary_cost(state)):]
+
+    context = []
+    if state["summary"]:
+        context.append({"role": "system", "content": SUMMARY_PREFIX + state["summary"]})
+    context.extend({"role": m["role"], "content": m["content"]} for m in window)
+
+    report = {
+        "tokens_sent": fixed + sum(message_tokens(m) for m in context),
+        "window_messages": len(window),
+        "summarized_messages": state["covered"],
+        "summary_tokens": count_tokens(state["summary"]) if state["summary"] else 0,
+        "compacted": compacted,
+    }
+    return context, report
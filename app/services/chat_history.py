@@ -0,0 +1,177 @@
+"""
+Chat History
+Persistent AI Assistant conversations in intelligence_platform.db.
+
+Conversations belong to a users.id. Messages are append-only rows numbered
+by seq within their conversation; the (conversation_id, seq) key lets the
+page read the newest messages, and then older pages on demand, without
+touching the rest of a long conversation.
+
+append() only queues a message. A single writer thread inserts the queue
+in batches, one transaction per batch, so a chat turn never waits on a
+database write. flush() waits for everything queued so far, and runs
+automatically at interpreter exit.
+
+A batch that fails to write is retried WRITE_ATTEMPTS times with a short
+backoff. If the database is still unwritable after that (or the process
+exits with messages queued), those messages are lost: the failure is
+logged and counted as chat_history.lost, but the chat carries on.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from app import instrumentation
+from app.data.pool import get_connection
+
+PAGE_SIZE = 30                 # messages shown at first and per "load older"
+BATCH_SIZE = 200               # messages per write transaction
+FLUSH_INTERVAL_SECONDS = 0.5   # how long a queued message may wait
+TITLE_CHARS = 60
+WRITE_ATTEMPTS = 3             # tries per batch before its messages are dropped
+RETRY_DELAY_SECONDS = 0.2      # doubled after each failed try
+
+_pending = queue.Queue()
+_lock = threading.Lock()
+_state = {"writer": None}
+logger = logging.getLogger(__name__)
+
+
+def user_id(username):
+    """users.id for a username, or None."""
+    with get_connection() as conn:
+        row = conn.execute("SELECT id FROM users WHERE username = ?", (username,)).fetchone()
+    return None if row is None else row["id"]
+
+
+def start_conversation(owner_id, first_prompt):
+    """Create a conversation titled after its first question; returns its id."""
+    title = " ".join(first_prompt.split())
+    if len(title) > TITLE_CHARS:
+        title = title[:TITLE_CHARS].rstrip() + "…"
+    now = time.time()
+    with get_connection() as conn:
+        cursor = conn.execute(
+            "INSERT INTO conversations (user_id, title, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (owner_id, title, now, now),
+        )
+    return cursor.lastrowid
+
+
+def list_conversations(owner_id, limit=20):
+    """A user's most recently active conversations."""
+    with get_connection() as conn:
+        rows = conn.execute("""
+            SELECT id, title, message_count, updated_at FROM conversations
+            WHERE user_id = ? ORDER BY updated_at DESC, id DESC LIMIT ?
+        """, (owner_id, limit)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def conversation_length(conversation_id):
+    """Messages stored for a conversation (including any still queued)."""
+    flush()
+    with get_connection() as conn:
+        row = conn.execute("SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE conversation_id = ?",
+                           (conversation_id,)).fetchone()
+    return row[0]
+
+
+def load_messages(conversation_id, before_seq=None, limit=PAGE_SIZE):
+    """Up to ``limit`` messages preceding ``before_seq`` (default: the newest), oldest first."""
+    flush()
+    with get_connection() as conn:
+        rows = conn.execute("""
+            SELECT seq, role, content FROM messages
+            WHERE conversation_id = ? AND seq < ?
+            ORDER BY seq DESC LIMIT ?
+        """, (conversation_id, before_seq if before_seq is not None else 2 ** 62, limit)).fetchall()
+    return [dict(row) for row in reversed(rows)]
+
+
+def append(conversation_id, seq, role, content):
+    """Queue one message for the writer thread."""
+    _ensure_writer()
+    _pending.put((conversation_id, seq, role, content, time.time()))
+
+
+def _ensure_writer():
+    """Start the writer thread on first use."""
+    with _lock:
+        if _state["writer"] is None:
+            _state["writer"] = threading.Thread(target=_writer, name="chat-history-writer", daemon=True)
+            _state["writer"].start()
+
+
+def _write_batch(batch):
+    """Insert a batch of messages and bump their conversations in one transaction."""
+    touched = {}
+    for conversation_id, seq, _, _, created_at in batch:
+        last_seq, _ = touched.get(conversation_id, (-1, 0))
+        touched[conversation_id] = (max(last_seq, seq), created_at)
+    with get_connection() as conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO messages (conversation_id, seq, role, content, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            batch,
+        )
+        conn.executemany(
+            "UPDATE conversations SET message_count = MAX(message_count, ?), updated_at = ? WHERE id = ?",
+            [(seq + 1, at, conversation_id) for conversation_id, (seq, at) in touched.items()],
+        )
+
+
+def _save(batch):
+    """Write a batch, retrying transient failures; drops it after WRITE_ATTEMPTS."""
+    delay = RETRY_DELAY_SECONDS
+    for attempt in range(1, WRITE_ATTEMPTS + 1):
+        try:
+            _write_batch(batch)   # INSERT OR IGNORE, so retrying is safe
+            return
+        except Exception:  # keep the writer alive
+            if attempt == WRITE_ATTEMPTS:
+                instrumentation.count("chat_history.lost", len(batch))
+                logger.exception("Failed to save %d chat messages after %d attempts; they are lost",
+                                 len(batch), WRITE_ATTEMPTS)
+                return
+            instrumentation.count("chat_history.retries")
+            time.sleep(delay)
+            delay *= 2
+
+
+def _writer():
+    """Drain the queue in batches; an Event in the queue is a flush request to set."""
+    while True:
+        batch, waiters = [], []
+        item = _pending.get()
+        deadline = time.monotonic() + FLUSH_INTERVAL_SECONDS
+        while True:
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+                break   # flush now
+            batch.append(item)
+            if len(batch) >= BATCH_SIZE:
+                break
+            try:
+                item = _pending.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+        if batch:
+            _save(batch)
+        for waiter in waiters:
+            waiter.set()
+
+
+def flush(timeout=5):
+    """Wait until every message queued so far is written."""
+    with _lock:
+        if _state["writer"] is None:
+            return
+    done = threading.Event()
+    _pending.put(done)
+    done.wait(timeout)
+
+
+atexit.register(flush)
@@ -0,0 +1,182 @@
+"""
+Chat Service
+Long-lived, pooled OpenAI client for the AI Assistant.
+
+The page used to build a new OpenAI() client (and HTTP connection) on every
+rerun and redraw the reply on every streamed token. Here one AsyncOpenAI
+client with a pooled httpx connection is shared by all sessions. It runs on
+a single background event loop thread, so concurrent chats overlap their
+network waits.
+
+stream_reply() is a plain generator for the Streamlit script thread. It
+yields the accumulated reply text at most once every FLUSH_INTERVAL_MS, so
+the page redraws a few times a second instead of once per token.
+
+Failures before the first token (connection errors, timeouts, 429s and
+5xx) are retried with exponential backoff, except a 429 for an exhausted
+quota. Once text has been shown the request is not retried, to avoid
+duplicated output.
+
+Set OPENAI_BASE_URL to point the client somewhere else, e.g. the local stub
+in app/services/chat_stub.py.
+"""
+import asyncio
+import os
+import queue
+import random
+import threading
+import time
+import tomllib
+from pathlib import Path
+
+from app import instrumentation
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SECRETS_PATH = PROJECT_ROOT / ".streamlit" / "secrets.toml"
+
+MODEL = "gpt-3.5-turbo"
+BASE_URL = os.environ.get("OPENAI_BASE_URL") or None
+CONNECT_TIMEOUT_SECONDS = 5
+REQUEST_TIMEOUT_SECONDS = 60
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 0.5
+FLUSH_INTERVAL_MS = 75
+MAX_CONNECTIONS = 20
+MAX_KEEPALIVE_CONNECTIONS = 10
+
+SYSTEM_PROMPT = """You are an AI assistant for cybersecurity analysts, data scientists, and IT operations teams. Help with:
+- Cybersecurity incident analysis
+- Data management
+- IT troubleshooting
+- Security best practices
+
+Be clear, professional, and actionable."""
+
+_lock = threading.Lock()
+_state = {"loop": None, "clients": {}, "api_key": None}
+_END = object()
+
+
+def load_api_key():
+    """Return the OpenAI key from the environment or .streamlit/secrets.toml (read once)."""
+    with _lock:
+        if _state["api_key"] is None:
+            key = os.environ.get("OPENAI_API_KEY")
+            if not key and SECRETS_PATH.exists():
+                try:
+                    with open(SECRETS_PATH, "rb") as f:
+                        key = tomllib.load(f).get("OPENAI_API_KEY")
+                except (OSError, tomllib.TOMLDecodeError):
+                    key = None
+            _state["api_key"] = key or ""
+        return _state["api_key"] or None
+
+
+def _event_loop():
+    """The shared background event loop, started on first use."""
+    with _lock:
+        if _state["loop"] is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="chat-loop", daemon=True)
+            thread.start()
+            _state["loop"] = loop
+        return _state["loop"]
+
+
+def get_client(api_key):
+    """Long-lived AsyncOpenAI client for a key, with pooled keep-alive connections."""
+    with _lock:
+        client = _state["clients"].get(api_key)
+        if client is None:
+            import httpx
+            from openai import AsyncOpenAI
+
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=BASE_URL,
+                max_retries=0,  # retries are handled below, before the first token
+                timeout=httpx.Timeout(REQUEST_TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS),
+                http_client=httpx.AsyncClient(limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                )),
+            )
+            _state["clients"][api_key] = client
+        return client
+
+
+def _is_retryable(error):
+    """Connection problems, timeouts, rate limits and server errors are worth retrying.
+
+    A 429 for an exhausted quota (insufficient_quota) is a billing problem
+    that no amount of waiting fixes, so it is reported at once.
+    """
+    import openai
+
+    if isinstance(error, openai.RateLimitError):
+        return "insufficient_quota" not in (getattr(error, "code", None), getattr(error, "type", None))
+    return isinstance(error, (openai.APIConnectionError, openai.InternalServerError))
+
+
+async def _produce(client, messages, model, out):
+    """Stream a completion, pushing the accumulated text every FLUSH_INTERVAL_MS."""
+    text, flushed, last_flush = "", 0, time.monotonic()
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            stream = await client.chat.completions.create(model=model, messages=messages, stream=True)
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    text += chunk.choices[0].delta.content
+                    now = time.monotonic()
+                    if (now - last_flush) * 1000 >= FLUSH_INTERVAL_MS:
+                        out.put(text)
+                        flushed, last_flush = len(text), now
+            break
+        except Exception as e:
+            if text or attempt == MAX_RETRIES or not _is_retryable(e):
+                out.put(e)
+                return
+            delay = BACKOFF_BASE_SECONDS * (2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, delay / 2))
+    if len(text) != flushed:
+        out.put(text)
+    out.put(_END)
+
+
+def stream_reply(messages, api_key=None, model=MODEL, system_prompt=SYSTEM_PROMPT):
+    """Yield the growing reply text for a conversation (without the system prompt).
+
+    Raises whatever error ended the request. If the caller stops early (e.g.
+    Streamlit interrupts the rerun), the request is cancelled.
+    """
+    client = get_client(api_key or load_api_key())
+    out = queue.Queue()
+    payload = [{"role": "system", "content": system_prompt}, *messages]
+    started, first = time.perf_counter(), True
+    future = asyncio.run_coroutine_threadsafe(_produce(client, payload, model, out), _event_loop())
+    try:
+        while True:
+            try:
+                item = out.get(timeout=REQUEST_TIMEOUT_SECONDS * (MAX_RETRIES + 1))
+            except queue.Empty:
+                raise TimeoutError("No response from the AI service") from None
+            if item is _END:
+                instrumentation.observe("chat.stream", time.perf_counter() - started)
+                return
+            if isinstance(item, Exception):
+                instrumentation.count("chat.errors")
+                raise item
+            if first:
+                instrumentation.observe("chat.first_token", time.perf_counter() - started)
+                first = False
+            yield item
+    finally:
+        future.cancel()
+
+
+def complete(messages, api_key=None, model=MODEL, system_prompt=SYSTEM_PROMPT):
+    """The whole reply as one string (same retries as stream_reply)."""
+    text = ""
+    for text in stream_reply(messages, api_key, model, system_prompt):
+        pass
+    return text
@@ -0,0 +1,78 @@
+"""
+Chat Stub Server
+A tiny local stand-in for the OpenAI chat completions endpoint, for trying
+the AI Assistant (and measuring its overhead) without a key or network.
+
+It streams back the last user message word by word as server-sent events,
+in the same chunk format as the real API.
+
+    python -m app.services.chat_stub --port 8999 --delay-ms 20
+    OPENAI_BASE_URL=http://127.0.0.1:8999/v1 OPENAI_API_KEY=stub streamlit run Home.py
+"""
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Handles POST /v1/chat/completions with a streamed echo reply."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    delay_seconds = 0.02
+
+    def log_message(self, format, *args):
+        """Keep the console quiet."""
+
+    def do_POST(self):
+        """Stream the reply as server-sent events."""
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        messages = body.get("messages", [])
+        prompt = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+        words = f"Stub reply to: {prompt}".split(" ")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, word in enumerate(words):
+            self._send_event({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "delta": {"content": word if i == 0 else " " + word},
+                             "finish_reason": None}],
+            })
+            time.sleep(self.delay_seconds)
+        self._send_chunk(b"data: [DONE]\n\n")
+        self._send_chunk(b"")
+
+    def _send_event(self, payload):
+        """Write one SSE data event."""
+        self._send_chunk(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+
+    def _send_chunk(self, data):
+        """Write one HTTP chunk (an empty one ends the response)."""
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Local stub of the OpenAI chat completions API")
+    parser.add_argument("--port", type=int, default=8999)
+    parser.add_argument("--delay-ms", type=float, default=20, help="pause between streamed words")
+    args = parser.parse_args(argv)
+
+    StubHandler.delay_seconds = args.delay_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), StubHandler)
+    print(f"Chat stub listening on http://127.0.0.1:{args.port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Completion Cache
+Persistent cache of AI Assistant replies, so repeated questions skip the API.
+
+The key is a SHA-256 of the model, the system prompt and the conversation so
+far. Message text is normalized first (case-folded, whitespace collapsed), so
+"Triage  this incident" and "triage this incident" share an entry. Callers
+key on the raw conversation rather than the windowed and summarized context
+they send (see chat_context.py): the summary is model output and would make
+equal conversations miss, and a hit then needs no summarization call.
+
+Entries live in the completion_cache table, so they survive restarts and are
+shared by every server process. They expire after CACHE_TTL_SECONDS. When the
+stored replies grow past CACHE_MAX_BYTES, the least recently used entries are
+evicted. Both limits can be set from the environment.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from app.data.pool import get_connection
+
+CACHE_TTL_SECONDS = int(os.environ.get("CHAT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+CACHE_MAX_BYTES = int(os.environ.get("CHAT_CACHE_MAX_BYTES", str(20 * 1024 * 1024)))
+REPLAY_CHUNK_CHARS = 200   # text per yield when replaying a cached reply
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "bypassed": 0, "stores": 0}
+
+
+def _normalize(text):
+    """Case-fold and collapse whitespace."""
+    return " ".join(text.split()).casefold()
+
+
+def cache_key(model, system_prompt, messages):
+    """Hash of everything that determines the reply."""
+    payload = json.dumps([
+        model,
+        _normalize(system_prompt),
+        [(m["role"], _normalize(m["content"])) for m in messages],
+    ], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _count(name):
+    """Bump one of the in-process counters."""
+    with _lock:
+        _stats[name] += 1
+
+
+def lookup(key):
+    """The cached reply for a key, or None if missing or expired."""
+    now = time.time()
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT response FROM completion_cache WHERE cache_key = ? AND created_at >= ?",
+            (key, now - CACHE_TTL_SECONDS),
+        ).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE completion_cache SET hits = hits + 1, last_used = ? WHERE cache_key = ?",
+                (now, key),
+            )
+    _count("misses" if row is None else "hits")
+    return None if row is None else row["response"]
+
+
+def store(key, model, response):
+    """Save a finished reply, then evict expired and least recently used entries."""
+    now = time.time()
+    with get_connection() as conn:
+        conn.execute("""
+            INSERT INTO completion_cache (cache_key, model, response, size_bytes, hits, created_at, last_used)
+            VALUES (?, ?, ?, ?, 0, ?, ?)
+            ON CONFLICT (cache_key) DO UPDATE SET
+                model = excluded.model, response = excluded.response,
+                size_bytes = excluded.size_bytes, created_at = excluded.created_at,
+                last_used = excluded.last_used
+        """, (key, model, response, len(response.encode("utf-8")), now, now))
+        evict(conn, now)
+    _count("stores")
+
+
+def evict(conn, now=None):
+    """Drop expired entries and trim the table to CACHE_MAX_BYTES (newest kept)."""
+    now = now or time.time()
+    conn.execute("DELETE FROM completion_cache WHERE created_at < ?", (now - CACHE_TTL_SECONDS,))
+    conn.execute("""
+        DELETE FROM completion_cache WHERE cache_key IN (
+            SELECT cache_key FROM (
+                SELECT cache_key, SUM(size_bytes) OVER (ORDER BY last_used DESC, cache_key) AS running
+                FROM completion_cache
+            ) WHERE running > ?
+        )
+    """, (CACHE_MAX_BYTES,))
+
+
+def replay(response):
+    """Yield a cached reply as growing text, like a live stream."""
+    for end in range(REPLAY_CHUNK_CHARS, len(response), REPLAY_CHUNK_CHARS):
+        yield response[:end]
+    yield response
+
+
+def cached_stream(model, system_prompt, messages, produce, bypass=False):
+    """Yield reply text from the cache, or from produce() and cache the result.
+
+    ``produce`` returns a generator of growing reply text (e.g.
+    chat_service.stream_reply). With ``bypass`` the lookup is skipped but the
+    fresh reply still replaces the cached one. Replies that fail part-way are
+    not stored.
+    """
+    key = cache_key(model, system_prompt, messages)
+    if bypass:
+        _count("bypassed")
+    else:
+        response = lookup(key)
+        if response is not None:
+            yield from replay(response)
+            return
+    text = ""
+    for text in produce():
+        yield text
+    if text:
+        store(key, model, text)
+
+
+def cache_stats():
+    """Hit/miss counters for this process plus the size of the shared table."""
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT COUNT(*) AS entries, COALESCE(SUM(size_bytes), 0) AS bytes FROM completion_cache"
+        ).fetchone()
+    with _lock:
+        stats = dict(_stats)
+    looked_up = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / looked_up if looked_up else 0.0
+    stats["entries"] = row["entries"]
+    stats["bytes"] = row["bytes"]
+    return stats
+
+
+def clear():
+    """Remove every cached reply."""
+    with get_connection() as conn:
+        conn.execute("DELETE FROM completion_cache")
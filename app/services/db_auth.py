@@ -2,68 +2,101 @@
 Week 8: Database Authentication
 Integrates Week 7 authentication with Week 8 database
 """
-import bcrypt
-from app.data.db import connect_database
+import sqlite3
+from app.data.cache import invalidate
+from app.data.pool import get_connection
+from app.instrumentation import timed
+from app.services import auth_executor, rate_limit
 
 def hash_password(plain_text_password):
-    """Hash a password using bcrypt."""
-    password_bytes = plain_text_password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed.decode('utf-8')
+    """Hash a password using bcrypt (on the auth worker pool)."""
+    return auth_executor.hash_password(plain_text_password)
 
 def verify_password(plain_text_password, hashed_password):
     """Verify a plaintext password against a stored bcrypt hash."""
-    password_bytes = plain_text_password.encode('utf-8')
-    hashed_bytes = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
+    return auth_executor.verify_password(plain_text_password, hashed_password)
+
+# Made at import, before any login runs, so the first unknown username does
+# not also pay for a hash that a known one would not
+_DUMMY_HASH = hash_password("not-a-real-password")
+
+def _dummy_verify(password):
+    """Spend the same bcrypt time as a real check, for usernames that don't exist."""
+    verify_password(password, _DUMMY_HASH)
+    return False
 
 def migrate_users_from_file():
-    """Migrate users from users.txt to database."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    
+    """Migrate users from users.txt to database.
+
+    Users that already exist are left untouched (INSERT OR IGNORE).
+    """
     with open("DATA/users.txt", 'r') as f:
-        for line in f:
-            if line.strip():
-                username, password_hash = line.strip().split(',')
-                try:
-                    cursor.execute("""
-                        INSERT INTO users (username, password_hash, role)
-                        VALUES (?, ?, 'user')
-                    """, (username, password_hash))
-                except:
-                    pass  # Skip if user already exists
-    
-    conn.commit()
-    conn.close()
+        users = [line.strip().split(',', 1) for line in f if line.strip()]
 
-def login_user_db(username, password):
-    """Authenticate user from database."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    cursor.execute("SELECT password_hash FROM users WHERE username = ?", (username,))
-    result = cursor.fetchone()
-    conn.close()
-    
-    if result:
-        return verify_password(password, result['password_hash'])
-    return False
+    with get_connection() as conn:
+        conn.executemany("""
+            INSERT OR IGNORE INTO users (username, password_hash, role)
+            VALUES (?, ?, 'user')
+        """, users)
+    invalidate("users")
+
+@timed()
+def login_user_db(username, password, client_id=None):
+    """Authenticate user from database.
 
+    Attempts are rate limited per username and per ``client_id`` (see
+    rate_limit.py); a refused attempt raises RateLimitedError without
+    touching the password. If the stored hash was made with a different
+    bcrypt cost than the configured one, it is re-hashed with the current
+    cost after a successful login.
+    """
+    rate_limit.check_attempt(username, client_id)
+    if rate_limit.is_known_unknown(username):
+        # Unknown names fail and count towards a lockout like known ones
+        rate_limit.record_failure(username)
+        return _dummy_verify(password)
+
+    with get_connection() as conn:
+        # Case variants too: rate_limit keys names case-insensitively
+        rows = conn.execute(
+            "SELECT username, password_hash FROM users WHERE username = ? COLLATE NOCASE", (username,)
+        ).fetchall()
+    result = next((row for row in rows if row["username"] == username), None)
+
+    if not result:
+        if not rows:
+            rate_limit.remember_unknown(username)   # no name differing only in case either
+        rate_limit.record_failure(username)
+        return _dummy_verify(password)
+    stored_hash = result['password_hash']
+    if not verify_password(password, stored_hash):
+        rate_limit.record_failure(username)
+        return False
+    rate_limit.clear_failures(username)
+
+    if auth_executor.needs_rehash(stored_hash):
+        new_hash = hash_password(password)
+        with get_connection() as conn:
+            # Only replace the hash we verified, in case it changed meanwhile
+            conn.execute(
+                "UPDATE users SET password_hash = ? WHERE username = ? AND password_hash = ?",
+                (new_hash, username, stored_hash),
+            )
+        invalidate("users")
+    return True
+
+@timed()
 def register_user_db(username, password):
     """Register a new user in database."""
-    conn = connect_database()
-    cursor = conn.cursor()
-    
+    hashed = hash_password(password)
     try:
-        hashed = hash_password(password)
-        cursor.execute("""
-            INSERT INTO users (username, password_hash, role)
-            VALUES (?, ?, 'user')
-        """, (username, hashed))
-        conn.commit()
-        conn.close()
+        with get_connection() as conn:
+            conn.execute("""
+                INSERT INTO users (username, password_hash, role)
+                VALUES (?, ?, 'user')
+            """, (username, hashed))
+        invalidate("users")
+        rate_limit.forget_unknown(username)
         return True
-    except:
-        conn.close()
+    except sqlite3.IntegrityError:
         return False
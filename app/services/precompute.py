@@ -0,0 +1,169 @@
+"""
+Dashboard Precompute
+Builds each Dashboard tab's metrics, chart data and first page of rows on a
+background thread, so a rerun only reads the latest ready snapshot.
+
+A tab's snapshot is rebuilt when:
+- a table it reads changes (the worker polls table_versions every
+  POLL_INTERVAL_SECONDS, which also sees writes from other processes, and
+  notify() wakes it at once), or
+- it is older than REFRESH_SECONDS.
+
+The incident and ticket tabs come from live feeds (app/data/live.py), so
+a rebuild after a write merges only the changed rows into the previous
+counts and first page.
+
+Snapshots are shared by every session in the server process and must not be
+modified by readers. The first read of a tab before the worker has built it
+builds it in the caller.
+
+If a rebuild fails, readers keep the last snapshot and the worker backs off
+(doubling its wait up to MAX_BACKOFF_SECONDS). Each distinct error is logged
+once with its traceback; repeats are only counted (precompute.errors).
+"""
+import logging
+import os
+import threading
+import time
+
+from app import instrumentation
+from app.data.cache import invalidate
+from app.data.pool import get_connection
+
+REFRESH_SECONDS = float(os.environ.get("INTEL_PRECOMPUTE_SECONDS", "60"))
+POLL_INTERVAL_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 60.0
+FIRST_PAGE_SIZE = 50   # the Dashboard's default rows per page
+
+_lock = threading.Lock()
+_build_locks = {}
+_snapshots = {}   # tab -> {"data", "versions", "computed_at", "build_ms"}
+_wake = threading.Event()
+_state = {"worker": None}
+logger = logging.getLogger(__name__)
+
+
+def _incidents():
+    """Incident tiles, chart counts and the newest page."""
+    from app.data import live
+
+    feed = live.poll("cyber_incidents", page_size=FIRST_PAGE_SIZE)
+    return {"summary": feed["summary"], "first_page": feed["first_page"], "added": feed["added"]}
+
+
+def _datasets():
+    """Dataset totals, the metadata table and the rows-per-dataset chart."""
+    from app.data.db import dataset_totals, datasets_frame
+
+    frame = datasets_frame()
+    return {"totals": dataset_totals(), "frame": frame,
+            "rows_chart": frame.set_index("name")["rows"] if len(frame) else None}
+
+
+def _tickets():
+    """Ticket tiles, chart counts and the newest page."""
+    from app.data import live
+
+    feed = live.poll("it_tickets", page_size=FIRST_PAGE_SIZE)
+    return {"summary": feed["summary"], "first_page": feed["first_page"], "added": feed["added"]}
+
+
+# tab -> (tables it reads, builder)
+TABS = {
+    "incidents": (("cyber_incidents",), _incidents),
+    "datasets": (("datasets_metadata",), _datasets),
+    "tickets": (("it_tickets",), _tickets),
+}
+
+
+def _table_versions():
+    """Current write counter of every table."""
+    with get_connection() as conn:
+        return dict(conn.execute("SELECT table_name, version FROM table_versions").fetchall())
+
+
+def _stale(tab, versions):
+    """Whether a tab's snapshot predates the given table versions."""
+    snapshot = _snapshots.get(tab)
+    if snapshot is None:
+        return True
+    return any(versions.get(table) != snapshot["versions"].get(table) for table in TABS[tab][0])
+
+
+def _build(tab, versions):
+    """Compute a tab and publish it as its latest snapshot."""
+    tables, builder = TABS[tab]
+    if _snapshots.get(tab) is not None and _stale(tab, versions):
+        # The query cache may not have noticed the write yet
+        invalidate(*tables)
+    started = time.perf_counter()
+    with instrumentation.timer(f"precompute.{tab}"):
+        data = builder()
+    snapshot = {
+        "data": data,
+        "versions": {table: versions.get(table) for table in tables},
+        "computed_at": time.time(),
+        "build_ms": (time.perf_counter() - started) * 1000,
+    }
+    with _lock:
+        _snapshots[tab] = snapshot
+    return snapshot
+
+
+def snapshot(tab):
+    """The latest snapshot of a tab, building it now if there is none yet.
+
+    Returns a dict with ``data`` (the builder's result), ``computed_at``,
+    ``age_seconds`` and ``build_ms``.
+    """
+    if tab not in TABS:
+        raise ValueError(f"Unknown Dashboard tab: {tab}")
+    start()
+    current = _snapshots.get(tab)
+    if current is None:
+        with _lock:
+            build_lock = _build_locks.setdefault(tab, threading.Lock())
+        with build_lock:
+            current = _snapshots.get(tab) or _build(tab, _table_versions())
+    return dict(current, age_seconds=time.time() - current["computed_at"])
+
+
+def notify():
+    """Tell the worker that data changed, so it checks without waiting for the next poll."""
+    _wake.set()
+
+
+def start():
+    """Start the worker thread (once per process)."""
+    with _lock:
+        if _state["worker"] is None:
+            _state["worker"] = threading.Thread(target=_worker, name="dashboard-precompute", daemon=True)
+            _state["worker"].start()
+
+
+def _worker():
+    """Rebuild tabs whose tables changed, and all of them every REFRESH_SECONDS."""
+    next_refresh = time.monotonic() + REFRESH_SECONDS
+    wait, last_error = POLL_INTERVAL_SECONDS, None
+    while True:
+        _wake.wait(wait)
+        _wake.clear()
+        due = time.monotonic() >= next_refresh
+        try:
+            versions = _table_versions()
+            for tab in TABS:
+                if due or _stale(tab, versions):
+                    _build(tab, versions)
+        except Exception as e:  # keep the worker alive; readers keep the last snapshot
+            instrumentation.count("precompute.errors")
+            error = f"{type(e).__name__}: {e}"
+            if error != last_error:
+                logger.exception("Dashboard precompute failed; retrying in up to %.0f s", MAX_BACKOFF_SECONDS)
+                last_error = error
+            wait = min(wait * 2, MAX_BACKOFF_SECONDS)
+        else:
+            if last_error is not None:
+                logger.info("Dashboard precompute recovered")
+            wait, last_error = POLL_INTERVAL_SECONDS, None
+        if due:
+            next_refresh = time.monotonic() + REFRESH_SECONDS
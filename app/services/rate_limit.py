@@ -0,0 +1,168 @@
+"""
+Login Rate Limiting
+Keeps credential-stuffing bursts from turning into unbounded bcrypt work.
+
+Three layers, checked before any password is hashed:
+- Token buckets per username and per client (Streamlit session) allow short
+  bursts but cap the sustained attempt rate.
+- A persistent lockout in the login_lockouts table locks a username for a
+  while after repeated failures, surviving restarts and shared by every
+  server process using the database. Unknown usernames are counted and
+  locked the same way, so a lockout does not reveal which names exist.
+- A short-lived negative cache remembers usernames that do not exist, so
+  repeated guesses skip the database lookup. Those attempts still run a
+  bcrypt check against a dummy hash so that unknown and known usernames
+  take the same time to fail.
+
+Every layer keys usernames case-insensitively (_user_key), so changing the
+case of a name does not get around any of them.
+"""
+import threading
+import time
+from datetime import datetime
+
+from app.data.pool import get_connection
+
+USER_BUCKET_CAPACITY = 5          # attempts allowed in a burst per username
+USER_REFILL_PER_SECOND = 1 / 30   # then one every 30 seconds
+CLIENT_BUCKET_CAPACITY = 10       # attempts allowed in a burst per client
+CLIENT_REFILL_PER_SECOND = 1 / 10
+MAX_FAILURES = 10                 # failures within the window before a lockout
+FAILURE_WINDOW_SECONDS = 15 * 60
+LOCKOUT_SECONDS = 15 * 60
+UNKNOWN_USER_TTL_SECONDS = 60
+MAX_TRACKED_KEYS = 10000
+PRUNE_EVERY_FAILURES = 100        # failures between sweeps of expired lockout rows
+
+
+class RateLimitedError(Exception):
+    """Raised when a login attempt is refused before checking the password."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Too many login attempts, retry in {int(retry_after) + 1}s")
+        self.retry_after = retry_after
+
+
+_lock = threading.Lock()
+_buckets = {}         # (kind, key) -> (tokens, last_refill)
+_unknown_users = {}   # username key -> expiry (monotonic)
+_failures = {"since_prune": 0}
+
+
+def _user_key(username):
+    """The form of a username used for every bucket, cache and lockout key."""
+    return username.lower()
+
+
+def _take_token(kind, key, capacity, refill_per_second):
+    """Take a token from a bucket; returns 0 on success or seconds to wait."""
+    now = time.monotonic()
+    with _lock:
+        if len(_buckets) > MAX_TRACKED_KEYS:
+            # Drop buckets that have refilled completely; they carry no state
+            for bucket_key, (tokens, last) in list(_buckets.items()):
+                if now - last > capacity / refill_per_second:
+                    del _buckets[bucket_key]
+        tokens, last = _buckets.get((kind, key), (capacity, now))
+        tokens = min(capacity, tokens + (now - last) * refill_per_second)
+        if tokens < 1:
+            _buckets[(kind, key)] = (tokens, now)
+            return (1 - tokens) / refill_per_second
+        _buckets[(kind, key)] = (tokens - 1, now)
+        return 0
+
+
+def check_attempt(username, client_id=None):
+    """Admit or refuse a login attempt; raises RateLimitedError if refused."""
+    waits = [_take_token("user", _user_key(username), USER_BUCKET_CAPACITY, USER_REFILL_PER_SECOND)]
+    if client_id:
+        waits.append(_take_token("client", client_id, CLIENT_BUCKET_CAPACITY, CLIENT_REFILL_PER_SECOND))
+    waits.append(lockout_remaining(username))
+    retry_after = max(waits)
+    if retry_after > 0:
+        raise RateLimitedError(retry_after)
+
+
+def reset():
+    """Forget every token bucket and cached unknown username (lockouts are kept)."""
+    with _lock:
+        _buckets.clear()
+        _unknown_users.clear()
+
+
+def is_known_unknown(username):
+    """True if the username was recently looked up and not found."""
+    key, now = _user_key(username), time.monotonic()
+    with _lock:
+        expiry = _unknown_users.get(key)
+        if expiry is None:
+            return False
+        if expiry < now:
+            del _unknown_users[key]
+            return False
+        return True
+
+
+def remember_unknown(username):
+    """Cache a failed username lookup for UNKNOWN_USER_TTL_SECONDS."""
+    with _lock:
+        if len(_unknown_users) > MAX_TRACKED_KEYS:
+            _unknown_users.clear()
+        _unknown_users[_user_key(username)] = time.monotonic() + UNKNOWN_USER_TTL_SECONDS
+
+
+def forget_unknown(username):
+    """Drop a username from the negative cache (call when it is registered)."""
+    with _lock:
+        _unknown_users.pop(_user_key(username), None)
+
+
+def lockout_remaining(username):
+    """Seconds until a locked username may try again (0 if not locked)."""
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT locked_until FROM login_lockouts WHERE username = ?", (_user_key(username),)
+        ).fetchone()
+    if row is None or row["locked_until"] is None:
+        return 0
+    return max(0, row["locked_until"] - time.time())
+
+
+def record_failure(username):
+    """Count a failed login; locks the username after MAX_FAILURES in the window.
+
+    Called for unknown usernames too. Rows whose window and lockout have
+    both passed carry no state, and are swept every PRUNE_EVERY_FAILURES
+    failures so made-up names do not pile up.
+    """
+    key, now = _user_key(username), time.time()
+    with _lock:
+        _failures["since_prune"] += 1
+        prune = _failures["since_prune"] >= PRUNE_EVERY_FAILURES
+        if prune:
+            _failures["since_prune"] = 0
+    with get_connection() as conn:
+        if prune:
+            conn.execute(
+                "DELETE FROM login_lockouts WHERE window_start < ? AND COALESCE(locked_until, 0) < ?",
+                (now - FAILURE_WINDOW_SECONDS, now),
+            )
+        conn.execute("""
+            INSERT INTO login_lockouts (username, failed_count, window_start, locked_until, updated_at)
+            VALUES (?, 1, ?, NULL, ?)
+            ON CONFLICT (username) DO UPDATE SET
+                failed_count = CASE WHEN window_start < ? THEN 1 ELSE failed_count + 1 END,
+                window_start = CASE WHEN window_start < ? THEN excluded.window_start ELSE window_start END,
+                updated_at = excluded.updated_at
+        """, (key, now, datetime.now().isoformat(timespec="seconds"),
+              now - FAILURE_WINDOW_SECONDS, now - FAILURE_WINDOW_SECONDS))
+        conn.execute("""
+            UPDATE login_lockouts SET locked_until = ?, failed_count = 0
+            WHERE username = ? AND failed_count >= ?
+        """, (now + LOCKOUT_SECONDS, key, MAX_FAILURES))
+
+
+def clear_failures(username):
+    """Reset the failure count after a successful login."""
+    with get_connection() as conn:
+        conn.execute("DELETE FROM login_lockouts WHERE username = ?", (_user_key(username),))
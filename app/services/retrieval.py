@@ -0,0 +1,100 @@
+"""
+Retrieval
+Finds the incidents and tickets relevant to a chat question, for grounded
+AI Assistant answers.
+
+Both the FTS5 keyword index and, when NumPy is available and its matrix
+has been built (see vector_index.py), the vector index are searched. Their rankings are merged with reciprocal rank fusion, which
+needs no score calibration between bm25 and cosine, and across tables.
+Only the top-k rows go into the prompt, each trimmed to a single line.
+"""
+from app.data import vector_index
+from app.data.pool import get_connection
+from app.data.search_index import keyword_search
+from app.instrumentation import timed
+
+DEFAULT_TOP_K = 5
+CANDIDATES_PER_SOURCE = 20
+RRF_K = 60                   # reciprocal rank fusion damping constant
+MAX_DESCRIPTION_CHARS = 300
+
+SOURCES = {
+    "cyber_incidents": {
+        "label": "Incident",
+        "sql": "SELECT incident_id AS id, timestamp AS at, severity, status, category, description "
+               "FROM cyber_incidents WHERE incident_id IN ({ids})",
+        "tags": ("severity", "status", "category"),
+    },
+    "it_tickets": {
+        "label": "Ticket",
+        "sql": "SELECT ticket_id AS id, created_at AS at, priority, status, assigned_to, description "
+               "FROM it_tickets WHERE ticket_id IN ({ids})",
+        "tags": ("priority", "status", "assigned_to"),
+    },
+}
+
+GROUNDING_PROMPT = """Platform records that may be relevant to the user's question are listed below. Use them when they help, cite them as "Incident #id" or "Ticket #id", and say so if they do not contain the answer.
+"""
+
+
+def _fused_ranking(question):
+    """(score, source, id) across all sources, best first."""
+    scores = {}
+    for source in SOURCES:
+        rankings = [keyword_search(source, question, CANDIDATES_PER_SOURCE)]
+        vector = vector_index.vector_search(source, question, CANDIDATES_PER_SOURCE)
+        if vector is not None:   # None until the matrix is built: keyword search alone
+            rankings.append(vector)
+        for ranking in rankings:
+            for rank, (row_id, _) in enumerate(ranking):
+                scores[(source, row_id)] = scores.get((source, row_id), 0.0) + 1.0 / (RRF_K + rank + 1)
+    return sorted(((score, source, row_id) for (source, row_id), score in scores.items()),
+                  reverse=True)
+
+
+def warm():
+    """Start building the vector index in the background, ahead of the first question."""
+    vector_index.warm()
+
+
+@timed()
+def retrieve(question, k=DEFAULT_TOP_K):
+    """The k most relevant incident/ticket rows as dicts, best first.
+
+    Each dict has the row's columns plus "source", "label" and "score".
+    """
+    ranked = _fused_ranking(question)[:k]
+    wanted = {}
+    for _, source, row_id in ranked:
+        wanted.setdefault(source, []).append(row_id)
+    rows = {}
+    with get_connection() as conn:
+        for source, ids in wanted.items():
+            sql = SOURCES[source]["sql"].format(ids=", ".join("?" * len(ids)))
+            for row in conn.execute(sql, ids):
+                rows[(source, row["id"])] = dict(row)
+    results = []
+    for score, source, row_id in ranked:
+        row = rows.get((source, row_id))
+        if row is not None:   # deleted since it was indexed
+            row.update(source=source, label=SOURCES[source]["label"], score=score)
+            results.append(row)
+    return results
+
+
+def format_record(row):
+    """One line describing a retrieved row."""
+    tags = "/".join(str(row[tag]) for tag in SOURCES[row["source"]]["tags"] if row[tag])
+    description = " ".join((row["description"] or "").split())
+    if len(description) > MAX_DESCRIPTION_CHARS:
+        description = description[:MAX_DESCRIPTION_CHARS].rstrip() + "…"
+    head = " ".join(part for part in (f"{row['label']} #{row['id']}", tags and f"[{tags}]", row["at"]) if part)
+    return f"- {head}: {description}"
+
+
+def grounding_message(rows):
+    """System message carrying the retrieved rows, or None if there are none."""
+    if not rows:
+        return None
+    return {"role": "system",
+            "content": GROUNDING_PROMPT + "\n".join(format_record(row) for row in rows)}
@@ -0,0 +1,228 @@
+"""
+Week 10: ChatGPT API Integration
+Rendered by app/router.py; pages/2_ChatGPT.py is the standalone entry point.
+"""
+import streamlit as st
+
+from app.services import chat_context, chat_history, chat_service, completion_cache, retrieval
+
+
+def open_conversation(conversation_id):
+    """Load the newest page of a conversation (None starts a new one) into the session."""
+    st.session_state.conversation_id = conversation_id
+    st.session_state.messages = chat_history.load_messages(conversation_id) if conversation_id else []
+    st.session_state.older_messages = []   # pages loaded with "Load older", display only
+    st.session_state.visible_count = chat_history.PAGE_SIZE
+    st.session_state.next_seq = chat_history.conversation_length(conversation_id) if conversation_id else 0
+    st.session_state.chat_context = chat_context.new_state()
+    st.session_state.pop("last_context_report", None)
+
+
+def save_message(role, content):
+    """Add a message to the session and queue it for the database."""
+    if st.session_state.conversation_id is None:
+        st.session_state.conversation_id = chat_history.start_conversation(
+            st.session_state.chat_user_id, content)
+    seq = st.session_state.next_seq
+    st.session_state.next_seq += 1
+    st.session_state.messages.append({"seq": seq, "role": role, "content": content})
+    chat_history.append(st.session_state.conversation_id, seq, role, content)
+
+
+def render():
+    """Draw the AI Assistant page."""
+    if not st.session_state.get("logged_in", False):
+        st.warning("Please login first")
+        return
+
+    # Header
+    st.title("🤖 AI Assistant")
+    st.markdown(f"**User:** {st.session_state.username}")
+
+    # Navigation
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        if st.button("🏠 Home"):
+            st.session_state.page = "home"
+            st.rerun()
+    with col2:
+        if st.button("📊 Dashboard"):
+            st.session_state.page = "dashboard"
+            st.rerun()
+
+    st.divider()
+
+    # Get API key
+    api_key = None
+    try:
+        if hasattr(st, 'secrets') and "OPENAI_API_KEY" in st.secrets:
+            api_key = st.secrets["OPENAI_API_KEY"]
+    except Exception:
+        pass
+    api_key = api_key or chat_service.load_api_key()
+
+    if not api_key:
+        st.error("❌ OpenAI API key not configured")
+        st.code('# Add to .streamlit/secrets.toml:\nOPENAI_API_KEY = "sk-..."', language="toml")
+        st.stop()
+
+    # The client is shared across reruns and sessions; only built the first time
+    try:
+        chat_service.get_client(api_key)
+        st.success("✓ OpenAI connected")
+    except Exception as e:
+        st.error(f"❌ Cannot initialize OpenAI: {str(e)}")
+        st.info("Run: `pip install --upgrade openai`")
+        st.stop()
+
+    # Initialize chat history; it belongs to the user, so reload it when someone else logs in
+    if st.session_state.get("chat_owner") != st.session_state.username:
+        st.session_state.chat_owner = st.session_state.username
+        st.session_state.chat_user_id = chat_history.user_id(st.session_state.username)
+        recent = chat_history.list_conversations(st.session_state.chat_user_id, limit=1)
+        open_conversation(recent[0]["id"] if recent else None)
+    if "bypass_chat_cache" not in st.session_state:
+        st.session_state.bypass_chat_cache = False
+    if "chat_context" not in st.session_state:
+        st.session_state.chat_context = chat_context.new_state()
+    if "grounded_chat" not in st.session_state:
+        st.session_state.grounded_chat = False
+        st.session_state.grounding_k = retrieval.DEFAULT_TOP_K
+        retrieval.warm()
+
+    # Display chat: only the newest visible_count messages are drawn
+    loaded = st.session_state.older_messages + st.session_state.messages
+    shown = loaded[-st.session_state.visible_count:]
+    if shown and shown[0]["seq"] > 0:
+        if st.button("⬆️ Load older messages"):
+            st.session_state.visible_count += chat_history.PAGE_SIZE
+            missing = st.session_state.visible_count - len(loaded)
+            if missing > 0:
+                st.session_state.older_messages = chat_history.load_messages(
+                    st.session_state.conversation_id, before_seq=loaded[0]["seq"], limit=missing,
+                ) + st.session_state.older_messages
+            st.rerun()
+    for msg in shown:
+        with st.chat_message(msg["role"]):
+            st.markdown(msg["content"])
+
+    # Chat input
+    if prompt := st.chat_input("Ask about cybersecurity, data analysis, or IT operations..."):
+        # Add user message
+        save_message("user", prompt)
+        with st.chat_message("user"):
+            st.markdown(prompt)
+
+        # Get AI response
+        with st.chat_message("assistant"):
+            response_placeholder = st.empty()
+            full_response = ""
+
+            report = {}   # filled in only when the model is called
+
+            try:
+                # Grounded mode: put the most relevant incidents/tickets just before the question
+                sources, grounding = [], None
+                if st.session_state.grounded_chat:
+                    sources = retrieval.retrieve(prompt, st.session_state.grounding_k)
+                    grounding = retrieval.grounding_message(sources)
+                history = st.session_state.messages
+                if grounding:
+                    history = history[:-1] + [grounding] + history[-1:]
+
+                def produce():
+                    # Only recent turns plus a rolling summary are sent (chat_context);
+                    # building them may call the model to refresh the summary
+                    context, built = chat_context.build_context(
+                        st.session_state.messages, st.session_state.chat_context, api_key=api_key,
+                    )
+                    if grounding:
+                        context = context[:-1] + [grounding] + context[-1:]
+                        built["tokens_sent"] += chat_context.message_tokens(grounding)
+                    report.update(built)
+                    st.session_state.last_context_report = built
+                    return chat_service.stream_reply(context, api_key)
+
+                # Repeated questions are answered from completion_cache, keyed on
+                # the raw history, so a hit skips building and summarizing the
+                # context; live redraws are batched by chat_service, a few per second
+                for full_response in completion_cache.cached_stream(
+                    chat_service.MODEL, chat_service.SYSTEM_PROMPT, history,
+                    produce, bypass=st.session_state.bypass_chat_cache,
+                ):
+                    response_placeholder.markdown(full_response + "▌")
+
+                response_placeholder.markdown(full_response)
+                if report:
+                    note = f"{report['tokens_sent']:,} tokens sent"
+                    if report["summarized_messages"]:
+                        note += f" · {report['summarized_messages']} earlier messages summarized"
+                else:
+                    note = "⚡ Answered from cache"
+                st.caption(note)
+                if sources:
+                    with st.expander(f"Sources ({len(sources)})"):
+                        for row in sources:
+                            st.markdown(retrieval.format_record(row))
+
+            except Exception as e:
+                error_str = str(e)
+                full_response = f"❌ Error: {error_str}"
+                response_placeholder.error(full_response)
+
+                # Helpful hints based on error
+                if "insufficient_quota" in error_str or "billing" in error_str:
+                    st.warning("⚠️ **No credits on your OpenAI account**\n\nAdd $5+ at platform.openai.com/settings/organization/billing")
+                elif "invalid_api_key" in error_str:
+                    st.warning("⚠️ **Invalid API key**\n\nCheck your key at platform.openai.com/api-keys")
+
+        # Add to history
+        if full_response and not full_response.startswith("❌"):
+            save_message("assistant", full_response)
+
+    # Sidebar
+    with st.sidebar:
+        st.subheader("Chat Controls")
+
+        if st.button("➕ New Chat", use_container_width=True):
+            open_conversation(None)
+            st.rerun()
+
+        conversations = chat_history.list_conversations(st.session_state.chat_user_id)
+        if conversations:
+            ids = [c["id"] for c in conversations]
+            titles = {c["id"]: f"{c['title']} ({c['message_count']})" for c in conversations}
+            current = st.session_state.conversation_id
+            selected = st.selectbox(
+                "Conversations", ids, index=ids.index(current) if current in ids else None,
+                format_func=titles.get, placeholder="New conversation",
+            )
+            if selected is not None and selected != current:
+                open_conversation(selected)
+                st.rerun()
+
+        st.divider()
+        st.info(f"**Messages:** {st.session_state.next_seq}\n**Model:** GPT-3.5-turbo")
+
+        report = st.session_state.get("last_context_report")
+        if report:
+            st.caption(
+                f"Last request: {report['tokens_sent']:,} / {chat_context.CONTEXT_TOKEN_BUDGET:,} tokens · "
+                f"{report['window_messages']} recent messages, summary of {report['summarized_messages']}"
+            )
+
+        st.toggle("Ground answers in platform data", key="grounded_chat",
+                  help="Send the most relevant incidents and tickets with each question")
+        if st.session_state.grounded_chat:
+            st.slider("Records per question", 1, 10, key="grounding_k")
+
+        st.toggle("Bypass response cache", key="bypass_chat_cache",
+                  help="Always ask the model; the fresh answer replaces the cached one")
+        stats = completion_cache.cache_stats()
+        st.caption(
+            f"Cache: {stats['hits']} hits / {stats['misses']} misses "
+            f"({stats['hit_rate']:.0%}) · {stats['entries']} answers, {stats['bytes'] / 1024:.0f} KB"
+        )
+
+        st.divider()
+        st.markdown("**💡 Tip:** Free tier needs credits at platform.openai.com")
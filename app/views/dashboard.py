@@ -0,0 +1,343 @@
+"""
+Week 8-9: Dashboard with Database Integration
+Rendered by app/router.py; pages/1_Dashboard.py is the standalone entry point.
+While Live is switched on (it starts off), the incident and ticket tabs rerun
+on their own every LIVE_REFRESH_SECONDS (INTEL_LIVE_SECONDS) to pick up new
+rows. st.tabs renders every tab, so both reruns happen whichever is shown.
+"""
+import os
+
+import streamlit as st
+import pandas as pd
+
+from app import instrumentation
+from app.data.db import page_frame, rows_frame, distinct_values, search_rows, count_matches
+from app.data import snapshots, trends
+from app.services import precompute
+
+PAGE_SIZE_OPTIONS = [25, 50, 100, 250]
+LIVE_REFRESH_SECONDS = float(os.environ.get("INTEL_LIVE_SECONDS", "5"))
+
+def filter_controls(table, filter_labels, sort_options):
+    """Render the search/filter/sort widgets for a table and return the query arguments."""
+    search = st.text_input("🔍 Search", key=f"{table}_search",
+                           placeholder="Search descriptions, categories and statuses")
+    with st.expander("Filters & sorting", expanded=False):
+        filters = {}
+        columns = st.columns(len(filter_labels))
+        for col, (column, label) in zip(columns, filter_labels.items()):
+            with col:
+                filters[column] = st.multiselect(label, distinct_values(table, column), key=f"{table}_{column}")
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            dates = st.date_input("Date range", value=(), key=f"{table}_dates")
+        with col2:
+            sort_by = st.selectbox("Sort by", list(sort_options), format_func=sort_options.get, key=f"{table}_sort")
+        with col3:
+            descending = st.radio("Order", ["Descending", "Ascending"], key=f"{table}_order") == "Descending"
+        with col4:
+            page_size = st.selectbox("Rows per page", PAGE_SIZE_OPTIONS, index=1, key=f"{table}_page_size")
+
+    date_from = dates[0] if len(dates) > 0 else None
+    date_to = dates[1] if len(dates) > 1 else date_from
+    return {
+        "search": search.strip(),
+        "filters": filters,
+        "date_from": date_from,
+        "date_to": date_to,
+        "sort_by": sort_by,
+        "descending": descending,
+        "page_size": page_size,
+    }
+
+def is_default_query(query, sort_by):
+    """Whether the controls still show the default view (newest first, no filters)."""
+    return (not query["search"] and not any(query["filters"].values())
+            and query["date_from"] is None and query["sort_by"] == sort_by and query["descending"]
+            and query["page_size"] == precompute.FIRST_PAGE_SIZE)
+
+def snapshot_age(snapshot):
+    """Caption text for how old a precomputed tab is."""
+    seconds = int(snapshot["age_seconds"])
+    age = f"{seconds} s" if seconds < 120 else f"{seconds // 60} min"
+    return f"Updated {age} ago"
+
+def live_caption(tab, snapshot):
+    """Snapshot age plus the rows added since this session first showed the tab."""
+    added = snapshot["data"]["added"]
+    seen_key = f"{tab}_seen_added"
+    if added < st.session_state.setdefault(seen_key, added):
+        st.session_state[seen_key] = added   # the live feed was reloaded
+    new = added - st.session_state[seen_key]
+    return snapshot_age(snapshot) + (f" · {new:,} new since you opened the Dashboard" if new else "")
+
+def paged_table(table, query, first_page=None):
+    """Show one page of a table, with Previous/Next keyset navigation.
+
+    ``first_page`` is a precomputed (rows, next_cursor) used instead of a
+    query when the default view's first page is shown.
+    """
+    # Cursor stack per table; reset whenever the filters or sort order change
+    state_key = f"{table}_pages"
+    signature = repr(sorted(query.items()))
+    state = st.session_state.get(state_key)
+    if not state or state["signature"] != signature:
+        state = {"signature": signature, "cursors": [None]}
+        st.session_state[state_key] = state
+    cursors = state["cursors"]
+
+    query = dict(query)
+    search = query.pop("search", "")
+    if search:
+        # Ranked full-text matches; the sort options do not apply
+        where = {k: query[k] for k in ("filters", "date_from", "date_to")}
+        rows, next_cursor = search_rows(table, search, page_size=query["page_size"],
+                                        after=cursors[-1], highlight=("«", "»"), **where)
+        st.caption(f"{count_matches(table, search, **where):,} matches for “{search}”")
+        for row in rows:
+            row["description"] = row.pop("snippet")  # matches marked «like this»
+        frame = rows_frame(table, rows)
+    elif first_page is not None and len(cursors) == 1:
+        rows, next_cursor = first_page
+        frame = rows_frame(table, rows)
+    else:
+        frame, next_cursor = page_frame(table, after=cursors[-1], **query)
+    if len(frame):
+        with instrumentation.timer("dashboard.table"):
+            st.dataframe(frame, use_container_width=True, hide_index=True)
+    else:
+        st.info("No rows match the current search and filters" if search else "No rows match the current filters")
+
+    col1, col2, col3 = st.columns([1, 4, 1])
+    with col1:
+        if st.button("◀ Previous", key=f"{table}_prev", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        st.caption(f"Page {len(cursors)}")
+    with col3:
+        if st.button("Next ▶", key=f"{table}_next", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
+
+def counts_series(counts):
+    """Turn a value -> count mapping into a Series for st.bar_chart."""
+    return pd.Series({("Unknown" if value is None else value): count for value, count in counts.items()})
+
+def trend_frame(buckets, values, columns):
+    """A bucket-indexed DataFrame for st.line_chart."""
+    return pd.DataFrame(values, index=pd.to_datetime(buckets), columns=columns)
+
+def breakdown(frame, rows, columns):
+    """Row counts for each pair of values of two columns (missing values as "Unknown")."""
+    labels = {name: frame[name].astype(object).fillna("Unknown") for name in (rows, columns)}
+    return pd.crosstab(labels[rows], labels[columns])
+
+def trends_tab():
+    """Incident counts over time and ticket resolution times per assignee."""
+    if not trends.available():
+        st.info("Trend charts need NumPy: pip install numpy")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        granularity = st.radio("Bucket", list(trends.GRANULARITIES), index=1, horizontal=True, key="trends_granularity")
+    with col2:
+        window = st.number_input("Rolling window (buckets)", min_value=1, max_value=90, value=7, key="trends_window")
+    with col3:
+        dates = st.date_input("Date range", value=(), key="trends_dates")
+    date_from = dates[0] if len(dates) > 0 else None
+    date_to = dates[1] if len(dates) > 1 else date_from
+
+    st.subheader("Incidents by Severity")
+    incidents = trends.bucket_counts("cyber_incidents", granularity, date_from, date_to)
+    if len(incidents["buckets"]):
+        frame = trend_frame(incidents["buckets"], incidents["counts"], incidents["labels"])
+        frame[f"Total ({window}-bucket mean)"] = trends.rolling_mean(incidents["counts"].sum(axis=1), window)
+        st.line_chart(frame)
+    else:
+        st.info("No incidents in this range")
+
+    st.subheader("Ticket Resolution Hours by Assignee")
+    resolution = trends.resolution_stats(granularity, date_from, date_to)
+    if len(resolution["buckets"]) and resolution["count"].any():
+        statistic = st.radio("Statistic", ["Mean", "p95"], horizontal=True, key="trends_statistic")
+        hours = resolution["mean"] if statistic == "Mean" else resolution["p95"]
+        st.line_chart(trend_frame(resolution["buckets"], hours, resolution["assignees"]).sort_index(axis=1))
+    else:
+        st.info("No resolved tickets in this range")
+
+    st.subheader("Incident Categories by Severity")
+    with instrumentation.timer("dashboard.category_breakdown"):
+        frame, source = snapshots.analysis_frame("cyber_incidents", ("category", "severity"),
+                                                 date_from=date_from, date_to=date_to)
+    if len(frame):
+        st.dataframe(breakdown(frame, "category", "severity"), use_container_width=True)
+        st.caption("Read from the latest Parquet snapshot" if source == "snapshot" else
+                   "Read from the database (no current snapshot: python -m app.data.snapshots export)")
+    else:
+        st.info("No incidents in this range")
+
+def incidents_tab():
+    """Incident tiles, table and charts; reruns on its own while Live is on."""
+    with instrumentation.timer("dashboard.incidents_tab"):
+        st.subheader("Cyber Security Incidents")
+
+        snapshot = precompute.snapshot("incidents")
+        summary = snapshot["data"]["summary"]
+        st.caption(live_caption("incidents", snapshot))
+        if summary["total"]:
+            # Summary metrics
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Total Incidents", summary["total"])
+            with col2:
+                st.metric("High Severity", summary["by_severity"].get("High", 0))
+            with col3:
+                st.metric("Resolved", summary["by_status"].get("Resolved", 0))
+
+            st.divider()
+
+            # Data table - one page at a time, filtered and sorted in SQL
+            query = filter_controls(
+                "cyber_incidents",
+                {"severity": "Severity", "status": "Status", "category": "Category"},
+                {"timestamp": "Timestamp", "incident_id": "Incident ID", "severity": "Severity", "status": "Status"},
+            )
+            paged_table("cyber_incidents", query,
+                        snapshot["data"]["first_page"] if is_default_query(query, "timestamp") else None)
+
+            # Charts
+            col1, col2 = st.columns(2)
+            with col1:
+                st.subheader("By Severity")
+                st.bar_chart(counts_series(summary["by_severity"]))
+
+            with col2:
+                st.subheader("By Status")
+                st.bar_chart(counts_series(summary["by_status"]))
+        else:
+            st.info("No incidents found in database")
+
+def tickets_tab():
+    """Ticket tiles, table and charts; reruns on its own while Live is on."""
+    with instrumentation.timer("dashboard.tickets_tab"):
+        st.subheader("IT Support Tickets")
+
+        snapshot = precompute.snapshot("tickets")
+        summary = snapshot["data"]["summary"]
+        st.caption(live_caption("tickets", snapshot))
+        if summary["total"]:
+            # Metrics
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Total Tickets", summary["total"])
+            with col2:
+                st.metric("High Priority", summary["by_priority"].get("High", 0))
+            with col3:
+                st.metric("Resolved", summary["by_status"].get("Resolved", 0))
+            with col4:
+                avg_hours = summary["avg_resolution_hours"]
+                st.metric("Avg Resolution", f"{avg_hours:.1f} h" if avg_hours is not None else "N/A")
+
+            st.divider()
+
+            # Data table - one page at a time, filtered and sorted in SQL
+            query = filter_controls(
+                "it_tickets",
+                {"priority": "Priority", "status": "Status", "assigned_to": "Assigned to"},
+                {"created_at": "Created", "ticket_id": "Ticket ID", "priority": "Priority",
+                 "status": "Status", "resolution_time_hours": "Resolution time"},
+            )
+            paged_table("it_tickets", query,
+                        snapshot["data"]["first_page"] if is_default_query(query, "created_at") else None)
+
+            # Charts
+            col1, col2 = st.columns(2)
+            with col1:
+                st.subheader("By Priority")
+                st.bar_chart(counts_series(summary["by_priority"]))
+
+            with col2:
+                st.subheader("By Status")
+                st.bar_chart(counts_series(summary["by_status"]))
+        else:
+            st.info("No tickets found in database")
+
+def render():
+    """Draw the Dashboard page."""
+    if not st.session_state.get("logged_in", False):
+        st.warning("Please login first")
+        return
+
+    # Header
+    st.title("📊 Intelligence Dashboard")
+    st.markdown(f"**User:** {st.session_state.username}")
+
+    # Navigation
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        if st.button("🏠 Home"):
+            st.session_state.page = "home"
+            st.rerun()
+    with col2:
+        if st.button("🤖 AI Assistant"):
+            st.session_state.page = "chatgpt"
+            st.rerun()
+    with col3:
+        live = st.toggle("Live", value=False, key="dashboard_live",
+                         help=f"Refresh incidents and tickets every {LIVE_REFRESH_SECONDS:g} s "
+                              "(INTEL_LIVE_SECONDS)")
+    # While Live is on the two tabs rerun on their own, reading the latest snapshot
+    every = LIVE_REFRESH_SECONDS if live else None
+
+    st.divider()
+
+    # Tabs for different data views
+    tab1, tab2, tab3, tab4 = st.tabs(["🔴 Cyber Incidents", "📁 Datasets", "🎫 IT Tickets", "📈 Trends"])
+
+    # CYBER INCIDENTS TAB
+    with tab1:
+        st.fragment(incidents_tab, run_every=every)()
+
+    # DATASETS TAB
+    with tab2, instrumentation.timer("dashboard.datasets_tab"):
+        st.subheader("Dataset Metadata")
+
+        snapshot = precompute.snapshot("datasets")
+        df = snapshot["data"]["frame"]
+        st.caption(snapshot_age(snapshot))
+        if len(df):
+
+            # Metrics
+            totals = snapshot["data"]["totals"]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Total Datasets", totals["datasets"])
+            with col2:
+                st.metric("Total Rows", f"{int(totals['total_rows']):,}")
+            with col3:
+                st.metric("Total Columns", int(totals["total_columns"]))
+
+            st.divider()
+
+            # Data table
+            st.dataframe(df, use_container_width=True, hide_index=True)
+
+            # Chart
+            st.subheader("Dataset Rows")
+            if snapshot["data"]["rows_chart"] is not None:
+                st.bar_chart(snapshot["data"]["rows_chart"])
+            else:
+                st.info("Row data not available")
+        else:
+            st.info("No datasets found in database")
+
+    # IT TICKETS TAB
+    with tab3:
+        st.fragment(tickets_tab, run_every=every)()
+
+    # TRENDS TAB
+    with tab4, instrumentation.timer("dashboard.trends_tab"):
+        trends_tab()
@@ -0,0 +1,85 @@
+"""
+Performance Panel
+Admin-only view of the hot-path instrumentation: p50/p95 per operation,
+counters, pool and cache state, and the latest per-rerun traces.
+Rendered by app/router.py; pages/3_Performance.py is the standalone entry point.
+
+Admins are users whose role is 'admin', plus any usernames listed
+(comma-separated) in the INTEL_ADMINS environment variable.
+"""
+import os
+
+import streamlit as st
+
+from app import instrumentation
+from app.data.db import get_user_role
+
+ADMIN_USERS = {name.strip() for name in os.environ.get("INTEL_ADMINS", "").split(",") if name.strip()}
+
+
+def is_admin(username):
+    """Whether a user may see the performance panel."""
+    return bool(username) and (username in ADMIN_USERS or get_user_role(username) == "admin")
+
+
+def render():
+    """Draw the Performance page."""
+    if not st.session_state.get("logged_in", False):
+        st.warning("Please login first")
+        return
+    if not is_admin(st.session_state.username):
+        st.error("The performance panel is only available to administrators.")
+        return
+
+    st.title("⏱️ Performance")
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        if st.button("🏠 Home"):
+            st.session_state.page = "home"
+            st.rerun()
+    with col2:
+        if st.button("Reset metrics"):
+            instrumentation.reset()
+            st.rerun()
+
+    if not instrumentation.ENABLED:
+        st.info("Instrumentation is off (INTEL_METRICS=0). Restart without it to record metrics.")
+        return
+
+    st.subheader("Operations")
+    stats = instrumentation.operation_stats()
+    if stats:
+        st.dataframe(
+            [{"operation": name, "count": s["count"], "p50 ms": round(s["p50_ms"], 2),
+              "p95 ms": round(s["p95_ms"], 2), "p99 ms": round(s["p99_ms"], 2),
+              "max ms": round(s["max_ms"], 2), "total ms": round(s["total_ms"], 1)}
+             for name, s in sorted(stats.items(), key=lambda item: -item[1]["total_ms"])],
+            use_container_width=True, hide_index=True,
+        )
+    else:
+        st.info("Nothing recorded yet")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Counters")
+        st.dataframe([{"counter": name, "value": value} for name, value in instrumentation.counters().items()],
+                     use_container_width=True, hide_index=True)
+    with col2:
+        st.subheader("Pool and cache")
+        st.dataframe([{"gauge": name, "value": round(value, 4) if isinstance(value, float) else value}
+                      for name, value in instrumentation.gauges().items()],
+                     use_container_width=True, hide_index=True)
+
+    st.subheader("Recent reruns")
+    for trace in instrumentation.recent_traces(10):
+        with st.expander(f"{trace['name']} — {trace['ms']:.1f} ms"):
+            st.text("\n".join(f"{'  ' * s['depth']}{s['name']:<40} +{s['start_ms']:8.1f} ms {s['ms']:8.1f} ms"
+                              for s in trace["spans"]))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Download Prometheus metrics", instrumentation.prometheus_text(),
+                           file_name="metrics.prom", mime="text/plain")
+    with col2:
+        st.download_button("Download JSON", instrumentation.metrics_json(),
+                           file_name="metrics.json", mime="application/json")
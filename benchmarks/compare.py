@@ -0,0 +1,87 @@
+"""
+Benchmark Comparison
+Compares two results files from benchmarks/run.py, scenario by scenario.
+
+A scenario counts as a regression when its median time grew by more than the
+threshold (default 10%) and by more than MIN_DELTA_MS, so jitter on
+sub-millisecond queries is not reported. The exit status is 1 if there are
+any regressions, so the check can gate a CI job.
+
+Usage:
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 0.15]
+"""
+import argparse
+import json
+
+DEFAULT_THRESHOLD = 0.10
+MIN_DELTA_MS = 0.1
+
+
+def load(path):
+    """Read a results document."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, candidate, threshold=DEFAULT_THRESHOLD, min_delta_ms=MIN_DELTA_MS):
+    """Per-scenario (name, base_ms, new_ms, change, status) rows.
+
+    change is the relative change in median time (positive is slower);
+    status is "regression", "improvement", "ok", or "missing" when a
+    scenario only ran in one of the files.
+    """
+    rows = []
+    base_results, new_results = baseline["results"], candidate["results"]
+    for name in list(base_results) + [n for n in new_results if n not in base_results]:
+        base, new = base_results.get(name), new_results.get(name)
+        if not base or not new or base.get("skipped") or new.get("skipped"):
+            rows.append((name, None, None, None, "missing"))
+            continue
+        delta = new["median_ms"] - base["median_ms"]
+        change = delta / base["median_ms"] if base["median_ms"] else 0.0
+        if abs(delta) < min_delta_ms:
+            status = "ok"
+        elif change > threshold:
+            status = "regression"
+        elif change < -threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, base["median_ms"], new["median_ms"], change, status))
+    return rows
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative median slowdown counted as a regression")
+    args = parser.parse_args(argv)
+
+    baseline, candidate = load(args.baseline), load(args.candidate)
+    for key in ("size", "seed", "bcrypt_rounds"):
+        if baseline["meta"].get(key) != candidate["meta"].get(key):
+            print(f"⚠ {key} differs: {baseline['meta'].get(key)} vs {candidate['meta'].get(key)}")
+    print(f"baseline  {(baseline['meta'].get('commit') or '?')[:10]}  "
+          f"candidate {(candidate['meta'].get('commit') or '?')[:10]}")
+
+    rows = compare(baseline, candidate, args.threshold)
+    print(f"{'scenario':<22} {'baseline':>12} {'candidate':>12} {'change':>9}")
+    for name, base_ms, new_ms, change, status in rows:
+        if status == "missing":
+            print(f"{name:<22} {'-':>12} {'-':>12} {'':>9}  (only in one run)")
+            continue
+        marker = {"regression": "  ✗ slower", "improvement": "  ✓ faster"}.get(status, "")
+        print(f"{name:<22} {base_ms:>10.2f}ms {new_ms:>10.2f}ms {change:>+8.1%}{marker}")
+
+    regressions = [row for row in rows if row[4] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        raise SystemExit(1)
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
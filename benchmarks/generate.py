@@ -0,0 +1,124 @@
+"""
+Synthetic Data Generator
+Writes cyber_incidents, it_tickets and datasets_metadata CSV files shaped
+like the ones in DATA/, at any size, for benchmarking.
+
+Output is deterministic: the same size and seed always produce byte-identical
+files, so results from different commits are measured on the same data.
+Rows are written as they are generated, so memory stays flat even at 10M.
+
+Usage:
+    python -m benchmarks.generate --size 1m --out /tmp/bench-data
+"""
+import argparse
+import csv
+import os
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.data.labels import CATEGORIES, PRIORITIES, SEVERITIES, STATUSES
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+DEFAULT_SEED = 1510
+
+START = datetime(2024, 1, 1)
+SPAN_SECONDS = 365 * 24 * 3600
+ASSIGNEES = tuple(f"IT_Support_{letter}" for letter in "ABCDEFGH")
+UPLOADERS = ("data_scientist", "cyber_admin", "it_admin", "analyst")
+WORDS = ("phishing email credential malware ransomware endpoint firewall vpn login "
+         "suspicious outbound traffic server workstation laptop patch vulnerability "
+         "exfiltration dns brute force account lockout privilege escalation alert "
+         "quarantined blocked investigated user reported finance hr database backup "
+         "printer password reset network slow outage email sync license install").split()
+
+# Labels are skewed like real queues: most incidents are low severity, most
+# tickets are closed. Weights are in the label order from labels.py.
+SEVERITY_WEIGHTS = (5, 20, 35, 40)
+STATUS_WEIGHTS = (15, 10, 5, 35, 35)
+PRIORITY_WEIGHTS = (5, 20, 40, 35)
+
+
+def size_rows(size):
+    """Row count for a named size ("10k", "1m", ...) or a plain number."""
+    return SIZES[size.lower()] if size.lower() in SIZES else int(size)
+
+
+def _timestamp(rng):
+    """A random time in 2024, formatted like the DATA/ files."""
+    return (START + timedelta(seconds=rng.randrange(SPAN_SECONDS))).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _description(rng, words=8):
+    """Free text with a host name, so searches have both common and rare terms."""
+    text = rng.choices(WORDS, weights=range(len(WORDS), 0, -1), k=words)
+    text.insert(rng.randrange(words + 1), f"{rng.choice(('ws', 'srv', 'lt'))}-{rng.randrange(10000):04d}")
+    return " ".join(text)
+
+
+def incident_rows(count, rng):
+    """cyber_incidents rows in CSV column order."""
+    for i in range(count):
+        yield (1000 + i, _timestamp(rng),
+               rng.choices(SEVERITIES, SEVERITY_WEIGHTS)[0], rng.choice(CATEGORIES),
+               rng.choices(STATUSES, STATUS_WEIGHTS)[0], _description(rng))
+
+
+def ticket_rows(count, rng):
+    """it_tickets rows in CSV column order."""
+    for i in range(count):
+        status = rng.choices(STATUSES, STATUS_WEIGHTS)[0]
+        hours = rng.randrange(1, 120) if status in ("Resolved", "Closed") else ""
+        yield (2000 + i, rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0], _description(rng, 6),
+               status, rng.choice(ASSIGNEES), _timestamp(rng), hours)
+
+
+def dataset_rows(count, rng):
+    """datasets_metadata rows in CSV column order."""
+    for i in range(count):
+        yield (1 + i, f"Dataset_{i:06d}", rng.randrange(100, 5_000_000), rng.randrange(3, 200),
+               rng.choice(UPLOADERS), _timestamp(rng)[:10])
+
+
+TABLES = {
+    "cyber_incidents": (("incident_id", "timestamp", "severity", "category", "status", "description"),
+                        incident_rows, 1),
+    "it_tickets": (("ticket_id", "priority", "description", "status", "assigned_to", "created_at",
+                    "resolution_time_hours"), ticket_rows, 1),
+    "datasets_metadata": (("dataset_id", "name", "rows", "columns", "uploaded_by", "upload_date"),
+                          dataset_rows, 100),   # one dataset per 100 incidents
+}
+
+
+def generate(directory, rows, seed=DEFAULT_SEED):
+    """Write the three CSV files; returns [(path, table, row_count)] like PLATFORM_FILES."""
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    for table, (header, make_rows, divisor) in TABLES.items():
+        count = max(1, rows // divisor)
+        path = os.path.join(directory, f"{table}.csv")
+        rng = random.Random(f"{seed}:{table}")   # per-table streams: sizes do not shift each other
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(make_rows(count, rng))
+        files.append((path, table, count))
+    return files
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Generate benchmark CSV files")
+    parser.add_argument("--size", default="10k", help=f"rows per table: {', '.join(SIZES)} or a number")
+    parser.add_argument("--out", required=True, help="directory for the CSV files")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    for path, table, count in generate(args.out, size_rows(args.size), args.seed):
+        print(f"✓ {count:,} rows of {table} -> {path}")
+    print(f"Generated in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Benchmark Runner
+Generates data, loads it, runs the scenarios and writes the results as JSON.
+
+Generated files and the loaded database are kept in the work directory and
+reused by later runs with the same size and seed, so only the first run at a
+size pays for generation. Ingest scenarios always load into fresh scratch
+databases.
+
+Usage:
+    python -m benchmarks.run --size 10k --out results.json
+    python -m benchmarks.run --size 1m --only queries,aggregates --rounds 20
+    python -m benchmarks.compare baseline.json results.json
+"""
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+DEFAULT_ROUNDS = 10
+DEFAULT_BCRYPT_ROUNDS = 10   # below the app default so auth runs stay short
+
+
+def _git(*args):
+    """Output of a git command in the repository, or None outside a checkout."""
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _metadata(args, rows):
+    """Where and on what a run happened, so result files can be told apart."""
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "size": args.size,
+        "rows": rows,
+        "seed": args.seed,
+        "rounds": args.rounds,
+        "bcrypt_rounds": int(os.environ["BCRYPT_ROUNDS"]),
+    }
+
+
+def prepare(work_dir, size, seed):
+    """Generate (or reuse) the CSV files and the loaded database for a size."""
+    from benchmarks.generate import generate, size_rows
+    from benchmarks.scenarios import use_database
+
+    rows = size_rows(size)
+    data_dir = os.path.join(work_dir, f"{size}-{seed}")
+    manifest = os.path.join(data_dir, "manifest.json")
+    db_path = os.path.join(data_dir, "bench.db")
+    if os.path.exists(manifest):
+        with open(manifest) as f:
+            files = [tuple(entry) for entry in json.load(f)]
+    else:
+        print(f"Generating {rows:,} rows per table in {data_dir} ...")
+        files = generate(data_dir, rows, seed)
+        if os.path.exists(db_path):
+            os.remove(db_path)
+
+    use_database(db_path)
+    from app.data.migrations import migrate
+
+    migrate()   # also brings a reused database up to the current schema
+    if not os.path.exists(manifest):
+        from app.data.pipeline import run_pipeline
+
+        print("Loading the benchmark database ...")
+        run_pipeline([(path, table) for path, table, _ in files])
+        with open(manifest, "w") as f:
+            json.dump(files, f)
+    return {"rows": rows, "files": files, "db": db_path, "data_dir": data_dir}
+
+
+def run(args):
+    """Run the selected scenarios; returns the results document."""
+    from app.data import pool
+    from benchmarks.scenarios import SCENARIOS, use_database
+
+    env = prepare(args.work_dir, args.size, args.seed)
+    env["rounds"] = args.rounds
+    scratch = tempfile.mkdtemp(prefix="scratch-", dir=env["data_dir"])
+    counter = iter(range(1_000_000))
+    env["scratch_db"] = lambda: os.path.join(scratch, f"ingest-{next(counter)}.db")
+
+    groups = set(args.only.split(",")) if args.only else None
+    results = {}
+    for name, (group, func) in SCENARIOS.items():
+        if groups and group not in groups and name not in groups:
+            continue
+        if str(pool.DB_PATH) != env["db"]:
+            use_database(env["db"])   # an ingest scenario switched to a scratch database
+        print(f"{group:<11} {name:<22}", end=" ", flush=True)
+        started = time.perf_counter()
+        stats = func(env)
+        if stats is None:
+            print("skipped")
+            results[name] = {"group": group, "skipped": True}
+            continue
+        print(f"median {stats['median_ms']:10.2f} ms  p95 {stats['p95_ms']:10.2f} ms  "
+              f"({time.perf_counter() - started:.1f}s)")
+        results[name] = {"group": group, **stats}
+    return {"meta": _metadata(args, env["rows"]), "results": results}
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Run the intelligence platform benchmarks")
+    parser.add_argument("--size", default="10k", help="rows per table: 10k, 100k, 1m, 10m or a number")
+    parser.add_argument("--seed", type=int, default=None, help="generator seed")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="timed rounds per scenario")
+    parser.add_argument("--only", default=None, help="comma-separated groups or scenario names")
+    parser.add_argument("--bcrypt-rounds", type=int, default=DEFAULT_BCRYPT_ROUNDS)
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), "intel-bench"),
+                        help="where generated data and databases are kept")
+    parser.add_argument("--out", default=None, help="write results JSON here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    # Must be set before app.services.auth_executor is imported
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    from benchmarks.generate import DEFAULT_SEED
+    args.seed = DEFAULT_SEED if args.seed is None else args.seed
+
+    document = run(args)
+    text = json.dumps(document, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+        print(f"Results written to {args.out}")
+    else:
+        sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Benchmark Scenarios
+Timed workloads for the ingest, query, aggregate and auth layers.
+
+Each scenario is a function registered with @scenario(group). It receives
+the run's ``env`` dict (database path, generated files, row count, rounds)
+and returns the stats from measure(), optionally with extra fields such as
+rows per second. Returning None marks the scenario as skipped, e.g. a
+whole-table read at 10M rows.
+
+Read scenarios call the db.py functions through ``__wrapped__`` (or
+uncached() for functions that call other cached ones), so they time the SQL
+rather than a dict lookup. The cache itself is measured separately by
+cached_first_page.
+"""
+import gc
+import math
+import os
+import statistics
+import threading
+import time
+
+SCENARIOS = {}   # name -> (group, function), in registration order
+WHOLE_TABLE_LIMIT = 1_000_000   # skip whole-table reads above this many rows
+
+
+def scenario(group):
+    """Register a benchmark scenario under a group name."""
+    def register(func):
+        SCENARIOS[func.__name__] = (group, func)
+        return func
+    return register
+
+
+def summarize(samples):
+    """pytest-benchmark-style statistics (milliseconds) for a list of seconds."""
+    ms = sorted(s * 1000 for s in samples)
+    return {
+        "rounds": len(ms),
+        "min_ms": ms[0],
+        "max_ms": ms[-1],
+        "mean_ms": statistics.fmean(ms),
+        "median_ms": statistics.median(ms),
+        "p95_ms": ms[max(0, math.ceil(len(ms) * 0.95) - 1)],   # nearest rank
+        "stddev_ms": statistics.stdev(ms) if len(ms) > 1 else 0.0,
+        "ops_per_second": 1000 / statistics.fmean(ms) if ms[-1] else 0.0,
+    }
+
+
+def measure(func, rounds, warmup=1):
+    """Call func() warmup + rounds times and summarize the timed rounds.
+
+    The garbage collector is paused while timing, as pytest-benchmark does,
+    so a collection does not land on a random round.
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(rounds):
+            started = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - started)
+    finally:
+        if enabled:
+            gc.enable()
+    return summarize(samples)
+
+
+def use_database(path):
+    """Point the connection pool at another database file and forget cached results."""
+    from app.data import pool
+    from app.data.cache import invalidate
+
+    pool.close_all()
+    pool.DB_PATH = path
+    invalidate()
+
+
+def uncached(func, *args):
+    """A callable that empties the query cache and then calls func(*args)."""
+    from app.data.cache import invalidate
+
+    def call():
+        invalidate()
+        return func(*args)
+    return call
+
+
+# Ingest
+
+@scenario("ingest")
+def ingest_load_csv(env):
+    """Sequential chunked load of the generated files into an empty database."""
+    from app.data.ingest import load_csv
+    from app.data.migrations import migrate
+
+    use_database(env["scratch_db"]())
+    migrate()
+    rows = sum(count for _, _, count in env["files"])
+    started = time.perf_counter()
+    for path, table, _ in env["files"]:
+        load_csv(path, table, resume=False)
+    stats = summarize([time.perf_counter() - started])
+    stats["rows_per_second"] = rows / (stats["mean_ms"] / 1000)
+    return stats
+
+
+@scenario("ingest")
+def ingest_pipeline(env):
+    """Parallel parse + single-writer load of the generated files into an empty database."""
+    from app.data.migrations import migrate
+    from app.data.pipeline import run_pipeline
+
+    use_database(env["scratch_db"]())
+    migrate()
+    result = run_pipeline([(path, table) for path, table, _ in env["files"]])
+    stats = summarize([result["seconds"]])
+    stats["rows_per_second"] = result["rows_per_second"]
+    stats["workers"] = result["workers"]
+    return stats
+
+
+# Dashboard queries
+
+@scenario("queries")
+def get_all_incidents(env):
+    """The original Dashboard read: every incident, newest first."""
+    if env["rows"] > WHOLE_TABLE_LIMIT:
+        return None
+    from app.data import db
+
+    return measure(db.get_all_incidents.__wrapped__, env["rounds"])
+
+
+@scenario("queries")
+def dashboard_dataframe(env):
+    """The original Dashboard table: every incident into a DataFrame via dicts."""
+    if env["rows"] > WHOLE_TABLE_LIMIT:
+        return None
+    import pandas as pd
+    from app.data import db
+
+    return measure(lambda: pd.DataFrame([dict(row) for row in db.get_all_incidents.__wrapped__()]),
+                   env["rounds"])
+
+
+@scenario("queries")
+def typed_dataframe(env):
+    """Every incident into a typed DataFrame via db.table_frame()."""
+    if env["rows"] > WHOLE_TABLE_LIMIT:
+        return None
+    from app.data import db
+
+    return measure(uncached(db.table_frame, "cyber_incidents"), env["rounds"])
+
+
+@scenario("queries")
+def snapshot_dataframe(env):
+    """Every incident into an Arrow-backed DataFrame from a fresh Parquet snapshot."""
+    from app.data import snapshots
+
+    if env["rows"] > WHOLE_TABLE_LIMIT or not snapshots.available():
+        return None
+    directory = os.path.join(env["data_dir"], "snapshots")
+    snapshots.export_snapshot("cyber_incidents", directory)
+    return measure(lambda: snapshots.read_snapshot("cyber_incidents", directory=directory), env["rounds"])
+
+
+@scenario("queries")
+def first_page(env):
+    """Newest 50 incidents."""
+    from app.data import db
+
+    return measure(lambda: db.query_rows.__wrapped__("cyber_incidents"), env["rounds"])
+
+
+@scenario("queries")
+def first_page_frame(env):
+    """Newest 50 incidents as the Dashboard shows them: a typed DataFrame via db.page_frame()."""
+    from app.data import db
+
+    return measure(lambda: db.page_frame.__wrapped__("cyber_incidents"), env["rounds"])
+
+
+@scenario("queries")
+def next_page(env):
+    """The page after the first, via its keyset cursor."""
+    from app.data import db
+
+    _, cursor = db.query_rows.__wrapped__("cyber_incidents")
+    return measure(lambda: db.query_rows.__wrapped__("cyber_incidents", after=cursor), env["rounds"])
+
+
+@scenario("queries")
+def filtered_page(env):
+    """First page with severity and status filters and a date range."""
+    from app.data import db
+
+    filters = {"severity": ["High", "Critical"], "status": ["Open"]}
+    return measure(lambda: db.query_rows.__wrapped__(
+        "cyber_incidents", filters=filters, date_from="2024-03-01", date_to="2024-06-30"), env["rounds"])
+
+
+@scenario("queries")
+def filtered_count(env):
+    """Count of the filtered rows (drives the Dashboard's match totals)."""
+    from app.data import db
+
+    filters = {"priority": ["High"], "status": ["Open", "In Progress"]}
+    return measure(lambda: db.count_rows.__wrapped__("it_tickets", filters=filters), env["rounds"])
+
+
+@scenario("queries")
+def search_page(env):
+    """First page of ranked full-text matches with snippets."""
+    from app.data import db
+
+    return measure(lambda: db.search_rows.__wrapped__("cyber_incidents", "privilege escalation"),
+                   env["rounds"])
+
+
+@scenario("queries")
+def cached_first_page(env):
+    """First page served from the query cache."""
+    from app.data import db
+
+    return measure(lambda: db.query_rows("cyber_incidents"), env["rounds"] * 10)
+
+
+# Aggregates
+
+@scenario("aggregates")
+def incident_summary(env):
+    """Incident metric tiles and charts (from the rollup table)."""
+    from app.data import db
+
+    return measure(uncached(db.incident_summary), env["rounds"])
+
+
+@scenario("aggregates")
+def ticket_summary(env):
+    """Ticket tiles, including average resolution time per assignee."""
+    from app.data import db
+
+    return measure(uncached(db.ticket_summary), env["rounds"])
+
+
+@scenario("aggregates")
+def count_by_severity(env):
+    """GROUP BY over the base table, as filtered charts do."""
+    from app.data import db
+
+    return measure(lambda: db.count_by.__wrapped__("cyber_incidents", "severity"), env["rounds"])
+
+
+LIVE_INSERTS = 10
+
+
+@scenario("aggregates")
+def live_poll(env):
+    """Dashboard live refresh: merge LIVE_INSERTS new incidents into the counts and first page.
+
+    Each round inserts the rows, then times live.poll(); they are deleted
+    again afterwards.
+    """
+    from app.data import live
+    from app.data.pool import get_connection
+
+    live.poll("cyber_incidents")
+    first_id = 10 ** 12
+    samples = []
+    try:
+        for round_ in range(env["rounds"]):
+            with get_connection() as conn:
+                conn.executemany(
+                    "INSERT INTO cyber_incidents (incident_id, timestamp, severity, category, status, description) "
+                    "VALUES (?, datetime('now'), 'High', 'Malware', 'Open', 'benchmark live row')",
+                    [(first_id + round_ * LIVE_INSERTS + i,) for i in range(LIVE_INSERTS)],
+                )
+            started = time.perf_counter()
+            live.poll("cyber_incidents")
+            samples.append(time.perf_counter() - started)
+    finally:
+        with get_connection() as conn:
+            conn.execute("DELETE FROM cyber_incidents WHERE incident_id >= ?", (first_id,))
+    return summarize(samples)
+
+
+# Auth
+
+LOGIN_USERS = 32
+LOGIN_THREADS = 8
+
+
+@scenario("auth")
+def concurrent_logins(env):
+    """LOGIN_THREADS threads logging in LOGIN_USERS distinct users at once.
+
+    Reports per-login latency stats plus overall logins per second. Uses
+    the bcrypt cost from BCRYPT_ROUNDS (the runner's --bcrypt-rounds).
+    """
+    from app.services import db_auth, rate_limit
+
+    users = [(f"bench_user_{i}", f"bench-password-{i}") for i in range(LOGIN_USERS)]
+    for username, password in users:
+        db_auth.register_user_db(username, password)
+
+    latencies, failures = [], []
+    lock = threading.Lock()
+
+    def login(batch):
+        for username, password in batch:
+            started = time.perf_counter()
+            ok = db_auth.login_user_db(username, password)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+                if not ok:
+                    failures.append(username)
+
+    walls = []
+    for _ in range(env["rounds"]):
+        rate_limit.reset()   # each round starts with fresh login budgets
+        threads = [threading.Thread(target=login, args=(users[i::LOGIN_THREADS],))
+                   for i in range(LOGIN_THREADS)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        walls.append(time.perf_counter() - started)
+
+    stats = summarize(latencies)
+    stats["logins_per_second"] = LOGIN_USERS * len(walls) / sum(walls)
+    stats["failures"] = len(failures)
+    return stats
@@ -0,0 +1,19 @@
+"""
+Performance panel (administrators only)
+Standalone entry point; the page itself lives in app/views/performance.py.
+"""
+import streamlit as st
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.router import render_page
+
+# Only set page config if running standalone
+if "logged_in" not in st.session_state:
+    st.set_page_config(page_title="Performance", page_icon="⏱️", layout="wide")
+    st.warning("Please login first")
+    st.stop()
+
+render_page("performance")
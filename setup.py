@@ -5,8 +5,8 @@ Run this once before starting the Streamlit app
 """
 
 from app.data.db import create_tables, connect_database
+from app.data.ingest import PLATFORM_FILES, load_csv
 from app.services.db_auth import migrate_users_from_file
-import pandas as pd
 
 print("Initializing CST1510 Week 7-10 Project...")
 print()
@@ -19,25 +19,18 @@ print("Database tables created")
 migrate_users_from_file()
 print("Users migrated from users.txt")
 
-# Load CSV data
-conn = connect_database()
-
-# Cyber incidents
-df = pd.read_csv('DATA/cyber_incidents.csv')
-df.to_sql('cyber_incidents', conn, if_exists='append', index=False)
-print(f"✓ {len(df)} cyber incidents loaded")
-
-# Datasets
-df = pd.read_csv('DATA/datasets_metadata.csv')
-df.to_sql('datasets_metadata', conn, if_exists='append', index=False)
-print(f"✓ {len(df)} datasets loaded")
-
-# IT tickets
-df = pd.read_csv('DATA/it_tickets.csv')
-df.to_sql('it_tickets', conn, if_exists='append', index=False)
-print(f"✓ {len(df)} IT tickets loaded")
-
-conn.close()
+# Load CSV data (streamed in chunks and upserted, so re-running is safe)
+labels = {
+    "cyber_incidents": "cyber incidents",
+    "datasets_metadata": "datasets",
+    "it_tickets": "IT tickets",
+}
+for path, table in PLATFORM_FILES:
+    result = load_csv(path, table)
+    if result["skipped"] and not result["rows"]:
+        print(f"✓ {labels[table]} already loaded ({result['skipped']} rows)")
+    else:
+        print(f"✓ {result['rows']} {labels[table]} loaded ({result['rows_per_second']:,.0f} rows/s)")
 
 # Verify
 conn = connect_database()
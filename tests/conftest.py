@@ -0,0 +1,35 @@
+"""Shared fixtures: a freshly migrated database per test."""
+import os
+
+os.environ.setdefault("BCRYPT_ROUNDS", "4")   # read at import; keeps password tests fast
+
+import pytest
+
+from app.data import pool
+from app.data.cache import invalidate
+from app.data.migrations import migrate
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Point the connection pool at an empty database migrated to the latest version."""
+    path = tmp_path / "test.db"
+    pool.close_all()
+    monkeypatch.setattr(pool, "DB_PATH", path)
+    invalidate()
+    migrate()
+    yield path
+    pool.close_all()
+    invalidate()
+
+
+@pytest.fixture
+def execute(database):
+    """Run one write statement (or many, with a list of parameter tuples) and commit."""
+    def run(sql, params=()):
+        with pool.get_connection() as conn:
+            if isinstance(params, list):
+                conn.executemany(sql, params)
+            else:
+                conn.execute(sql, params)
+    return run
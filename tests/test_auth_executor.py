@@ -0,0 +1,45 @@
+import threading
+
+import pytest
+
+pytest.importorskip("bcrypt")
+
+from app.services import auth_executor  # noqa: E402
+
+
+def test_run_returns_the_result():
+    assert auth_executor.run("test", pow, 2, 10) == 1024
+
+
+def test_saturated_pool_raises_busy(monkeypatch):
+    monkeypatch.setattr(auth_executor, "AUTH_TIMEOUT_SECONDS", 0.05)
+    release = threading.Event()
+    blockers = [auth_executor._executor.submit(release.wait, 5)
+                for _ in range(auth_executor.AUTH_WORKERS)]
+    try:
+        with pytest.raises(auth_executor.AuthBusyError):
+            auth_executor.run("test", pow, 2, 10)
+    finally:
+        release.set()
+        for blocker in blockers:
+            blocker.result()
+
+
+def test_timed_out_request_holds_its_slot_until_the_job_ends(monkeypatch):
+    monkeypatch.setattr(auth_executor, "AUTH_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(auth_executor, "_pending", threading.BoundedSemaphore(1))
+    monkeypatch.setattr(auth_executor, "_histograms", {})
+    release = threading.Event()
+    with pytest.raises(auth_executor.AuthBusyError):
+        auth_executor.run("slow", release.wait, 5)
+    with pytest.raises(auth_executor.AuthBusyError):
+        auth_executor.run("test", pow, 2, 10)   # the slow job is still running
+    release.set()
+    assert auth_executor._pending.acquire(timeout=5)
+    auth_executor._pending.release()
+    assert auth_executor.run("test", pow, 2, 10) == 1024
+
+    histograms = auth_executor.latency_histograms()
+    assert "slow" not in histograms
+    assert histograms["slow_timed_out"]["count"] == 1
+    assert histograms["test_rejected"]["count"] == 1
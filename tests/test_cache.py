@@ -0,0 +1,91 @@
+import pytest
+
+from app.data import cache
+from app.data.db import count_rows, get_user_role, query_rows
+from app.data.pool import get_connection, open_connection
+
+
+@pytest.fixture
+def incidents(execute, monkeypatch):
+    monkeypatch.setattr(cache, "VERSION_CHECK_INTERVAL", 0)
+    execute("INSERT INTO cyber_incidents (incident_id, timestamp, severity, status) VALUES (?, ?, ?, ?)",
+            [(i, f"2024-01-0{i} 10:00:00", "High", "Open") for i in range(1, 6)])
+
+
+def _hits():
+    return cache.cache_stats()["hits"]
+
+
+def _version(table):
+    with get_connection() as conn:
+        return conn.execute("SELECT version FROM table_versions WHERE table_name = ?", (table,)).fetchone()[0]
+
+
+def test_repeat_reads_are_hits_and_return_fresh_copies(incidents):
+    rows, cursor = query_rows("cyber_incidents", page_size=3)
+    hits = _hits()
+    rows[0]["severity"] = "changed"
+    again, again_cursor = query_rows("cyber_incidents", page_size=3)
+    assert _hits() == hits + 1
+    assert again[0]["severity"] == "High"
+    assert again_cursor == cursor
+    query_rows("cyber_incidents", page_size=4)   # different arguments, different entry
+    assert _hits() == hits + 1
+
+
+def test_write_from_another_connection_invalidates(incidents):
+    assert count_rows("cyber_incidents") == 5
+    conn = open_connection()   # as another process would
+    with conn:
+        conn.execute("DELETE FROM cyber_incidents WHERE incident_id = 1")
+    conn.close()
+    assert count_rows("cyber_incidents") == 4
+
+
+def test_versions_bump_once_per_write_transaction(incidents, execute):
+    version = _version("cyber_incidents")
+    execute("UPDATE cyber_incidents SET status = 'Closed'")   # five rows
+    assert _version("cyber_incidents") == version + 1
+    execute("DELETE FROM cyber_incidents WHERE incident_id = 1")
+    assert _version("cyber_incidents") == version + 2
+
+    conn = open_connection()
+    for incident_id in (2, 3):
+        with conn:
+            conn.execute("DELETE FROM cyber_incidents WHERE incident_id = ?", (incident_id,))
+    conn.execute("DELETE FROM cyber_incidents")
+    conn.rollback()
+    conn.close()
+    assert _version("cyber_incidents") == version + 4
+
+
+def test_invalidation_is_per_table(incidents, execute):
+    execute("INSERT INTO users (username, password_hash, role) VALUES ('alice', 'x', 'admin')")
+    assert get_user_role("alice") == "admin"
+    count_rows("cyber_incidents")
+    hits = _hits()
+    execute("DELETE FROM cyber_incidents WHERE incident_id = 2")
+    assert get_user_role("alice") == "admin"
+    assert _hits() == hits + 1
+    assert count_rows("cyber_incidents") == 4
+
+
+def test_ttl_and_lru_limits(incidents, monkeypatch):
+    calls = []
+
+    @cache.cached("cyber_incidents", ttl=0)
+    def expires_at_once():
+        calls.append(1)
+        with get_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM cyber_incidents").fetchone()[0]
+
+    assert expires_at_once() == expires_at_once() == 5
+    assert len(calls) == 2
+
+    monkeypatch.setattr(cache, "MAX_ENTRIES", 2)
+    for size in (1, 2, 3):
+        query_rows("cyber_incidents", page_size=size)
+    assert cache.cache_stats()["entries"] == 2
+    hits = _hits()
+    query_rows("cyber_incidents", page_size=1)   # least recently used: evicted
+    assert _hits() == hits
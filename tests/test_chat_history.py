@@ -0,0 +1,44 @@
+import pytest
+
+from app.services import chat_history
+
+
+@pytest.fixture
+def conversation(execute, monkeypatch):
+    monkeypatch.setattr(chat_history, "RETRY_DELAY_SECONDS", 0)
+    execute("INSERT INTO users (username, password_hash) VALUES ('alice', 'x')")
+    return chat_history.start_conversation(chat_history.user_id("alice"), "What changed?")
+
+
+def _failing(monkeypatch, failures):
+    """Make the next ``failures`` batch writes raise."""
+    write, calls = chat_history._write_batch, {"n": 0}
+
+    def flaky(batch):
+        calls["n"] += 1
+        if calls["n"] <= failures:
+            raise RuntimeError("database is locked")
+        write(batch)
+    monkeypatch.setattr(chat_history, "_write_batch", flaky)
+    return calls
+
+
+def test_messages_round_trip(conversation):
+    chat_history.append(conversation, 0, "user", "What changed?")
+    chat_history.append(conversation, 1, "assistant", "Nothing.")
+    assert [m["content"] for m in chat_history.load_messages(conversation)] == ["What changed?", "Nothing."]
+    assert chat_history.list_conversations(chat_history.user_id("alice"))[0]["message_count"] == 2
+
+
+def test_failed_batch_is_retried(conversation, monkeypatch):
+    calls = _failing(monkeypatch, chat_history.WRITE_ATTEMPTS - 1)
+    chat_history.append(conversation, 0, "user", "hello")
+    assert chat_history.conversation_length(conversation) == 1
+    assert calls["n"] == chat_history.WRITE_ATTEMPTS
+
+
+def test_batch_is_dropped_after_last_attempt(conversation, monkeypatch, caplog):
+    _failing(monkeypatch, chat_history.WRITE_ATTEMPTS)
+    chat_history.append(conversation, 0, "user", "hello")
+    assert chat_history.conversation_length(conversation) == 0
+    assert "they are lost" in caplog.text
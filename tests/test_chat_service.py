@@ -0,0 +1,97 @@
+"""chat_service retries: before the first token only, and never for an exhausted quota."""
+from types import SimpleNamespace
+
+import pytest
+
+openai = pytest.importorskip("openai")
+httpx = pytest.importorskip("httpx")
+
+from app.services import chat_service
+
+REQUEST = httpx.Request("POST", "http://test/v1/chat/completions")
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+async def stream(parts, error=None):
+    for part in parts:
+        yield chunk(part)
+    if error is not None:
+        raise error
+
+
+class FakeClient:
+    """Stands in for AsyncOpenAI: each create() call plays the next scripted outcome."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, stream):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    monkeypatch.setattr(chat_service, "BACKOFF_BASE_SECONDS", 0)
+
+    def install(*outcomes):
+        client = FakeClient(*outcomes)
+        monkeypatch.setattr(chat_service, "get_client", lambda api_key: client)
+        return client
+    return install
+
+
+def connection_error():
+    return openai.APIConnectionError(request=REQUEST)
+
+
+def test_retries_then_succeeds(fake_client):
+    client = fake_client(connection_error(), connection_error(), stream(["Hello", ", world"]))
+
+    assert chat_service.complete([{"role": "user", "content": "hi"}], api_key="k") == "Hello, world"
+    assert client.calls == 3
+
+
+def test_no_retry_after_partial_text(fake_client):
+    client = fake_client(stream(["Hel"], connection_error()), stream(["Hello"]))
+
+    with pytest.raises(openai.APIConnectionError):
+        chat_service.complete([{"role": "user", "content": "hi"}], api_key="k")
+    assert client.calls == 1
+
+
+def test_gives_up_after_max_retries(fake_client):
+    client = fake_client(*[connection_error() for _ in range(chat_service.MAX_RETRIES + 1)])
+
+    with pytest.raises(openai.APIConnectionError):
+        chat_service.complete([{"role": "user", "content": "hi"}], api_key="k")
+    assert client.calls == chat_service.MAX_RETRIES + 1
+
+
+def test_insufficient_quota_is_not_retried(fake_client):
+    response = httpx.Response(429, request=REQUEST)
+    quota = openai.RateLimitError("quota", response=response,
+                                  body={"type": "insufficient_quota", "code": "insufficient_quota"})
+    client = fake_client(quota, stream(["never"]))
+
+    with pytest.raises(openai.RateLimitError):
+        chat_service.complete([{"role": "user", "content": "hi"}], api_key="k")
+    assert client.calls == 1
+
+
+def test_other_rate_limits_are_retried(fake_client):
+    response = httpx.Response(429, request=REQUEST)
+    busy = openai.RateLimitError("slow down", response=response,
+                                 body={"type": "requests", "code": "rate_limit_exceeded"})
+    client = fake_client(busy, stream(["ok"]))
+
+    assert chat_service.complete([{"role": "user", "content": "hi"}], api_key="k") == "ok"
+    assert client.calls == 2
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from app.data.db import TABLES, page_frame, query_rows, rows_frame, table_frame  # noqa: E402
+
+
+@pytest.fixture
+def tickets(execute):
+    rng = random.Random(9)
+    execute("INSERT INTO it_tickets (ticket_id, priority, description, status, assigned_to, created_at, "
+            "resolution_time_hours) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(i, rng.choice(["High", "Low", None]), f"ticket {i}", rng.choice(["Open", "Closed"]),
+              rng.choice(["alice", "bob", None]),
+              None if i % 9 == 0 else f"2024-01-{rng.randrange(1, 5):02d} {rng.randrange(24):02d}:00:00",
+              rng.choice([None, 1, 6])) for i in range(1, 61)])
+
+
+def _ids_by_page(read, **query):
+    pages, cursor = [], None
+    while True:
+        page, cursor = read("it_tickets", page_size=8, after=cursor, **query)
+        pages.append([int(row["ticket_id"]) for row in page] if isinstance(page, list)
+                     else page["ticket_id"].tolist())
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("sort_by", TABLES["it_tickets"]["sortable"])
+def test_page_frame_pages_like_query_rows(tickets, sort_by):
+    for descending in (True, False):
+        query = {"sort_by": sort_by, "descending": descending, "filters": {"status": "Open"}}
+        assert _ids_by_page(page_frame.uncached, **query) == _ids_by_page(query_rows.uncached, **query)
+
+
+def test_frames_are_typed(tickets):
+    frame, _ = page_frame.uncached("it_tickets", page_size=100)
+    assert isinstance(frame["priority"].dtype, pd.CategoricalDtype)
+    assert list(frame["priority"].cat.categories[:4]) == ["Critical", "High", "Medium", "Low"]
+    assert isinstance(frame["assigned_to"].dtype, pd.CategoricalDtype)
+    assert frame["created_at"].dtype.kind == "M"
+    assert frame["created_at"].isna().sum() == 6   # missing dates are NaT, not 1970
+    assert frame["ticket_id"].dtype == "int64"
+    assert frame["resolution_time_hours"].dtype == "float64"
+    assert frame.columns.tolist() == list(TABLES["it_tickets"]["columns"])
+    assert table_frame("it_tickets")["created_at"].isna().sum() == 6
+
+
+def test_rows_frame_matches_page_frame(tickets):
+    rows, _ = query_rows.uncached("it_tickets", page_size=100)
+    frame, _ = page_frame.uncached("it_tickets", page_size=100)
+    pd.testing.assert_frame_equal(rows_frame("it_tickets", rows), frame, check_dtype=False)
+    assert rows_frame("it_tickets", rows).dtypes.astype(str).tolist() == frame.dtypes.astype(str).tolist()
@@ -0,0 +1,42 @@
+from app.data import ingest
+from app.data.pool import get_connection
+
+HEADER = "incident_id,timestamp,severity,category,status,description\n"
+
+
+def _write_csv(path, count):
+    lines = [f"{i},2024-01-{i % 28 + 1:02d} 10:00:00,High,Phishing,Open,incident {i}\n" for i in range(1, count + 1)]
+    path.write_text(HEADER + "".join(lines), encoding="utf-8")
+    return path
+
+
+def _incidents():
+    with get_connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM cyber_incidents").fetchone()[0]
+
+
+def test_load_is_chunked_and_upserts(database, tmp_path):
+    path = _write_csv(tmp_path / "incidents.csv", 25)
+    result = ingest.load_csv(path, "cyber_incidents", chunk_size=10)
+    assert (result["rows"], result["skipped"]) == (25, 0)
+    ingest.load_csv(path, "cyber_incidents", resume=False)
+    assert _incidents() == 25
+
+
+def test_completed_load_is_not_read_again(database, tmp_path, monkeypatch):
+    path = _write_csv(tmp_path / "incidents.csv", 25)
+    ingest.load_csv(path, "cyber_incidents")
+    monkeypatch.setattr(ingest, "header_converters", None)   # fails if the file is read
+    result = ingest.load_csv(path, "cyber_incidents")
+    assert (result["rows"], result["skipped"]) == (0, 25)
+
+
+def test_interrupted_load_resumes_after_checkpoint(database, tmp_path):
+    path = _write_csv(tmp_path / "incidents.csv", 25)
+    ingest.load_csv(path, "cyber_incidents")
+    with get_connection() as conn:
+        conn.execute("UPDATE ingest_checkpoints SET rows_done = 10, completed = 0")
+        conn.execute("DELETE FROM cyber_incidents WHERE incident_id > 10")
+    result = ingest.load_csv(path, "cyber_incidents", chunk_size=10)
+    assert (result["rows"], result["skipped"]) == (15, 10)
+    assert _incidents() == 25
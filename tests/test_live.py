@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from app import instrumentation
+from app.data import live
+from app.data.db import TABLES, query_rows
+from app.data.search_index import rebuild_search_indexes
+
+PAGE_SIZE = 10
+DAYS = ["2024-01-01", "2024-01-02", "2024-01-03", "2024-06-30", None]
+
+
+@pytest.fixture(autouse=True)
+def feeds(database, monkeypatch):
+    monkeypatch.setattr(live, "_feeds", {})
+    monkeypatch.setattr(instrumentation, "ENABLED", True)
+
+
+@pytest.fixture
+def rng():
+    return random.Random(11)
+
+
+def _incident(rng, incident_id):
+    day = rng.choice(DAYS)
+    return (incident_id, day and f"{day} {rng.randrange(24):02d}:{rng.randrange(60):02d}:00",
+            rng.choice(["High", "Low", None]), rng.choice(["Phishing", "Malware"]),
+            rng.choice(["Open", "Closed"]), f"incident {incident_id}")
+
+
+def _ticket(rng, ticket_id):
+    return (ticket_id, rng.choice(["High", "Low"]), f"ticket {ticket_id}", rng.choice(["Open", "Closed"]),
+            rng.choice(["alice", "bob", None]), f"{rng.choice(DAYS[:-1])} 08:{rng.randrange(60):02d}:00",
+            rng.choice([None, 2, 8]))
+
+
+def _assert_current(table):
+    """The feed must match a fresh read past every cache."""
+    feed = live.poll(table, page_size=PAGE_SIZE)
+    rows, cursor = query_rows.uncached(table, page_size=PAGE_SIZE)
+    assert feed["first_page"] == ([dict(row) for row in rows], cursor)
+    assert feed["summary"] == live.SUMMARIES[table]()
+
+
+def _reloads():
+    return instrumentation.counters().get("live.reloads", 0)
+
+
+@pytest.mark.parametrize("table, make, key", [
+    ("cyber_incidents", _incident, "incident_id"),
+    ("it_tickets", _ticket, "ticket_id"),
+])
+def test_feed_tracks_random_writes(execute, rng, table, make, key):
+    columns = TABLES[table]["columns"]
+    insert = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    update = f"UPDATE {table} SET {', '.join(f'{c} = ?' for c in columns[1:])} WHERE {key} = ?"
+    execute(insert, [make(rng, i) for i in range(1, 31)])
+    _assert_current(table)
+    next_id = 31
+    for _ in range(40):
+        action = rng.choice(["insert", "insert", "update", "delete"])
+        if action == "insert":
+            execute(insert, [make(rng, next_id + i) for i in range(rng.randrange(1, 4))])
+            next_id += 3
+        elif action == "update":
+            row = make(rng, rng.randrange(1, next_id))
+            execute(update, row[1:] + row[:1])
+        else:
+            execute(f"DELETE FROM {table} WHERE {key} IN (?, ?)", (rng.randrange(1, next_id), rng.randrange(1, next_id)))
+        _assert_current(table)
+
+
+def test_in_place_update_is_merged(execute, rng):
+    execute("INSERT INTO cyber_incidents VALUES (?, ?, ?, ?, ?, ?)", [_incident(rng, i) for i in range(1, 31)])
+    _assert_current("cyber_incidents")
+    execute("UPDATE cyber_incidents SET severity = 'Critical', timestamp = '2030-01-01 00:00:00' "
+            "WHERE incident_id = 5")
+    reloads = _reloads()
+    _assert_current("cyber_incidents")
+    assert _reloads() == reloads
+    assert live.poll("cyber_incidents", page_size=PAGE_SIZE)["first_page"][0][0]["incident_id"] == 5
+
+
+def test_reloads_after_a_bulk_change_or_a_gap_in_the_log(execute, rng, monkeypatch):
+    execute("INSERT INTO cyber_incidents VALUES (?, ?, ?, ?, ?, ?)", [_incident(rng, i) for i in range(1, 31)])
+    _assert_current("cyber_incidents")
+    monkeypatch.setattr(live, "MAX_MERGED_CHANGES", 5)
+    execute("UPDATE cyber_incidents SET status = 'Closed' WHERE incident_id <= 20")
+    reloads = _reloads()
+    _assert_current("cyber_incidents")
+    assert _reloads() == reloads + 1
+
+    execute("DELETE FROM cyber_incidents WHERE incident_id = 30")
+    rebuild_search_indexes()   # prunes the log past the feed's cursor
+    _assert_current("cyber_incidents")
+    assert _reloads() == reloads + 2
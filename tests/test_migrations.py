@@ -0,0 +1,101 @@
+import pytest
+
+from app.data import pool
+from app.data.cache import invalidate
+from app.data.db import explain_dashboard_queries, plan_problem
+from app.data.migrations import MIGRATIONS, current_version, migrate
+from app.data.rollups import check_rollups
+from app.data.search_index import keyword_search
+
+INCIDENTS = [
+    (1, "2024-03-01 09:30:00", " high ", "phishing", "OPEN", "Phishing email with a fake login page"),
+    (2, "2024-03-02 14:00:00", "Low", "Malware", "resolved", "Malware quarantined on a laptop"),
+    (3, None, "", None, "Closed", "No timestamp recorded"),
+]
+TICKETS = [
+    (10, "low", "VPN drops every hour", "in progress", "alice", "2024-03-05 08:00:00", 4),
+    (11, "HIGH", "Password reset", "Closed", None, "2024-03-06 10:00:00", None),
+]
+
+
+@pytest.fixture
+def version_one(tmp_path, monkeypatch):
+    """A database at schema version 1 holding rows written before any later migration."""
+    pool.close_all()
+    monkeypatch.setattr(pool, "DB_PATH", tmp_path / "legacy.db")
+    invalidate()
+    assert migrate(target=1) == [1]
+    with pool.get_connection() as conn:
+        conn.executemany("INSERT INTO cyber_incidents VALUES (?, ?, ?, ?, ?, ?)", INCIDENTS)
+        conn.executemany("INSERT INTO it_tickets VALUES (?, ?, ?, ?, ?, ?, ?)", TICKETS)
+    yield
+    pool.close_all()
+    invalidate()
+
+
+def test_upgrade_applies_every_later_version(version_one):
+    assert migrate() == [version for version, _, _ in MIGRATIONS[1:]]
+    assert migrate() == []
+    with pool.get_connection() as conn:
+        assert current_version(conn) == MIGRATIONS[-1][0]
+
+
+def test_upgrade_normalizes_existing_rows(version_one):
+    migrate()
+    with pool.get_connection() as conn:
+        incidents = [tuple(row) for row in conn.execute(
+            "SELECT severity, status, category, timestamp_epoch FROM cyber_incidents ORDER BY incident_id")]
+        tickets = [tuple(row) for row in conn.execute("SELECT priority, status FROM it_tickets ORDER BY ticket_id")]
+    assert incidents == [("High", "Open", "Phishing", 1709285400),
+                         ("Low", "Resolved", "Malware", 1709388000),
+                         (None, "Closed", None, 0)]
+    assert tickets == [("Low", "In Progress"), ("High", "Closed")]
+
+
+def test_upgrade_builds_rollups_and_search_over_existing_rows(version_one):
+    migrate()
+    assert check_rollups() == []
+    assert [row_id for row_id, _ in keyword_search("cyber_incidents", "quarantined laptop")] == [2]
+    assert [row_id for row_id, _ in keyword_search("it_tickets", "vpn")] == [10]
+
+
+def test_version_13_redefines_existing_search_triggers(tmp_path, monkeypatch):
+    pool.close_all()
+    monkeypatch.setattr(pool, "DB_PATH", tmp_path / "v12.db")
+    invalidate()
+    migrate(target=12)
+    with pool.get_connection() as conn:
+        # A version 12 database whose insert trigger predates the current definition
+        conn.execute("DROP TRIGGER incidents_fts_insert")
+        conn.execute("""
+            CREATE TRIGGER incidents_fts_insert AFTER INSERT ON cyber_incidents
+            BEGIN INSERT INTO incidents_fts (rowid, description, category, status, severity)
+                  VALUES (NEW.incident_id, NEW.description, NEW.category, NEW.status, NEW.severity); END
+        """)
+    assert migrate(target=13) == [13]
+    with pool.get_connection() as conn:
+        conn.execute("INSERT INTO cyber_incidents VALUES (1, '2024-03-01 09:30:00', 'High', 'Malware', 'Open', 'x')")
+        conn.execute("UPDATE cyber_incidents SET timestamp = '2024-03-02 09:30:00' WHERE incident_id = 1")
+        ops = [row[0] for row in conn.execute("SELECT op FROM search_changes "
+                                           "WHERE table_name = 'cyber_incidents' ORDER BY seq")]
+    pool.close_all()
+    invalidate()
+    assert ops == ["insert", "update"]
+
+
+def test_dashboard_query_plans_use_indexes_and_do_not_sort_every_match(database):
+    results = explain_dashboard_queries()
+    assert any("several" in name for name, _, _ in results)
+    assert [(name, plan) for name, plan, problem in results if problem] == []
+
+
+def test_plan_problem_flags_scans_and_unbounded_sorts():
+    assert plan_problem(["SCAN cyber_incidents"], paged=False) == "full scan"
+    assert plan_problem(["SCAN incident_rollup"], paged=False) is None
+    unbounded = ["SEARCH cyber_incidents USING INDEX idx_incidents_severity_status_category (severity=?)",
+                 "USE TEMP B-TREE FOR ORDER BY"]
+    assert plan_problem(unbounded, paged=True) == "sort"
+    assert plan_problem(unbounded, paged=False) is None
+    bounded = ["SEARCH it_tickets USING INDEX idx_tickets_status_date (status=? AND created_at_epoch>?)",
+               "USE TEMP B-TREE FOR ORDER BY"]
+    assert plan_problem(bounded, paged=True) is None
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from app.data.db import TABLES, count_rows, query_rows
+from app.data.pool import get_connection
+
+FILTERS = [None, {"status": ["Open", "Closed"]}, {"priority": "High"}]
+
+
+@pytest.fixture
+def tickets(execute):
+    rng = random.Random(3)
+    rows = []
+    for i in range(1, 121):
+        created = rng.choice([None, "junk", "2024-02-01 09:00:00"]) if i % 10 == 0 else \
+            f"2024-01-{rng.randrange(1, 8):02d} {rng.choice(['09', '17'])}:00:00"   # many ties
+        rows.append((i, rng.choice(["High", "Low", None]), f"ticket {i}", rng.choice(["Open", "Closed", None]),
+                     rng.choice(["alice", "bob", None]), created, rng.choice([None, 1, 2, 3])))
+    execute("INSERT INTO it_tickets (ticket_id, priority, description, status, assigned_to, created_at, "
+            "resolution_time_hours) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+def _expected(sort_by, descending, filters, date_from, date_to):
+    """Every matching ticket id in the order query_rows pages through them."""
+    column = TABLES["it_tickets"]["typed"].get(sort_by, sort_by)
+    where, params = ["1"], []
+    for name, value in (filters or {}).items():
+        values = value if isinstance(value, list) else [value]
+        where.append(f"{name} IN ({', '.join('?' * len(values))})")
+        params += values
+    if date_from:
+        where.append("created_at_epoch >= strftime('%s', ?)")
+        params.append(date_from)
+    if date_to:
+        where.append("created_at_epoch < strftime('%s', ?, '+1 day')")
+        params.append(date_to)
+    with get_connection() as conn:
+        rows = conn.execute(f"SELECT ticket_id, {column} FROM it_tickets WHERE {' AND '.join(where)}",
+                            params).fetchall()
+    # SQLite sorts NULL before every value
+    ordered = sorted(rows, key=lambda row: (row[1] is not None, row[1] if row[1] is not None else 0, row[0]))
+    return [row[0] for row in (reversed(ordered) if descending else ordered)]
+
+
+def _all_pages(**query):
+    ids, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = query_rows.uncached("it_tickets", page_size=7, after=cursor, **query)
+        ids += [row["ticket_id"] for row in rows]
+        pages += 1
+        if cursor is None:
+            return ids, pages
+
+
+@pytest.mark.parametrize("sort_by", TABLES["it_tickets"]["sortable"])
+@pytest.mark.parametrize("descending", [True, False])
+def test_keyset_pages_cover_every_row_in_order(tickets, sort_by, descending):
+    for filters in FILTERS:
+        for date_from, date_to in [(None, None), ("2024-01-03", "2024-01-05")]:
+            query = {"sort_by": sort_by, "descending": descending, "filters": filters,
+                     "date_from": date_from, "date_to": date_to}
+            ids, pages = _all_pages(**query)
+            assert ids == _expected(sort_by, descending, filters, date_from, date_to)
+            assert len(ids) == count_rows.uncached("it_tickets", filters, date_from, date_to)
+            assert pages == max(1, -(-len(ids) // 7))
+
+
+def test_rejects_unknown_columns(tickets):
+    with pytest.raises(ValueError):
+        query_rows.uncached("it_tickets", sort_by="description")
+    with pytest.raises(ValueError):
+        query_rows.uncached("it_tickets", filters={"description": "x"})
+    with pytest.raises(ValueError):
+        query_rows.uncached("users")
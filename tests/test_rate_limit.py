@@ -0,0 +1,87 @@
+"""rate_limit: buckets, lockouts and the negative cache agree on usernames."""
+import pytest
+
+from app.services import db_auth, rate_limit
+
+
+@pytest.fixture(autouse=True)
+def fresh_limits(database):
+    rate_limit.reset()
+    yield
+    rate_limit.reset()
+
+
+def test_user_bucket_ignores_case():
+    for _ in range(rate_limit.USER_BUCKET_CAPACITY):
+        rate_limit.check_attempt("alice")
+    with pytest.raises(rate_limit.RateLimitedError):
+        rate_limit.check_attempt("ALICE")
+
+
+def test_client_bucket_is_shared_across_usernames():
+    for i in range(rate_limit.CLIENT_BUCKET_CAPACITY):
+        rate_limit.check_attempt(f"user{i}", client_id="session-1")
+    with pytest.raises(rate_limit.RateLimitedError):
+        rate_limit.check_attempt("someone-else", client_id="session-1")
+    rate_limit.check_attempt("someone-else", client_id="session-2")
+
+
+def test_lockout_ignores_case():
+    for _ in range(rate_limit.MAX_FAILURES - 1):
+        rate_limit.record_failure("Alice")
+    assert rate_limit.lockout_remaining("alice") == 0
+
+    rate_limit.record_failure("ALICE")
+    assert rate_limit.lockout_remaining("alice") > 0
+    with pytest.raises(rate_limit.RateLimitedError):
+        rate_limit.check_attempt("aLiCe")
+
+    rate_limit.clear_failures("alice")
+    assert rate_limit.lockout_remaining("Alice") == 0
+
+
+def test_negative_cache_ignores_case():
+    rate_limit.remember_unknown("Bob")
+    assert rate_limit.is_known_unknown("BOB")
+    rate_limit.forget_unknown("bob")
+    assert not rate_limit.is_known_unknown("Bob")
+
+
+def test_unknown_and_known_usernames_lock_out_alike(monkeypatch):
+    monkeypatch.setattr(rate_limit, "USER_BUCKET_CAPACITY", 100)
+    assert db_auth.register_user_db("carol", "right-password")
+
+    for username in ("carol", "nobody"):
+        for _ in range(rate_limit.MAX_FAILURES):
+            assert not db_auth.login_user_db(username, "wrong-password")
+        with pytest.raises(rate_limit.RateLimitedError):
+            db_auth.login_user_db(username, "wrong-password")
+
+
+def test_successful_login_clears_failures():
+    assert db_auth.register_user_db("dave", "right-password")
+    rate_limit.record_failure("dave")
+    assert db_auth.login_user_db("Dave", "wrong-password") is False
+    assert db_auth.login_user_db("dave", "right-password") is True
+    assert rate_limit.lockout_remaining("dave") == 0
+
+
+def test_expired_rows_are_swept(monkeypatch, execute):
+    monkeypatch.setattr(rate_limit, "PRUNE_EVERY_FAILURES", 1)
+    execute("INSERT INTO login_lockouts (username, failed_count, window_start, locked_until, updated_at) "
+            "VALUES ('stale', 3, 0, NULL, ''), ('locked', 0, 0, 1e12, '')")
+    rate_limit.record_failure("fresh")
+
+    from app.data.pool import get_connection
+    with get_connection() as conn:
+        names = {row[0] for row in conn.execute("SELECT username FROM login_lockouts")}
+    assert names == {"locked", "fresh"}
+
+
+def test_unknown_username_costs_one_check_and_no_hash(monkeypatch):
+    calls = []
+    monkeypatch.setattr(db_auth, "hash_password", lambda *args: calls.append("hash"))
+    monkeypatch.setattr(db_auth, "verify_password", lambda *args: calls.append("verify"))
+    for _ in range(2):   # first lookup goes to the database, the second to the negative cache
+        assert not db_auth.login_user_db("nobody", "password")
+    assert calls == ["verify", "verify"]
@@ -0,0 +1,58 @@
+import time
+
+import pytest
+
+from app.services import retrieval
+
+
+@pytest.fixture
+def records(execute):
+    execute("INSERT INTO cyber_incidents (incident_id, timestamp, severity, category, status, description) "
+            "VALUES (?, '2024-01-01 10:00:00', 'High', 'Phishing', 'Open', ?)",
+            [(1, "Phishing email asked for VPN credentials"), (2, "Malware on a laptop"),
+             (3, "Phishing link blocked by the mail gateway")])
+    execute("INSERT INTO it_tickets (ticket_id, priority, description, status, assigned_to, created_at) "
+            "VALUES (?, 'Low', ?, 'Open', 'alice', '2024-01-02 09:00:00')",
+            [(10, "VPN credentials expired"), (11, "Printer out of toner")])
+
+
+def _rankings(monkeypatch, keyword, vector):
+    monkeypatch.setattr(retrieval, "keyword_search", lambda source, text, limit: keyword.get(source, []))
+    monkeypatch.setattr(retrieval.vector_index, "vector_search", lambda source, text, limit: vector.get(source))
+
+
+def test_fusion_favours_rows_both_rankings_agree_on(monkeypatch):
+    _rankings(monkeypatch,
+              keyword={"cyber_incidents": [(1, -3.0), (3, -2.0)], "it_tickets": [(10, -1.0)]},
+              vector={"cyber_incidents": [(3, 0.9), (2, 0.5)], "it_tickets": []})
+    ranked = [(source, row_id) for _, source, row_id in retrieval._fused_ranking("phishing")]
+    assert ranked[0] == ("cyber_incidents", 3)
+    assert set(ranked[1:3]) == {("cyber_incidents", 1), ("it_tickets", 10)}
+    assert ranked[3] == ("cyber_incidents", 2)
+
+
+def test_keyword_only_while_vectors_are_not_ready(monkeypatch):
+    _rankings(monkeypatch, keyword={"cyber_incidents": [(1, -3.0), (3, -2.0)]}, vector={})
+    assert [row_id for _, _, row_id in retrieval._fused_ranking("phishing")] == [1, 3]
+
+
+def test_retrieve_reads_rows_and_skips_deleted_ones(records, execute, monkeypatch):
+    _rankings(monkeypatch, keyword={"cyber_incidents": [(1, -3.0), (99, -2.0)], "it_tickets": [(10, -1.0)]},
+              vector={})
+    rows = sorted(retrieval.retrieve("vpn credentials", k=5), key=lambda row: row["label"])
+    assert [(row["label"], row["id"]) for row in rows] == [("Incident", 1), ("Ticket", 10)]   # 99 is gone
+    assert retrieval.format_record(rows[0]) == (
+        "- Incident #1 [High/Open/Phishing] 2024-01-01 10:00:00: Phishing email asked for VPN credentials")
+    assert "Ticket #10" in retrieval.grounding_message(rows)["content"]
+    assert retrieval.grounding_message([]) is None
+
+
+def test_retrieve_end_to_end(records, monkeypatch):
+    monkeypatch.setattr(retrieval.vector_index, "_indexes", {})
+    rows = retrieval.retrieve("phishing credentials", k=2)
+    assert {(row["source"], row["id"]) for row in rows} == {("cyber_incidents", 1), ("it_tickets", 10)}
+    deadline = time.monotonic() + 10   # let the background build finish against this database
+    while retrieval.vector_index._wanted and time.monotonic() < deadline:
+        time.sleep(0.01)
+    rows = retrieval.retrieve("phishing credentials", k=2)
+    assert {(row["source"], row["id"]) for row in rows} == {("cyber_incidents", 1), ("it_tickets", 10)}
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from app.data.db import table_summary, ticket_summary
+from app.data.pool import get_connection
+from app.data.rollups import check_rollups, rebuild_rollups
+
+SEVERITIES = ("Critical", "High", "Medium", "Low", None)
+STATUSES = ("Open", "In Progress", "Resolved", "Closed", None)
+CATEGORIES = ("Phishing", "Malware", "DDoS", None)
+ASSIGNEES = ("alice", "bob", "carol", None)
+
+
+def _incident(rng, incident_id):
+    day = rng.choice(["2024-01-01", "2024-01-02", "2024-02-10", None])
+    return (incident_id, day and f"{day} {rng.randrange(24):02d}:00:00", rng.choice(SEVERITIES),
+            rng.choice(CATEGORIES), rng.choice(STATUSES), f"incident {incident_id}")
+
+
+def _ticket(rng, ticket_id):
+    return (ticket_id, rng.choice(SEVERITIES), f"ticket {ticket_id}", rng.choice(STATUSES),
+            rng.choice(ASSIGNEES), "2024-01-01 08:00:00", rng.choice([None, 1, 5, 24]))
+
+
+@pytest.fixture
+def rng():
+    return random.Random(7)
+
+
+@pytest.fixture
+def filled(execute, rng):
+    execute("INSERT INTO cyber_incidents VALUES (?, ?, ?, ?, ?, ?)", [_incident(rng, i) for i in range(1, 201)])
+    execute("INSERT INTO it_tickets VALUES (?, ?, ?, ?, ?, ?, ?)", [_ticket(rng, i) for i in range(1, 201)])
+
+
+def _grouped(sql):
+    with get_connection() as conn:
+        return {row[0]: row[1] for row in conn.execute(sql)}
+
+
+def test_inserts_updates_and_deletes_keep_rollups_exact(filled, execute, rng):
+    assert check_rollups() == []
+    for i in rng.sample(range(1, 201), 60):
+        _, timestamp, severity, category, status, _ = _incident(rng, i)
+        execute("UPDATE cyber_incidents SET timestamp = ?, severity = ?, category = ?, status = ? "
+                "WHERE incident_id = ?", (timestamp, severity, category, status, i))
+    execute("UPDATE it_tickets SET resolution_time_hours = NULL WHERE ticket_id % 3 = 0")
+    execute("UPDATE it_tickets SET assigned_to = 'dave', resolution_time_hours = 2 WHERE ticket_id % 5 = 0")
+    execute("DELETE FROM cyber_incidents WHERE incident_id % 4 = 0")
+    execute("DELETE FROM it_tickets WHERE ticket_id > 150")
+    assert check_rollups() == []
+
+
+def test_rebuild_repairs_drift(filled, execute):
+    execute("UPDATE incident_rollup SET count = count + 1")
+    assert check_rollups() != []
+    rebuild_rollups()
+    assert check_rollups() == []
+
+
+def test_summaries_match_the_base_tables(filled, execute):
+    execute("DELETE FROM cyber_incidents WHERE incident_id % 7 = 0")
+    incidents = table_summary.uncached("cyber_incidents")
+    assert incidents["total"] == _grouped("SELECT 'all', COUNT(*) FROM cyber_incidents")["all"]
+    for column in ("severity", "status", "category"):
+        expected = _grouped(f"SELECT {column}, COUNT(*) FROM cyber_incidents GROUP BY {column}")
+        assert incidents[f"by_{column}"] == expected
+
+    tickets = ticket_summary.uncached()
+    assert tickets["by_assigned_to"] == _grouped("SELECT assigned_to, COUNT(*) FROM it_tickets GROUP BY assigned_to")
+    assert tickets["avg_resolution_by_assigned_to"] == pytest.approx(
+        _grouped("SELECT assigned_to, AVG(resolution_time_hours) FROM it_tickets GROUP BY assigned_to"))
+    assert tickets["avg_resolution_hours"] == pytest.approx(
+        _grouped("SELECT 'all', AVG(resolution_time_hours) FROM it_tickets")["all"])
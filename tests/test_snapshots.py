@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+pytest.importorskip("pyarrow")
+pd = pytest.importorskip("pandas")
+
+from app.data import cache, snapshots  # noqa: E402
+from app.data.db import count_rows, table_frame  # noqa: E402
+
+QUERIES = [
+    {},
+    {"filters": {"severity": ["High", "Critical"]}},
+    {"filters": {"status": "Open", "category": ["Malware"]}, "date_from": "2024-02-10"},
+    {"date_from": "2024-01-31", "date_to": "2024-03-01"},
+    {"filters": {"severity": "Low"}, "date_to": "2024-02-29"},
+]
+
+
+@pytest.fixture
+def directory(execute, tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "VERSION_CHECK_INTERVAL", 0)
+    rng = random.Random(21)
+    execute("INSERT INTO cyber_incidents (incident_id, timestamp, severity, category, status, description) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(i, None if i % 50 == 0 else f"2024-{rng.randrange(1, 5):02d}-{rng.randrange(1, 29):02d} "
+                                           f"{rng.randrange(24):02d}:{rng.randrange(60):02d}:00",
+              rng.choice(["Critical", "High", "Low", None]), rng.choice(["Malware", "Phishing", None]),
+              rng.choice(["Open", "Closed"]), f"incident {i}") for i in range(1, 501)])
+    directory = tmp_path / "snapshots"
+    snapshots.export_snapshot("cyber_incidents", directory)
+    return directory
+
+
+def _by_id(frame):
+    """Rows keyed and sorted by id, as plain Python values (None for missing)."""
+    frame = frame.astype(object)   # Arrow dictionary chunks with nulls cannot be reordered in place
+    return frame.where(frame.notna(), None).set_index("incident_id").sort_index()
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_snapshot_reads_match_sql(directory, query):
+    columns = ["incident_id", "timestamp", "severity", "category", "status"]
+    snapshot = _by_id(snapshots.read_snapshot("cyber_incidents", columns, directory=directory, **query))
+    database = _by_id(table_frame("cyber_incidents", columns, **query))
+    assert len(snapshot) == count_rows("cyber_incidents", query.get("filters"), query.get("date_from"),
+                                       query.get("date_to"))
+    assert snapshot.index.tolist() == database.index.tolist()
+    for column in ("severity", "category", "status"):
+        assert snapshot[column].tolist() == database[column].tolist()
+    dated = database["timestamp"].notna()   # missing dates are epoch 0 in the snapshot, NaT in SQL reads
+    assert snapshot["timestamp"][dated].map(pd.Timestamp).tolist() == database["timestamp"][dated].tolist()
+    assert (snapshot["timestamp"][~dated] == pd.Timestamp(0)).all()
+
+
+def test_analysis_frame_uses_the_snapshot_while_current(directory, execute):
+    frame, source = snapshots.analysis_frame("cyber_incidents", ("severity",), directory=directory)
+    assert (source, len(frame)) == ("snapshot", 500)
+    execute("DELETE FROM cyber_incidents WHERE incident_id = 1")
+    frame, source = snapshots.analysis_frame("cyber_incidents", ("severity",), directory=directory)
+    assert (source, len(frame)) == ("database", 499)
+
+
+def test_analysis_frame_without_a_snapshot(execute, tmp_path):
+    execute("INSERT INTO cyber_incidents (incident_id, severity) VALUES (1, 'High')")
+    frame, source = snapshots.analysis_frame("cyber_incidents", ("severity",), directory=tmp_path)
+    assert source == "database" and frame["severity"].tolist() == ["High"]
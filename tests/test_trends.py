@@ -0,0 +1,134 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from app.data import trends  # noqa: E402
+from app.data.pool import get_connection  # noqa: E402
+
+FLOORS = {"hour": lambda t: t.dt.floor("h"), "day": lambda t: t.dt.floor("D"),
+          "week": lambda t: t.dt.to_period("W-SUN").dt.start_time}
+RANGES = [(None, None), ("2024-01-03", "2024-01-09")]
+
+
+@pytest.fixture(autouse=True)
+def stores(database, monkeypatch):
+    monkeypatch.setattr(trends, "_stores", {})
+
+
+@pytest.fixture
+def rng():
+    return random.Random(5)
+
+
+def _timestamp(rng):
+    if rng.random() < 0.05:
+        return rng.choice([None, "not a date"])
+    return f"2024-01-{rng.randrange(1, 20):02d} {rng.randrange(24):02d}:{rng.randrange(60):02d}:00"
+
+
+def _incident(rng, i):
+    return (i, _timestamp(rng), rng.choice(["Critical", "High", "Low", None]), "Malware", "Open", "x")
+
+
+def _ticket(rng, i):
+    return (i, rng.choice(["High", "Low", None]), "x", "Open", rng.choice(["alice", "bob", "carol", None]),
+            _timestamp(rng), rng.choice([None, *range(1, 48)]))
+
+
+def _frame(sql):
+    with get_connection() as conn:
+        frame = pd.read_sql_query(sql, conn)
+    return frame
+
+
+def _in_range(frame, column, date_from, date_to):
+    frame = frame[frame[column] != 0]
+    if date_from:
+        frame = frame[frame[column] >= pd.Timestamp(date_from).timestamp()]
+    if date_to:
+        frame = frame[frame[column] < (pd.Timestamp(date_to) + pd.Timedelta(days=1)).timestamp()]
+    return frame.assign(bucket=lambda f: pd.to_datetime(f[column], unit="s"))
+
+
+def _check_buckets(result, frame, granularity):
+    """Bucket starts are aligned and run from the first to the last timestamped row in range."""
+    starts = pd.DatetimeIndex(result["buckets"])
+    assert (starts == FLOORS[granularity](pd.Series(starts))).all()
+    if len(frame):
+        step = {"hour": "h", "day": "D", "week": "7D"}[granularity]
+        assert starts.equals(pd.date_range(frame["bucket"].min(), frame["bucket"].max(), freq=step))
+
+
+def _reference_counts(granularity, date_from, date_to):
+    frame = _in_range(_frame("SELECT timestamp_epoch, severity FROM cyber_incidents"),
+                      "timestamp_epoch", date_from, date_to)
+    frame["bucket"] = FLOORS[granularity](frame["bucket"]).astype("datetime64[s]")
+    return frame, frame.dropna().groupby(["bucket", "severity"]).size()
+
+
+def _reference_resolution(granularity, date_from, date_to):
+    frame = _frame("SELECT created_at_epoch, assigned_to, resolution_time_hours FROM it_tickets")
+    frame = _in_range(frame, "created_at_epoch", date_from, date_to)
+    frame["bucket"] = FLOORS[granularity](frame["bucket"]).astype("datetime64[s]")
+    hours = frame.dropna().groupby(["bucket", "assigned_to"])["resolution_time_hours"]
+    p95 = hours.agg(lambda values: np.quantile(values, trends.QUANTILE, method="inverted_cdf"))
+    return frame, hours.size(), hours.mean(), p95
+
+
+def _as_series(result, labels, values, keep):
+    """A (bucket, label) array as a Series, keeping the cells where ``keep`` is set."""
+    index = pd.MultiIndex.from_product([pd.DatetimeIndex(result["buckets"]), result[labels]])
+    return pd.Series(np.asarray(values, dtype=np.float64).ravel(), index=index)[np.asarray(keep).ravel()]
+
+
+def _assert_matches_reference():
+    for granularity in trends.GRANULARITIES:
+        for date_from, date_to in RANGES:
+            result = trends.bucket_counts("cyber_incidents", granularity, date_from, date_to)
+            frame, expected = _reference_counts(granularity, date_from, date_to)
+            _check_buckets(result, frame, granularity)
+            actual = _as_series(result, "labels", result["counts"], result["counts"] > 0)
+            pd.testing.assert_series_equal(actual.sort_index(), expected.astype(np.float64).sort_index(),
+                                           check_names=False)
+
+            result = trends.resolution_stats(granularity, date_from, date_to)
+            frame, count, mean, p95 = _reference_resolution(granularity, date_from, date_to)
+            _check_buckets(result, frame, granularity)
+            for name, expected in (("count", count), ("mean", mean), ("p95", p95)):
+                actual = _as_series(result, "assignees", result[name], result["count"] > 0)
+                pd.testing.assert_series_equal(actual.sort_index(), expected.astype(np.float64).sort_index(),
+                                               check_names=False)
+
+
+def test_trends_match_pandas_after_writes(execute, rng):
+    execute("INSERT INTO cyber_incidents VALUES (?, ?, ?, ?, ?, ?)", [_incident(rng, i) for i in range(1, 301)])
+    execute("INSERT INTO it_tickets VALUES (?, ?, ?, ?, ?, ?, ?)", [_ticket(rng, i) for i in range(1, 301)])
+    _assert_matches_reference()
+
+    # Applied from the change log, not reloaded
+    execute("INSERT INTO cyber_incidents VALUES (?, ?, ?, ?, ?, ?)", [_incident(rng, i) for i in range(301, 321)])
+    execute("INSERT INTO it_tickets VALUES (?, ?, ?, ?, ?, ?, ?)", [_ticket(rng, i) for i in range(301, 321)])
+    execute("UPDATE cyber_incidents SET severity = 'Medium', timestamp = '2024-01-25 12:00:00' "
+            "WHERE incident_id IN (3, 4, 5)")
+    execute("UPDATE it_tickets SET resolution_time_hours = 200, assigned_to = 'dave' WHERE ticket_id IN (7, 8)")
+    execute("DELETE FROM cyber_incidents WHERE incident_id IN (10, 11)")
+    execute("DELETE FROM it_tickets WHERE ticket_id IN (12, 13)")
+    _assert_matches_reference()
+
+
+def test_p95_is_nearest_rank(execute):
+    hours = list(range(1, 21))   # nearest-rank p95 of 20 values is the 19th
+    execute("INSERT INTO it_tickets VALUES (?, 'Low', 'x', 'Closed', 'alice', '2024-01-01 09:00:00', ?)",
+            [(i, h) for i, h in enumerate(hours, 1)])
+    result = trends.resolution_stats("day")
+    assert result["p95"][0, result["assignees"].index("alice")] == 19
+    assert result["mean"][0, 0] == pytest.approx(10.5)
+
+
+def test_rolling_mean_matches_pandas():
+    values = np.array([[1, 0], [3, 2], [5, 4], [0, 8], [2, 2]], dtype=np.float64)
+    expected = pd.DataFrame(values).rolling(3, min_periods=1).mean().to_numpy()
+    np.testing.assert_allclose(trends.rolling_mean(values, 3), expected)
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.data import vector_index  # noqa: E402
+from app.data.search_index import index_for  # noqa: E402
+
+WORDS = "phishing email malware laptop vpn outage firewall login password printer server backup".split()
+
+
+@pytest.fixture(autouse=True)
+def fresh(database, monkeypatch):
+    monkeypatch.setattr(vector_index, "_indexes", {})
+    monkeypatch.setattr(vector_index, "_wanted", set())
+
+
+def _description(i):
+    return " ".join(WORDS[(i * k) % len(WORDS)] for k in (1, 3, 7))
+
+
+def _insert(execute, ids):
+    execute("INSERT INTO cyber_incidents (incident_id, timestamp, severity, category, status, description) "
+            "VALUES (?, '2024-01-01 10:00:00', 'High', 'Malware', 'Open', ?)", [(i, _description(i)) for i in ids])
+
+
+def _built(source="cyber_incidents"):
+    """Search once to request the build, then wait for the builder thread."""
+    vector_index.vector_search(source, "warm up")
+    deadline = time.monotonic() + 10
+    while source not in vector_index._indexes or source in vector_index._wanted:
+        assert time.monotonic() < deadline, "vector index was not built"
+        time.sleep(0.01)
+    return vector_index._indexes[source]
+
+
+def _fresh_results(query):
+    """What a from-scratch index returns for a query."""
+    index = vector_index._build(index_for("cyber_incidents")[1])
+    scores = index["matrix"] @ vector_index.embed([query])[0]
+    return sorted((int(row_id), round(float(score), 5)) for row_id, score in zip(index["ids"], scores) if score > 0)
+
+
+def _results(query):
+    return sorted((row_id, round(score, 5)) for row_id, score in
+                  vector_index.vector_search("cyber_incidents", query, limit=1000))
+
+
+def test_search_waits_for_the_background_build(execute, monkeypatch):
+    _insert(execute, range(1, 21))
+    release, build = threading.Event(), vector_index._build
+    monkeypatch.setattr(vector_index, "_build", lambda spec: release.wait(5) and build(spec))
+    assert vector_index.vector_search("cyber_incidents", "phishing email") is None
+    release.set()
+    _built()
+    assert vector_index.vector_search("cyber_incidents", "phishing email")
+
+
+def test_catch_up_matches_a_fresh_build(execute):
+    _insert(execute, range(1, 21))
+    index = _built()
+    reallocations, matrix = 0, index["matrix"]
+    for i in range(21, 121):   # one row at a time: capacity doubles rather than growing per batch
+        _insert(execute, [i])
+        vector_index.refresh("cyber_incidents")
+        reallocations += index["matrix"] is not matrix
+        matrix = index["matrix"]
+    assert reallocations <= 4
+    assert len(index["matrix"]) >= index["size"] == 120
+    execute("UPDATE cyber_incidents SET description = 'printer jam on floor two' WHERE incident_id IN (5, 50)")
+    execute("DELETE FROM cyber_incidents WHERE incident_id IN (7, 70, 110)")
+    for query in ("phishing email", "printer jam", "vpn outage firewall"):
+        assert _results(query) == _fresh_results(query)
+
+
+def test_deleted_rows_are_compacted(execute):
+    _insert(execute, range(1, 41))
+    index = _built()
+    execute("DELETE FROM cyber_incidents WHERE incident_id <= 8")
+    vector_index.refresh("cyber_incidents")
+    assert (index["size"], index["dead"]) == (40, 8)
+    execute("DELETE FROM cyber_incidents WHERE incident_id <= 12")
+    vector_index.refresh("cyber_incidents")
+    assert (index["size"], index["dead"]) == (28, 0)
+    assert sorted(index["positions"]) == list(range(13, 41))
+    assert _results("malware laptop") == _fresh_results("malware laptop")
+
+
+def test_bulk_changes_rebuild_in_the_background(execute, monkeypatch):
+    _insert(execute, range(1, 11))
+    old = _built()
+    monkeypatch.setattr(vector_index, "MAX_CATCH_UP_ROWS", 5)
+    _insert(execute, range(11, 31))
+    new = _built()
+    assert new is not old and new["size"] == 30
+
+
+def test_only_the_newest_rows_are_indexed(execute, monkeypatch):
+    monkeypatch.setattr(vector_index, "MAX_INDEXED_ROWS", 10)
+    _insert(execute, range(1, 31))
+    assert sorted(_built()["positions"]) == list(range(21, 31))